@@ -0,0 +1,98 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Compare the hand-written parser of `az monitor metrics alert` conditions with the ANTLR generated one.
+
+Run with the azure-cli package and antlr4-python3-runtime installed:
+
+    python scripts/performance/measure_metric_alert_condition.py [--loop 1000]
+
+The cold time of each parser is measured in a new process, from importing it to validating the first condition. The
+warm time is the mean time to parse and validate each condition afterwards.
+"""
+
+import argparse
+import subprocess
+import sys
+import timeit
+
+CONDITIONS = [
+    'avg Percentage CPU > 90',
+    'avg Microsoft.Compute/virtualMachines."Percentage CPU" >= 90.5',
+    'total SuccessE2ELatency > 250 where ApiName includes GetBlob or PutBlob and GeoType excludes Primary',
+    'max Transactions > dynamic medium 2 of 4 since 2020-01-01T00:00:00Z where ResponseType includes Success',
+]
+
+PARSERS = {
+    'antlr': """
+import antlr4
+from azure.cli.command_modules.monitor.grammar.metric_alert.MetricAlertConditionLexer import MetricAlertConditionLexer
+from azure.cli.command_modules.monitor.grammar.metric_alert.MetricAlertConditionParser import MetricAlertConditionParser
+from azure.cli.command_modules.monitor.grammar.metric_alert.MetricAlertConditionListener import \\
+    MetricAlertConditionListener
+from azure.cli.command_modules.monitor.grammar.metric_alert.MetricAlertConditionValidator import \\
+    MetricAlertConditionValidator
+
+
+class Validator(MetricAlertConditionValidator, MetricAlertConditionListener):
+    pass
+
+
+def parse(condition):
+    tree = MetricAlertConditionParser(antlr4.CommonTokenStream(
+        MetricAlertConditionLexer(antlr4.InputStream(condition)))).expression()
+    validator = Validator()
+    antlr4.ParseTreeWalker().walk(validator, tree)
+    return validator.result()
+""",
+    'hand-written': """
+from azure.cli.command_modules.monitor.grammar.metric_alert import ConditionParser, MetricAlertConditionValidator
+
+
+def parse(condition):
+    validator = MetricAlertConditionValidator()
+    ConditionParser(condition).walk(validator)
+    return validator.result()
+"""
+}
+
+
+def measure_cold(setup):
+    # import the command module and the models first, both parsers need them
+    code = 'import azure.cli.command_modules.monitor, azure.mgmt.monitor.models, timeit\n' \
+           'start = timeit.default_timer()\n' \
+           '{}\n' \
+           'parse({!r})\n' \
+           'print(timeit.default_timer() - start)'.format(setup, CONDITIONS[0])
+    return float(subprocess.check_output([sys.executable, '-c', code]))
+
+
+def measure_warm(setup, loop):
+    namespace = {}
+    exec(setup, namespace)  # pylint: disable=exec-used
+    for condition in CONDITIONS:
+        namespace['parse'](condition)
+    return [timeit.timeit(lambda c=condition: namespace['parse'](c), number=loop) / loop for condition in CONDITIONS]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--loop', type=int, default=1000, help='times to parse each condition warm')
+    args = arg_parser.parse_args()
+
+    warm = {}
+    for name, setup in PARSERS.items():
+        print('{:>12}: cold {:8.2f} ms'.format(name, measure_cold(setup) * 1000))
+        warm[name] = measure_warm(setup, args.loop)
+
+    for index, condition in enumerate(CONDITIONS):
+        antlr_time, hand_time = warm['antlr'][index], warm['hand-written'][index]
+        print('{}\n{:>12}: warm {:8.3f} ms\n{:>12}: warm {:8.3f} ms ({:.0f}x)'.format(
+            condition, 'antlr', antlr_time * 1000, 'hand-written', hand_time * 1000, antlr_time / hand_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -32,6 +32,22 @@ EVENT_FAILED_EXTENSION_LOAD = 'MainLoader.OnFailedExtensionLoad'
 ALWAYS_LOADED_MODULES = []
 # Extensions that will always be loaded if installed. They don't expose commands but hook into CLI core.
 ALWAYS_LOADED_EXTENSIONS = ['azext_ai_examples', 'azext_next']
+COMMAND_MODULE_PREFIX = 'azure.cli.command_modules.'
+
+
+def _discover_command_modules():
+    """Discover the names of the built-in command modules, like ['resource', 'profile']."""
+    from importlib import import_module
+    import pkgutil
+    command_modules = []
+    try:
+        mods_ns_pkg = import_module('azure.cli.command_modules')
+        command_modules = [modname for _, modname, _ in
+                           pkgutil.iter_modules(mods_ns_pkg.__path__)]
+        logger.debug('Discovered command modules: %s', command_modules)
+    except ImportError as e:
+        logger.warning(e)
+    return command_modules
 
 
 def _configure_knack():
@@ -53,6 +69,17 @@ def _configure_knack():
 _configure_knack()
 
 
+def _flush_sessions(sessions):
+    """Merge the writes deferred during the command into the files. Later writes, e.g. of the version check after the
+    command, are saved immediately."""
+    for session in sessions:
+        session.defer_save(False)
+        try:
+            session.flush()
+        except (OSError, IOError) as ex:
+            logger.warning("Failed to save %s: %s", session.filename, ex)
+
+
 class AzCli(CLI):
 
     def __init__(self, **kwargs):
@@ -67,6 +94,7 @@ class AzCli(CLI):
         from azure.cli.core.util import handle_version_update
         from azure.cli.core.commands.query_examples import register_global_query_examples_argument
 
+        from knack.events import EVENT_CLI_POST_EXECUTE
         from knack.util import ensure_dir
 
         self.data['headers'] = {}
@@ -82,6 +110,11 @@ class AzCli(CLI):
         SESSION.load(os.path.join(azure_folder, 'az.sess'), max_age=3600)
         INDEX.load(os.path.join(azure_folder, 'commandIndex.json'))
         VERSIONS.load(os.path.join(azure_folder, 'versionCheck.json'))
+        # Coalesce the writes of a command into one write per file, after the command is executed
+        sessions = [ACCOUNT, CONFIG, SESSION, INDEX, VERSIONS]
+        for session in sessions:
+            session.defer_save()
+        self.register_event(EVENT_CLI_POST_EXECUTE, lambda _, **kwargs: _flush_sessions(sessions))
         handle_version_update()
 
         self.cloud = get_active_cloud(self)
@@ -134,6 +167,10 @@ class AzCli(CLI):
 
     def exception_handler(self, ex):  # pylint: disable=no-self-use
         from azure.cli.core.util import handle_exception
+        from azure.cli.core.commands.arm import is_not_found_error, invalidate_cached_resource_ids
+        if is_not_found_error(ex):
+            # the resource may have moved since its ID was cached, look it up again next time
+            invalidate_cached_resource_ids()
         return handle_exception(ex)
 
     def save_local_context(self, parsed_args, argument_definitions, specified_arguments):
@@ -221,8 +258,6 @@ class MainCommandsLoader(CLICommandsLoader):
 
     # pylint: disable=too-many-statements, too-many-locals
     def load_command_table(self, args):
-        from importlib import import_module
-        import pkgutil
         import traceback
         from azure.cli.core.commands import (
             _load_module_command_loader, _load_extension_command_loader, BLOCKED_MODS, ExtensionCommandSource)
@@ -244,14 +279,7 @@ class MainCommandsLoader(CLICommandsLoader):
                 command_modules.extend(ALWAYS_LOADED_MODULES)
             else:
                 # Perform module discovery
-                command_modules = []
-                try:
-                    mods_ns_pkg = import_module('azure.cli.command_modules')
-                    command_modules = [modname for _, modname, _ in
-                                       pkgutil.iter_modules(mods_ns_pkg.__path__)]
-                    logger.debug('Discovered command modules: %s', command_modules)
-                except ImportError as e:
-                    logger.warning(e)
+                command_modules = _discover_command_modules()
 
             count = 0
             cumulative_elapsed_time = 0
@@ -365,7 +393,8 @@ class MainCommandsLoader(CLICommandsLoader):
                                 extension_name=ext_name,
                                 overrides_command=cmd_name in module_commands,
                                 preview=ext.preview,
-                                experimental=ext.experimental)
+                                experimental=ext.experimental,
+                                extension_version=ext.version)
 
                         self.command_table.update(extension_command_table)
                         self.command_group_table.update(extension_group_table)
@@ -417,6 +446,65 @@ class MainCommandsLoader(CLICommandsLoader):
                             res.append(sup)
             return res
 
+        def _index_pending_modules(command_index, pending_modules, pending_extensions):
+            """Index the modules and extensions installed since the command index was built."""
+            logger.debug("Indexing modules %s and extensions %s", pending_modules, pending_extensions)
+            modules = list(pending_modules)
+            if pending_extensions:
+                # Also load the modules sharing top-level commands with the extensions, so that extension
+                # suppressions are honored and overridden commands are detected
+                _update_command_table_from_extensions([], list(pending_extensions))
+                for top_command in {command_name.split()[0] for command_name in self.command_table}:
+                    top_command_modules, _ = command_index.get([top_command], use_command_path=False) or ([], [])
+                    modules.extend(m for m in top_command_modules if m not in modules)
+                self.command_group_table.clear()
+                self.command_table.clear()
+            _update_command_table_from_modules(args, modules)
+            _update_command_table_from_extensions(_get_extension_suppressions(self.loaders),
+                                                  list(pending_extensions))
+            command_index.update_modules([COMMAND_MODULE_PREFIX + m for m in pending_modules] + pending_extensions,
+                                         self.command_table)
+
+        def _load_from_index(index_result):
+            """Load the modules and extensions found from the index. Return whether the command is found."""
+            from azure.cli.core.util import roughly_parse_command
+            self.command_group_table.clear()
+            self.command_table.clear()
+            index_modules, index_extensions = index_result
+            # Always load modules and extensions, because some of them (like those in
+            # ALWAYS_LOADED_EXTENSIONS) don't expose a command, but hooks into handlers in CLI core
+            _update_command_table_from_modules(args, index_modules)
+            # The index won't contain suppressed extensions
+            _update_command_table_from_extensions([], index_extensions)
+
+            logger.debug("Loaded %d groups, %d commands.", len(self.command_group_table), len(self.command_table))
+            # The index may be outdated. Make sure the command appears in the loaded command table
+            raw_cmd = roughly_parse_command(args)
+            for cmd in self.command_table:
+                if raw_cmd.startswith(cmd):
+                    # For commands with positional arguments, the raw command won't match the one in the
+                    # command table. For example, `az find vm create` won't exist in the command table, but the
+                    # corresponding command should be `az find`.
+                    # raw command  : az find vm create
+                    # command table: az find
+                    # remaining    :         vm create
+                    logger.debug("Found a match in the command table.")
+                    logger.debug("Raw command  : %s", raw_cmd)
+                    logger.debug("Command table: %s", cmd)
+                    remaining = raw_cmd[len(cmd) + 1:]
+                    if remaining:
+                        logger.debug("remaining    : %s %s", ' ' * len(cmd), remaining)
+                    return True
+            # For command group, it must be an exact match, as no positional argument is supported by
+            # command group operations.
+            if raw_cmd in self.command_group_table:
+                logger.debug("Found a match in the command group table for '%s'.", raw_cmd)
+                return True
+
+            logger.debug("Could not find a match in the command or command group table for '%s'. "
+                         "The index may be outdated.", raw_cmd)
+            return False
+
         # Clear the tables to make this method idempotent
         self.command_group_table.clear()
         self.command_table.clear()
@@ -427,44 +515,25 @@ class MainCommandsLoader(CLICommandsLoader):
         if use_command_index:
             command_index = CommandIndex(self.cli_ctx)
             index_result = command_index.get(args)
+            pending_modules, pending_extensions = command_index.get_pending_modules()
+            if pending_modules or pending_extensions:
+                _index_pending_modules(command_index, pending_modules, pending_extensions)
+                index_result = command_index.get(args)
             if index_result:
-                index_modules, index_extensions = index_result
-                # Always load modules and extensions, because some of them (like those in
-                # ALWAYS_LOADED_EXTENSIONS) don't expose a command, but hooks into handlers in CLI core
-                _update_command_table_from_modules(args, index_modules)
-                # The index won't contain suppressed extensions
-                _update_command_table_from_extensions([], index_extensions)
-
-                logger.debug("Loaded %d groups, %d commands.", len(self.command_group_table), len(self.command_table))
-                from azure.cli.core.util import roughly_parse_command
-                # The index may be outdated. Make sure the command appears in the loaded command table
-                raw_cmd = roughly_parse_command(args)
-                for cmd in self.command_table:
-                    if raw_cmd.startswith(cmd):
-                        # For commands with positional arguments, the raw command won't match the one in the
-                        # command table. For example, `az find vm create` won't exist in the command table, but the
-                        # corresponding command should be `az find`.
-                        # raw command  : az find vm create
-                        # command table: az find
-                        # remaining    :         vm create
-                        logger.debug("Found a match in the command table.")
-                        logger.debug("Raw command  : %s", raw_cmd)
-                        logger.debug("Command table: %s", cmd)
-                        remaining = raw_cmd[len(cmd) + 1:]
-                        if remaining:
-                            logger.debug("remaining    : %s %s", ' ' * len(cmd), remaining)
-                        return self.command_table
-                # For command group, it must be an exact match, as no positional argument is supported by
-                # command group operations.
-                if raw_cmd in self.command_group_table:
-                    logger.debug("Found a match in the command group table for '%s'.", raw_cmd)
+                if _load_from_index(index_result):
+                    command_index.refresh(args, self.command_table)
+                    return self.command_table
+                # The command path index may miss a command that the top-level index still finds
+                top_level_result = command_index.get(args, use_command_path=False)
+                if top_level_result and top_level_result != index_result and _load_from_index(top_level_result):
+                    command_index.refresh(args, self.command_table)
                     return self.command_table
-
-                logger.debug("Could not find a match in the command or command group table for '%s'. "
-                             "The index may be outdated.", raw_cmd)
             else:
                 logger.debug("No module found from index for '%s'", args)
 
+            self.command_group_table.clear()
+            self.command_table.clear()
+
         # No module found from the index. Load all command modules and extensions
         logger.debug("Loading all modules and extensions")
         _update_command_table_from_modules(args)
@@ -524,8 +593,13 @@ class MainCommandsLoader(CLICommandsLoader):
 class CommandIndex:
 
     _COMMAND_INDEX = 'commandIndex'
+    _COMMAND_PATH_INDEX = 'commandPathIndex'
     _COMMAND_INDEX_VERSION = 'version'
     _COMMAND_INDEX_CLOUD_PROFILE = 'cloudProfile'
+    # Top-level commands indexed by a previous CLI version, which are re-indexed the first time they are used
+    _COMMAND_INDEX_STALE = 'staleCommands'
+    # Modules and extensions installed since the index was built, which are indexed the next time the index is used
+    _COMMAND_INDEX_PENDING = 'pendingModules'
 
     def __init__(self, cli_ctx=None):
         """Class to manage command index.
@@ -538,16 +612,24 @@ class CommandIndex:
             self.version = __version__
             self.cloud_profile = cli_ctx.cloud.profile
 
-    def get(self, args):
+    def get(self, args, use_command_path=True):
         """Get the corresponding module and extension list of a command.
 
         :param args: command arguments, like ['network', 'vnet', 'create', '-h']
+        :param use_command_path: Look up the full command path, like `network vnet create`, so that only the modules
+         and extensions providing the command are returned. Otherwise, return all the modules and extensions of the
+         top-level command.
         :return: a tuple containing a list of modules and a list of extensions.
         """
+        # If only the CLI version changes, keep the command index but re-index top-level commands lazily.
         # If the command index version or cloud profile doesn't match those of the current command,
         # invalidate the command index.
         index_version = self.INDEX[self._COMMAND_INDEX_VERSION]
         cloud_profile = self.INDEX[self._COMMAND_INDEX_CLOUD_PROFILE]
+        if index_version and index_version != self.version and \
+                cloud_profile and cloud_profile == self.cloud_profile and self.INDEX[self._COMMAND_INDEX] and \
+                self._mark_stale():
+            index_version = self.version
         if not (index_version and index_version == self.version and
                 cloud_profile and cloud_profile == self.cloud_profile):
             logger.debug("Command index version or cloud profile is invalid or doesn't match the current command.")
@@ -559,24 +641,28 @@ class CommandIndex:
         if not args or args[0].startswith('-'):
             return None
 
-        # Get the top-level command, like `network` in `network vnet create -h`
-        top_command = args[0]
-        index = self.INDEX[self._COMMAND_INDEX]
-        # Check the command index for (command: [module]) mapping, like
-        # "network": ["azure.cli.command_modules.natgateway", "azure.cli.command_modules.network", "azext_firewall"]
-        index_modules_extensions = index.get(top_command)
+        command_path, index_modules_extensions = None, None
+        # The command path index of a stale top-level command may miss modules now providing its sub-commands
+        if use_command_path and args[0] not in self.INDEX.get(self._COMMAND_INDEX_STALE, []):
+            command_path, index_modules_extensions = self._get_from_command_path_index(args)
+        if not index_modules_extensions:
+            # Get the top-level command, like `network` in `network vnet create -h`
+            command_path = args[0]
+            index = self.INDEX[self._COMMAND_INDEX]
+            # Check the command index for (command: [module]) mapping, like
+            # "network": ["azure.cli.command_modules.natgateway", "azure.cli.command_modules.network", "azext_firewall"]
+            index_modules_extensions = index.get(command_path)
 
         if index_modules_extensions:
             # This list contains both built-in modules and extensions
             index_builtin_modules = []
             index_extensions = []
             # Found modules from index
-            logger.debug("Modules found from index for '%s': %s", top_command, index_modules_extensions)
-            command_module_prefix = 'azure.cli.command_modules.'
+            logger.debug("Modules found from index for '%s': %s", command_path, index_modules_extensions)
             for m in index_modules_extensions:
-                if m.startswith(command_module_prefix):
+                if m.startswith(COMMAND_MODULE_PREFIX):
                     # The top-level command is from a command module
-                    index_builtin_modules.append(m[len(command_module_prefix):])
+                    index_builtin_modules.append(m[len(COMMAND_MODULE_PREFIX):])
                 elif m.startswith('azext_'):
                     # The top-level command is from an extension
                     index_extensions.append(m)
@@ -586,28 +672,167 @@ class CommandIndex:
 
         return None
 
+    def _get_from_command_path_index(self, args):
+        """Find the modules and extensions providing the longest command or command group that prefixes the args.
+
+        :return: a tuple containing the matched command path and the list of modules and extensions.
+        """
+        from azure.cli.core.util import roughly_parse_command
+        path_index = self.INDEX.get(self._COMMAND_PATH_INDEX)
+        if not path_index:
+            return None, None
+
+        nouns = roughly_parse_command(args).split()
+        for i in range(len(nouns), 0, -1):
+            command_path = ' '.join(nouns[:i])
+            # Check the command path index for (command: [module]) mapping, like
+            # "network vnet create": ["azure.cli.command_modules.network"]
+            modules = path_index.get(command_path)
+            if modules:
+                return command_path, modules
+            # Otherwise, check whether the path is a command group, like `network vnet` in `network vnet -h`
+            group_prefix = command_path + ' '
+            modules = []
+            for command_name, command_modules in path_index.items():
+                if command_name.startswith(group_prefix):
+                    modules.extend(m for m in command_modules if m not in modules)
+            if modules:
+                return command_path, modules
+        return None, None
+
+    def get_pending_modules(self):
+        """Get the modules and extensions installed since the command index was built.
+
+        :return: a tuple containing a list of modules and a list of extensions.
+        """
+        pending = self.INDEX.get(self._COMMAND_INDEX_PENDING) or []
+        return ([m[len(COMMAND_MODULE_PREFIX):] for m in pending if m.startswith(COMMAND_MODULE_PREFIX)],
+                [m for m in pending if not m.startswith(COMMAND_MODULE_PREFIX)])
+
     def update(self, command_table):
         """Update the command index according to the given command table.
 
         :param command_table: The command table built by azure.cli.core.MainCommandsLoader.load_command_table
         """
         start_time = timeit.default_timer()
-        self.INDEX[self._COMMAND_INDEX_VERSION] = __version__
-        self.INDEX[self._COMMAND_INDEX_CLOUD_PROFILE] = self.cloud_profile
-        from collections import defaultdict
-        index = defaultdict(list)
-
+        self.INDEX.data[self._COMMAND_INDEX_VERSION] = __version__
+        self.INDEX.data[self._COMMAND_INDEX_CLOUD_PROFILE] = self.cloud_profile
+        self.INDEX.data[self._COMMAND_INDEX] = {}
+        self.INDEX.data[self._COMMAND_PATH_INDEX] = {}
+        self.INDEX.data[self._COMMAND_INDEX_STALE] = []
+        self.INDEX.data[self._COMMAND_INDEX_PENDING] = []
         # self.cli_ctx.invocation.commands_loader.command_table doesn't exist in DummyCli due to the lack of invocation
+        self._add_commands(command_table)
+        elapsed_time = timeit.default_timer() - start_time
+        self.INDEX.save_with_retry()
+        logger.debug("Updated command index in %.3f seconds.", elapsed_time)
+
+    def update_modules(self, modules, command_table):
+        """Index the commands of the given modules and extensions, without rebuilding the whole command index.
+
+        :param modules: Modules and extensions to index, like ['azure.cli.command_modules.vm', 'azext_webapp']
+        :param command_table: A command table containing all the commands of the given modules and extensions
+        """
+        self._add_commands({name: command for name, command in command_table.items()
+                            if command.loader.__module__ in modules})
+        pending = self.INDEX.get(self._COMMAND_INDEX_PENDING) or []
+        self.INDEX.data[self._COMMAND_INDEX_PENDING] = [m for m in pending if m not in modules]
+        self.INDEX.save_with_retry()
+        logger.debug("Indexed commands of %s.", modules)
+
+    def refresh(self, args, command_table):
+        """Re-index a stale top-level command from the command table loaded for it.
+
+        :param args: command arguments, like ['network', 'vnet', 'create', '-h']
+        :param command_table: The command table loaded from the modules and extensions of the top-level command
+        """
+        stale = self.INDEX.get(self._COMMAND_INDEX_STALE) or []
+        top_command = args[0]
+        if top_command not in stale:
+            return
+        self._remove_entries(lambda command_name, _: command_name.split()[0] == top_command)
+        self._add_commands({name: command for name, command in command_table.items()
+                            if name.split()[0] == top_command})
+        self.INDEX.data[self._COMMAND_INDEX_STALE] = [c for c in stale if c != top_command]
+        self.INDEX.save_with_retry()
+        logger.debug("Re-indexed stale command '%s'.", top_command)
+
+    def invalidate_extension(self, extension_modname, reindex=True):
+        """Remove the commands of an extension from the command index, so that the whole index isn't rebuilt.
+
+        This function MUST be called when installing, updating or removing extensions, for the same reason as
+        `invalidate`.
+
+        :param extension_modname: The module name of the extension, like 'azext_webapp'
+        :param reindex: Index the commands of the extension the next time the index is used. Set it to False when the
+         extension is removed.
+        """
+        if not self.INDEX.get(self._COMMAND_INDEX_VERSION):
+            # The whole command index will be rebuilt anyway
+            return
+        self._remove_entries(lambda _, module_name: module_name == extension_modname)
+        pending = [m for m in self.INDEX.get(self._COMMAND_INDEX_PENDING) or [] if m != extension_modname]
+        if reindex:
+            pending.append(extension_modname)
+        self.INDEX.data[self._COMMAND_INDEX_PENDING] = pending
+        self.INDEX.save_with_retry()
+        logger.debug("Extension '%s' has been invalidated in the command index.", extension_modname)
+
+    def _add_commands(self, command_table):
+        index = self.INDEX[self._COMMAND_INDEX]
+        path_index = self.INDEX[self._COMMAND_PATH_INDEX]
         for command_name, command in command_table.items():
             # Get the top-level name: <vm> create
             top_command = command_name.split()[0]
             # Get module name, like azure.cli.command_modules.vm, azext_webapp
             module_name = command.loader.__module__
+            index.setdefault(top_command, [])
             if module_name not in index[top_command]:
                 index[top_command].append(module_name)
-        elapsed_time = timeit.default_timer() - start_time
-        self.INDEX[self._COMMAND_INDEX] = index
-        logger.debug("Updated command index in %.3f seconds.", elapsed_time)
+        # An extension overriding a built-in command needs the built-in module to be loaded as well, so that the
+        # override is detected the same way as when all modules are loaded
+        from azure.cli.core.commands import ExtensionCommandSource
+        for command_name, command in command_table.items():
+            path_index[command_name] = [command.loader.__module__]
+            command_source = command.command_source
+            if isinstance(command_source, ExtensionCommandSource) and command_source.overrides_command:
+                path_index[command_name][:0] = [m for m in index[command_name.split()[0]]
+                                                if m.startswith(COMMAND_MODULE_PREFIX)]
+
+    def _remove_entries(self, predicate):
+        """Remove the (command name, module name) entries matching the predicate from the command index."""
+        for key in (self._COMMAND_INDEX, self._COMMAND_PATH_INDEX):
+            index = self.INDEX[key]
+            for command_name in list(index):
+                index[command_name] = [m for m in index[command_name] if not predicate(command_name, m)]
+                if not index[command_name]:
+                    del index[command_name]
+
+    def _mark_stale(self):
+        """Keep the command index built by another CLI version, but mark its top-level commands as stale.
+
+        Built-in modules unknown to the index are indexed the next time the index is used. If a built-in module of
+        the index has been removed, its commands may have moved to other modules, so the index must be rebuilt.
+
+        :return: False if the command index must be rebuilt.
+        """
+        index = self.INDEX[self._COMMAND_INDEX]
+        installed_modules = [COMMAND_MODULE_PREFIX + m for m in _discover_command_modules()]
+        indexed_modules = {m for modules in index.values() for m in modules}
+        removed_modules = {m for m in indexed_modules if m.startswith(COMMAND_MODULE_PREFIX)} - set(installed_modules)
+        if removed_modules:
+            logger.debug("Command modules %s have been removed since the command index was built.",
+                         sorted(removed_modules))
+            return False
+        pending = [m for m in self.INDEX.get(self._COMMAND_INDEX_PENDING) or []
+                   if not m.startswith(COMMAND_MODULE_PREFIX) or m in installed_modules]
+        pending.extend(m for m in installed_modules if m not in indexed_modules and m not in pending)
+        self.INDEX.data[self._COMMAND_INDEX_PENDING] = pending
+        self.INDEX.data[self._COMMAND_INDEX_STALE] = list(index)
+        self.INDEX.data[self._COMMAND_INDEX_VERSION] = self.version
+        self.INDEX.save_with_retry()
+        logger.debug("Command index was built by another CLI version. Top-level commands will be re-indexed lazily.")
+        return True
 
     def invalidate(self):
         """Invalidate the command index.
@@ -616,13 +841,18 @@ class CommandIndex:
             1. overrides a built-in command, or
             2. extends an existing command group,
         the command or command group will only be loaded from the command modules as per the stale command index,
-        making the newly installed extension be ignored.
+        making the newly installed extension be ignored. Call `invalidate_extension` instead to keep the entries of
+        other modules and extensions.
 
         This function can be called when removing extensions.
         """
-        self.INDEX[self._COMMAND_INDEX_VERSION] = ""
-        self.INDEX[self._COMMAND_INDEX_CLOUD_PROFILE] = ""
-        self.INDEX[self._COMMAND_INDEX] = {}
+        self.INDEX.data[self._COMMAND_INDEX_VERSION] = ""
+        self.INDEX.data[self._COMMAND_INDEX_CLOUD_PROFILE] = ""
+        self.INDEX.data[self._COMMAND_INDEX] = {}
+        self.INDEX.data[self._COMMAND_PATH_INDEX] = {}
+        self.INDEX.data[self._COMMAND_INDEX_STALE] = []
+        self.INDEX.data[self._COMMAND_INDEX_PENDING] = []
+        self.INDEX.save_with_retry()
         logger.debug("Command index has been invalidated.")
 
 
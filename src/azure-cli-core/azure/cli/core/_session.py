@@ -14,6 +14,7 @@ except ImportError:
     import collections
 
 from codecs import open as codecs_open
+from contextlib import contextmanager
 
 from knack.log import get_logger
 
@@ -23,12 +24,20 @@ except AttributeError:  # in Python 2.7
     t_JSONDecodeError = ValueError
 
 
+# Seconds to wait for the advisory lock of a session file before writing without it
+LOCK_TIMEOUT = 5
+
+
 class Session(collections.MutableMapping):
     """
     A simple dict-like class that is backed by a JSON file.
 
-    All direct modifications will save the file. Indirect modifications should
-    be followed by a call to `save_with_retry` or `save`.
+    All direct modifications will save the file, unless saving is deferred by `defer_save`. Then only the modified
+    keys are merged into the file by `flush`, so that concurrent processes don't overwrite each other's keys.
+    Indirect modifications should be followed by a call to `save_with_retry` or `save`, which save the whole file
+    immediately.
+
+    The file is written to a temporary file which then replaces it, under an advisory lock of `<filename>.lock`.
     """
 
     def __init__(self, encoding=None):
@@ -36,10 +45,17 @@ class Session(collections.MutableMapping):
         self.filename = None
         self.data = {}
         self._encoding = encoding if encoding else 'utf-8-sig'
+        self._deferred = False
+        self._dirty_keys = set()
+        self._deleted_keys = set()
 
     def load(self, filename, max_age=0):
+        if self._dirty_keys or self._deleted_keys:
+            self.flush()
         self.filename = filename
         self.data = {}
+        self._dirty_keys.clear()
+        self._deleted_keys.clear()
         try:
             if max_age > 0:
                 st = os.stat(self.filename)
@@ -60,10 +76,75 @@ class Session(collections.MutableMapping):
                                      self.filename)
             self.save()
 
+    def defer_save(self, deferred=True):
+        """Defer saving direct modifications until `flush` is called."""
+        self._deferred = deferred
+
+    def flush(self):
+        """Merge the keys modified since the last save into the file."""
+        if not self.filename or not (self._dirty_keys or self._deleted_keys):
+            return
+        with self._lock():
+            data = self._read()
+            for key in self._dirty_keys:
+                if key in self.data:
+                    data[key] = self.data[key]
+            for key in self._deleted_keys:
+                data.pop(key, None)
+            self._write(data)
+        self.data = data
+        self._dirty_keys.clear()
+        self._deleted_keys.clear()
+
     def save(self):
         if self.filename:
-            with codecs_open(self.filename, 'w', encoding=self._encoding) as f:
-                json.dump(self.data, f)
+            with self._lock():
+                self._write(self.data)
+            self._dirty_keys.clear()
+            self._deleted_keys.clear()
+
+    @contextmanager
+    def _lock(self):
+        import portalocker
+        lock = portalocker.Lock(self.filename + '.lock', mode='a', timeout=LOCK_TIMEOUT)
+        try:
+            lock.acquire()
+        except (portalocker.LockException, OSError) as ex:
+            # Still write the file, as it is replaced atomically anyway
+            get_logger(__name__).debug("Failed to lock %s: %s", self.filename, ex)
+        try:
+            yield
+        finally:
+            lock.release()
+
+    def _read(self):
+        try:
+            with codecs_open(self.filename, 'r', encoding=self._encoding) as f:
+                return json.load(f)
+        except (OSError, IOError, t_JSONDecodeError):
+            return {}
+
+    def _write(self, data):
+        import uuid
+        temp_path = '{}.{}.tmp'.format(self.filename, uuid.uuid4().hex[:8])
+        try:
+            mode = os.stat(self.filename).st_mode & 0o777
+        except OSError:
+            mode = None
+        # A new file gets the default permissions under the umask, an existing file keeps its own
+        os.close(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
+        try:
+            if mode is not None:
+                os.chmod(temp_path, mode)
+            with codecs_open(temp_path, 'w', encoding=self._encoding) as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.filename)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
 
     def save_with_retry(self, retries=5):
         for _ in range(retries - 1):
@@ -83,11 +164,19 @@ class Session(collections.MutableMapping):
 
     def __setitem__(self, key, value):
         self.data[key] = value
-        self.save_with_retry()
+        if self._deferred:
+            self._dirty_keys.add(key)
+            self._deleted_keys.discard(key)
+        else:
+            self.save_with_retry()
 
     def __delitem__(self, key):
         del self.data[key]
-        self.save_with_retry()
+        if self._deferred:
+            self._deleted_keys.add(key)
+            self._dirty_keys.discard(key)
+        else:
+            self.save_with_retry()
 
     def __iter__(self):
         return iter(self.data)
@@ -47,6 +47,14 @@ except AttributeError:  # in Python 2.7
 
 logger = get_logger(__name__)
 DEFAULT_CACHE_TTL = '10'
+# Number of `--ids` jobs run concurrently, configurable as `core.max_concurrent_ids`
+DEFAULT_MAX_CONCURRENT_IDS = 10
+# Times an `--ids` job throttled by ARM (HTTP 429) is retried
+IDS_THROTTLING_RETRIES = 3
+IDS_THROTTLING_MAX_DELAY = 60
+# Seconds between the activity log queries reporting the progress of deployments in verbose mode
+PROGRESS_REPORT_INTERVAL = 10
+PROGRESS_REPORT_MAX_INTERVAL = 60
 
 
 def _explode_list_args(args):
@@ -262,6 +270,13 @@ class AzCliCommand(CLICommand):
     def __init__(self, loader, name, handler, description=None, table_transformer=None,
                  arguments_loader=None, description_loader=None,
                  formatter_class=None, deprecate_info=None, validator=None, **kwargs):
+        from azure.cli.core.commands.command_operation import CommandOperation
+        command_operation = kwargs.get('command_operation', None)
+        # Arguments and description extracted from the signature of the operation can be cached on disk, so that
+        # the operation isn't imported until the command runs
+        if type(command_operation) is CommandOperation:  # pylint: disable=unidiomatic-typecheck
+            arguments_loader = self._get_cached_loader(command_operation, arguments_loader, 'get_arguments')
+            description_loader = self._get_cached_loader(command_operation, description_loader, 'get_description')
         super(AzCliCommand, self).__init__(loader.cli_ctx, name, handler, description=description,
                                            table_transformer=table_transformer, arguments_loader=arguments_loader,
                                            description_loader=description_loader, formatter_class=formatter_class,
@@ -274,6 +289,18 @@ class AzCliCommand(CLICommand):
         self.confirmation = kwargs.get('confirmation', False)
         self.command_kwargs = kwargs
 
+    def _get_cached_loader(self, command_operation, loader, cache_method):
+        if not loader:
+            return loader
+
+        def cached_loader():
+            from azure.cli.core.commands.arguments_cache import CommandArgumentsCache
+            cache = CommandArgumentsCache.get(self.cli_ctx)
+            if cache is None:
+                return loader()
+            return getattr(cache, cache_method)(self, command_operation, loader)
+        return cached_loader
+
     # pylint: disable=no-self-use
     def _add_vscode_extension_metadata(self, arg, overrides):
         """ Adds metadata for use by the VSCode CLI extension. Do
@@ -494,6 +521,128 @@ def get_property(items, name):
 
 
 # pylint: disable=too-few-public-methods
+def _copy_cli_data(data):
+    """Copy the CLI context data for a job, copying the containers like 'headers' which the job may modify."""
+    return {k: copy.copy(v) if isinstance(v, (dict, list, set)) else v for k, v in data.items()}
+
+
+def _get_throttling_delay(ex, attempt):
+    """Get the seconds to wait before retrying a request failed with the given exception, or None if it wasn't
+    throttled. Respect the Retry-After header if present, else back off exponentially."""
+    import random
+    response = getattr(ex, 'response', None)
+    status_code = getattr(ex, 'status_code', None) or getattr(response, 'status_code', None)
+    if status_code != 429:
+        return None
+    try:
+        return min(float(response.headers['Retry-After']), IDS_THROTTLING_MAX_DELAY)
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return min(2 ** attempt + random.random(), IDS_THROTTLING_MAX_DELAY)
+
+
+class _PendingJob:  # pylint: disable=too-few-public-methods
+    """A job whose long-running operation is yet to be waited for."""
+
+    def __init__(self, poller, cmd):
+        self.poller = poller
+        self.cmd = cmd
+
+
+class _AdaptiveConcurrencyLimiter:
+    """Bound the number of concurrently running jobs. The bound is halved when a job is throttled, and grows back by
+    one after as many successful jobs as the current bound."""
+
+    def __init__(self, max_limit):
+        import threading
+        self.max_limit = self.limit = max_limit
+        self._running = 0
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self._running >= self.limit:
+                self._condition.wait()
+            self._running += 1
+
+    def release(self, throttled=False):
+        with self._condition:
+            self._running -= 1
+            if throttled:
+                self.limit = max(1, self.limit // 2)
+                self._successes = 0
+            elif self.limit < self.max_limit:
+                self._successes += 1
+                if self._successes >= self.limit:
+                    self.limit += 1
+                    self._successes = 0
+            self._condition.notify_all()
+
+
+def run_concurrently(func, items, max_workers=DEFAULT_MAX_CONCURRENT_IDS):
+    """Call the function with each item on a thread pool, returning (result, exception) pairs in the order of the
+    items.
+
+    Calls throttled by ARM (HTTP 429) are retried after the delay it asks for, and the number of running calls is
+    halved whenever one is throttled, then grows back as calls succeed.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    items = list(items)
+    if not items:
+        return []
+    limiter = _AdaptiveConcurrencyLimiter(max(1, max_workers))
+    outcomes = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+        tasks = [executor.submit(_call_throttled, limiter, func, item) for item in items]
+        for task in tasks:
+            try:
+                outcomes.append((task.result(), None))
+            except (Exception, SystemExit) as ex:  # pylint: disable=broad-except
+                outcomes.append((None, ex))
+    return outcomes
+
+
+def iter_concurrently(func, items, max_workers=DEFAULT_MAX_CONCURRENT_IDS):
+    """Like `run_concurrently`, but yield (item, result, exception) tuples in the order the calls complete, so the
+    results can be used as they arrive."""
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    items = list(items)
+    if not items:
+        return
+    limiter = _AdaptiveConcurrencyLimiter(max(1, max_workers))
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+        tasks = {executor.submit(_call_throttled, limiter, func, item): item for item in items}
+        try:
+            for task in as_completed(tasks):
+                try:
+                    yield tasks[task], task.result(), None
+                except (Exception, SystemExit) as ex:  # pylint: disable=broad-except
+                    yield tasks[task], None, ex
+        finally:
+            # don't start the calls left if the caller stops early
+            for task in tasks:
+                task.cancel()
+
+
+def _call_throttled(limiter, func, item):
+    attempt = 0
+    while True:
+        limiter.acquire()
+        throttled = False
+        try:
+            return func(item)
+        except Exception as ex:  # pylint: disable=broad-except
+            delay = _get_throttling_delay(ex, attempt)
+            throttled = delay is not None
+            if not throttled or attempt >= IDS_THROTTLING_RETRIES:
+                raise
+        finally:
+            limiter.release(throttled=throttled)
+        logger.info("Request throttled, retrying in %s seconds.", delay)
+        time.sleep(delay)
+        attempt += 1
+
+
 class AzCliCommandInvoker(CommandInvoker):
 
     # pylint: disable=too-many-statements,too-many-locals,too-many-branches
@@ -636,7 +785,7 @@ class AzCliCommandInvoker(CommandInvoker):
         for expanded_arg in _explode_list_args(parsed_args):
             cmd_copy = copy.copy(cmd)
             cmd_copy.cli_ctx = copy.copy(cmd.cli_ctx)
-            cmd_copy.cli_ctx.data = copy.deepcopy(cmd.cli_ctx.data)
+            cmd_copy.cli_ctx.data = _copy_cli_data(cmd.cli_ctx.data)
             expanded_arg.cmd = expanded_arg._cmd = cmd_copy
 
             if hasattr(expanded_arg, '_subscription'):
@@ -646,10 +795,12 @@ class AzCliCommandInvoker(CommandInvoker):
             jobs.append((expanded_arg, cmd_copy))
 
         ids = getattr(parsed_args, '_ids', None) or [None] * len(jobs)
-        if self.cli_ctx.config.getboolean('core', 'disable_concurrent_ids', False) or len(ids) < 2:
+        max_workers = self.cli_ctx.config.getint('core', 'max_concurrent_ids', DEFAULT_MAX_CONCURRENT_IDS)
+        if self.cli_ctx.config.getboolean('core', 'disable_concurrent_ids', False) or len(ids) < 2 or \
+                max_workers < 2:
             results, exceptions = self._run_jobs_serially(jobs, ids)
         else:
-            results, exceptions = self._run_jobs_concurrently(jobs, ids)
+            results, exceptions = self._run_jobs_concurrently(jobs, ids, max_workers)
 
         # handle exceptions
         if len(exceptions) == 1 and not results:
@@ -685,7 +836,8 @@ class AzCliCommandInvoker(CommandInvoker):
         return [(p.split('=', 1)[0] if p.startswith('--') else p[:2]) for p in args if
                 (p.startswith('-') and not p.startswith('---') and len(p) > 1)]
 
-    def _run_job(self, expanded_arg, cmd_copy):
+    def _run_job(self, expanded_arg, cmd_copy, wait_poller=True):
+        """Run a job. If `wait_poller` is False, return a `_PendingJob` instead of waiting for a poller."""
         params = self._filter_params(expanded_arg)
         try:
             result = cmd_copy(params)
@@ -699,14 +851,44 @@ class AzCliCommandInvoker(CommandInvoker):
                 result = transform_op(result)
 
             if _is_poller(result):
+                if not wait_poller:
+                    return _PendingJob(result, cmd_copy)
                 result = LongRunningOperation(cmd_copy.cli_ctx, 'Starting {}'.format(cmd_copy.name))(result)
             elif _is_paged(result):
                 result = list(result)
 
-            result = todict(result, AzCliCommandInvoker.remove_additional_prop_layer)
-            event_data = {'result': result}
-            cmd_copy.cli_ctx.raise_event(EVENT_INVOKER_TRANSFORM_RESULT, event_data=event_data)
-            return event_data['result']
+            return self._transform_job_result(result, cmd_copy)
+        except Exception as ex:  # pylint: disable=broad-except
+            if cmd_copy.exception_handler:
+                return cmd_copy.exception_handler(ex)
+            raise
+
+    @staticmethod
+    def _transform_job_result(result, cmd_copy):
+        result = todict(result, AzCliCommandInvoker.remove_additional_prop_layer)
+        event_data = {'result': result}
+        cmd_copy.cli_ctx.raise_event(EVENT_INVOKER_TRANSFORM_RESULT, event_data=event_data)
+        return event_data['result']
+
+    def _wait_pending_jobs(self, outcomes):
+        """Wait for the pollers of the pending jobs among the (result, exception) outcomes from one polling loop."""
+        pending = [index for index, (result, _) in enumerate(outcomes) if isinstance(result, _PendingJob)]
+        if not pending:
+            return
+        cmd_name = outcomes[pending[0]][0].cmd.name
+        operation = LongRunningOperation(self.cli_ctx, 'Starting {}'.format(cmd_name))
+        for index, (result, exception) in zip(pending, operation.wait_all(outcomes[i][0].poller for i in pending)):
+            try:
+                outcomes[index] = (self._finish_pending_job(outcomes[index][0].cmd, result, exception), None)
+            except (Exception, SystemExit) as ex:  # pylint: disable=broad-except
+                outcomes[index] = (None, ex)
+
+    @staticmethod
+    def _finish_pending_job(cmd_copy, result, exception):
+        try:
+            if exception is not None:
+                raise exception
+            return AzCliCommandInvoker._transform_job_result(result, cmd_copy)
         except Exception as ex:  # pylint: disable=broad-except
             if cmd_copy.exception_handler:
                 return cmd_copy.exception_handler(ex)
@@ -722,17 +904,21 @@ class AzCliCommandInvoker(CommandInvoker):
                 exceptions.append((ex, id_arg))
         return results, exceptions
 
-    def _run_jobs_concurrently(self, jobs, ids):
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        tasks, results, exceptions = [], [], []
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            for expanded_arg, cmd_copy in jobs:
-                tasks.append(executor.submit(self._run_job, expanded_arg, cmd_copy))
-            for index, task in enumerate(as_completed(tasks)):
-                try:
-                    results.append(task.result())
-                except (Exception, SystemExit) as ex:  # pylint: disable=broad-except
-                    exceptions.append((ex, ids[index]))
+    def _run_jobs_concurrently(self, jobs, ids, max_workers=DEFAULT_MAX_CONCURRENT_IDS):
+        """Run the jobs concurrently, returning results and (exception, id) pairs in the order of the jobs.
+
+        The number of running jobs is halved whenever one is throttled by ARM, and grows back as jobs succeed. The
+        long-running operations started by the jobs are waited for together, from a single polling loop.
+        """
+        outcomes = run_concurrently(lambda job: self._run_job(job[0], job[1], wait_poller=False), jobs, max_workers)
+        self._wait_pending_jobs(outcomes)
+
+        results, exceptions = [], []
+        for (result, exception), id_arg in zip(outcomes, ids):
+            if exception is None:
+                results.append(result)
+            else:
+                exceptions.append((exception, id_arg))
         return results, exceptions
 
     def resolve_warnings(self, cmd, parsed_args):
@@ -877,11 +1063,20 @@ class LongRunningOperation:  # pylint: disable=too-few-public-methods
         self.last_progress_report = datetime.datetime.now()
         self.progress_bar = progress_bar if progress_bar is not None else IndeterminateProgressBar(cli_ctx)
 
-    def _delay(self):
-        time.sleep(self.poller_done_interval_ms / 1000.0)
+    def _delay(self, poller=None):
+        """Wait for the poller to be done, at most `poller_done_interval_ms`."""
+        timeout = self.poller_done_interval_ms / 1000.0
+        if not callable(getattr(poller, 'wait', None)):
+            time.sleep(timeout)
+            return
+        try:
+            poller.wait(timeout)
+        except Exception:  # pylint: disable=broad-except
+            # the poller failed, the error is raised by `poller.result()`
+            pass
 
     def _generate_template_progress(self, correlation_id):  # pylint: disable=no-self-use
-        """ gets the progress for template deployments """
+        """ gets the progress for template deployments, returns whether there is any progress to report """
         from azure.cli.core.commands.client_factory import get_mgmt_service_client
         from azure.mgmt.monitor import MonitorManagementClient
 
@@ -898,6 +1093,7 @@ class LongRunningOperation:  # pylint: disable=too-few-public-methods
                 self.cli_ctx, MonitorManagementClient).activity_logs.list(filter=odata_filters)
 
             results = []
+            reported = False
             max_events = 50  # default max value for events in list_activity_log
             for index, item in enumerate(activity_log):
                 if index < max_events:
@@ -941,50 +1137,82 @@ class LongRunningOperation:  # pylint: disable=too-few-public-methods
                             result += ' (' + deploy_values.get('type', '') + ')'
 
                             if update:
+                                reported = True
                                 logger.info(result)
+            return reported
+        return False
 
     def __call__(self, poller):
-        from msrest.exceptions import ClientException
-        from azure.core.exceptions import HttpResponseError
+        (result, exception), = self.wait_all([poller])
+        if exception is not None:
+            raise exception
+        return result
+
+    def wait_all(self, pollers):
+        """Wait for all the pollers from a single polling loop.
 
+        :return: a (result, exception) pair for each poller, in the same order.
+        """
+        pollers = list(pollers)
         correlation_message = ''
         self.progress_bar.begin()
-        correlation_id = None
 
         cli_logger = get_logger()  # get CLI logger which has the level set through command lines
         is_verbose = any(handler.level <= logs.INFO for handler in cli_logger.handlers)
 
         telemetry.poll_start()
-        poll_flag = False
-        while not poller.done():
-            poll_flag = True
-
-            try:
-                # pylint: disable=protected-access
-                correlation_id = json.loads(
-                    poller._response.__dict__['_content'].decode())['properties']['correlationId']
-
-                correlation_message = 'Correlation ID: {}'.format(correlation_id)
-            except:  # pylint: disable=bare-except
-                pass
-
-            current_time = datetime.datetime.now()
-            if is_verbose and current_time - self.last_progress_report >= datetime.timedelta(seconds=10):
-                self.last_progress_report = current_time
+        pending = [poller for poller in pollers if not poller.done()]
+        poll_flag = bool(pending)
+        # the correlation ID of a deployment is in the initial response, so it is parsed once
+        correlation_ids = [correlation_id for correlation_id in map(_get_correlation_id, pending) if correlation_id]
+        if correlation_ids:
+            correlation_message = 'Correlation ID: {}'.format(', '.join(correlation_ids))
+        progress_interval = PROGRESS_REPORT_INTERVAL
+        try:
+            while pending:
+                current_time = datetime.datetime.now()
+                if is_verbose and correlation_ids and \
+                        current_time - self.last_progress_report >= datetime.timedelta(seconds=progress_interval):
+                    self.last_progress_report = current_time
+                    reported = False
+                    for correlation_id in correlation_ids:
+                        try:
+                            reported = self._generate_template_progress(correlation_id) or reported
+                        except Exception as ex:  # pylint: disable=broad-except
+                            logger.warning('%s during progress reporting: %s',
+                                           getattr(type(ex), '__name__', type(ex)), ex)
+                    # query the activity log less often while the deployment makes no progress, and not more often
+                    # than the service asks to poll the operation
+                    retry_after = max([_get_retry_after(poller) or 0 for poller in pending])
+                    progress_interval = max(PROGRESS_REPORT_INTERVAL, retry_after) if reported else \
+                        min(progress_interval * 2, PROGRESS_REPORT_MAX_INTERVAL)
+                try:
+                    self.progress_bar.update_progress()
+                    self._delay(pending[0])
+                except KeyboardInterrupt:
+                    self.progress_bar.stop()
+                    logger.error('Long-running operation wait cancelled.  %s', correlation_message)
+                    raise
+                pending = [poller for poller in pending if not poller.done()]
+
+            outcomes = []
+            for poller in pollers:
                 try:
-                    self._generate_template_progress(correlation_id)
+                    outcomes.append((self._get_result(poller), None))
                 except Exception as ex:  # pylint: disable=broad-except
-                    logger.warning('%s during progress reporting: %s', getattr(type(ex), '__name__', type(ex)), ex)
-            try:
-                self.progress_bar.update_progress()
-                self._delay()
-            except KeyboardInterrupt:
-                self.progress_bar.stop()
-                logger.error('Long-running operation wait cancelled.  %s', correlation_message)
-                raise
+                    outcomes.append((None, ex))
+            return outcomes
+        finally:
+            self.progress_bar.end()
+            if poll_flag:
+                telemetry.poll_end()
+
+    def _get_result(self, poller):
+        from msrest.exceptions import ClientException
+        from azure.core.exceptions import HttpResponseError
 
         try:
-            result = poller.result()
+            return poller.result()
         except (ClientException, HttpResponseError) as exception:
             from azure.cli.core.commands.arm import handle_long_running_operation_exception
             self.progress_bar.stop()
@@ -995,14 +1223,38 @@ class LongRunningOperation:  # pylint: disable=too-few-public-methods
                 return None
             if isinstance(exception, ClientException):
                 handle_long_running_operation_exception(exception)
-            else:
-                raise exception
-        finally:
-            self.progress_bar.end()
-            if poll_flag:
-                telemetry.poll_end()
+            raise exception
 
-        return result
+
+def _get_response_of_poller(poller, initial=False):
+    """Get the initial or the last response of a poller of msrest or azure-core."""
+    polling_method = getattr(poller, '_polling_method', None)
+    if initial:
+        # pylint: disable=protected-access
+        response = getattr(poller, '_response', None) or getattr(polling_method, '_initial_response', None)
+    else:
+        response = getattr(polling_method, '_response', None) or getattr(polling_method, '_pipeline_response', None)
+    return getattr(response, 'http_response', response)
+
+
+def _get_correlation_id(poller):
+    response = _get_response_of_poller(poller, initial=True)
+    try:
+        content = response.text() if callable(getattr(response, 'text', None)) else response.__dict__['_content']
+        if isinstance(content, bytes):
+            content = content.decode()
+        return json.loads(content)['properties']['correlationId']
+    except:  # pylint: disable=bare-except
+        return None
+
+
+def _get_retry_after(poller):
+    """Get the seconds the service asked to wait before polling the operation again, if any."""
+    response = _get_response_of_poller(poller)
+    try:
+        return float(response.headers['Retry-After'])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
 
 
 # pylint: disable=too-few-public-methods
@@ -1073,11 +1325,13 @@ def _load_module_command_loader(loader, args, mod):
 class ExtensionCommandSource:
     """ Class for commands contributed by an extension """
 
-    def __init__(self, overrides_command=False, extension_name=None, preview=False, experimental=False):
+    def __init__(self, overrides_command=False, extension_name=None, preview=False, experimental=False,
+                 extension_version=None):
         super(ExtensionCommandSource, self).__init__()
         # True if the command overrides a CLI command
         self.overrides_command = overrides_command
         self.extension_name = extension_name
+        self.extension_version = extension_version
         self.preview = preview
         self.experimental = experimental
 
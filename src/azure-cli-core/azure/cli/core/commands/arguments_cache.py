@@ -0,0 +1,158 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import sys
+import weakref
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+ARGUMENTS_CACHE_DIR = 'commandArgs'
+# Settings that `knack.introspection.extract_args_from_signature` produces for an argument
+_CACHED_SETTINGS = ('options_list', 'required', 'default', 'help', 'action')
+_JSON_TYPES = (str, int, float, bool, type(None))
+# The caches of CLI contexts. `cli_ctx.data` is not used, as it is deep-copied per command execution.
+_caches = weakref.WeakKeyDictionary()
+
+
+class CommandArgumentsCache:
+    """On-disk cache of the arguments and descriptions extracted from the signatures of command operations.
+
+    Extracting them imports the module of the operation, which for SDK operations is expensive. The cache is sharded
+    by the command module or extension providing the command, and a shard is discarded when the CLI version, the
+    version of the extension or the cloud profile changes. An entry is also discarded when the source file of the
+    operation is modified, if the operation is implemented in the module or extension itself.
+
+    Set `core.use_command_arguments_cache` to false to turn it off.
+    """
+
+    _VERSION = 'version'
+    _EXTENSION_VERSION = 'extensionVersion'
+    _CLOUD_PROFILE = 'cloudProfile'
+    _ARGUMENTS = 'arguments'
+    _DESCRIPTIONS = 'descriptions'
+
+    def __init__(self, cli_ctx):
+        from azure.cli.core import __version__
+        from knack.events import EVENT_CLI_POST_EXECUTE
+        self.cli_ctx = cli_ctx
+        self.version = __version__
+        self.cloud_profile = cli_ctx.cloud.profile
+        self.cache_dir = os.path.join(cli_ctx.config.config_dir, ARGUMENTS_CACHE_DIR)
+        self._shards = {}
+        self._dirty_shards = []
+        cli_ctx.register_event(EVENT_CLI_POST_EXECUTE, lambda _, **kwargs: self.save())
+
+    @classmethod
+    def get(cls, cli_ctx):
+        """Get the cache shared by the commands of the CLI context. Return None if the cache is turned off."""
+        if not cli_ctx.config.getboolean('core', 'use_command_arguments_cache', fallback=True):
+            return None
+        cache = _caches.get(cli_ctx)
+        if cache is None:
+            cache = _caches[cli_ctx] = cls(cli_ctx)
+        return cache
+
+    def get_arguments(self, command, command_operation, arguments_loader):
+        """Get the arguments of a command, calling `arguments_loader` and caching the result on a miss."""
+        from knack.arguments import CLICommandArgument
+        shard, key, mtime = self._locate(command, command_operation)
+        entry = shard[self._ARGUMENTS].get(key) if shard is not None else None
+        if entry and entry.get('mtime') == mtime:
+            return [(name, CLICommandArgument(name, **settings)) for name, settings in entry['value']]
+
+        cmd_args = arguments_loader()
+        value = []
+        for name, argument in cmd_args:
+            settings = dict(argument.type.settings)
+            if settings.pop('dest', None) != name or \
+                    any(k not in _CACHED_SETTINGS or not _is_json_value(v) for k, v in settings.items()):
+                logger.debug("Arguments of '%s' are not cached as '%s' can't be serialized.", command.name, name)
+                return cmd_args
+            value.append([name, settings])
+        self._set(shard, self._ARGUMENTS, key, mtime, value)
+        return cmd_args
+
+    def get_description(self, command, command_operation, description_loader):
+        """Get the description of a command, calling `description_loader` and caching the result on a miss."""
+        shard, key, mtime = self._locate(command, command_operation)
+        entry = shard[self._DESCRIPTIONS].get(key) if shard is not None else None
+        if entry and entry.get('mtime') == mtime:
+            return entry['value']
+
+        description = description_loader()
+        if isinstance(description, str):
+            self._set(shard, self._DESCRIPTIONS, key, mtime, description)
+        return description
+
+    def save(self):
+        for shard in self._dirty_shards:
+            try:
+                shard.save_with_retry()
+            except OSError as ex:
+                logger.debug("Failed to save command arguments cache %s: %s", shard.filename, ex)
+        self._dirty_shards = []
+
+    def _locate(self, command, command_operation):
+        """Get the shard, entry key and source file modified time of the command."""
+        from azure.cli.core.commands import ExtensionCommandSource
+        module_name = command.loader.__module__
+        # An extension can be updated without changing the CLI version
+        extension_version = command.command_source.extension_version \
+            if isinstance(command.command_source, ExtensionCommandSource) else None
+        merged_kwargs = command_operation.merged_kwargs
+        key = '|'.join([command_operation.op_path, merged_kwargs.get('operation_group') or '',
+                        merged_kwargs.get('doc_string_source') or ''])
+        return self._get_shard(module_name, extension_version), key, \
+            _get_source_mtime(module_name, command_operation.op_path)
+
+    def _get_shard(self, module_name, extension_version=None):
+        from azure.cli.core._session import Session
+        if module_name not in self._shards:
+            shard = Session()
+            try:
+                if not os.path.isdir(self.cache_dir):
+                    os.makedirs(self.cache_dir)
+                shard.load(os.path.join(self.cache_dir, module_name + '.json'))
+            except OSError as ex:
+                logger.debug("Failed to load command arguments cache of %s: %s", module_name, ex)
+                shard = None
+            if shard is not None and (shard.get(self._VERSION) != self.version or
+                                      shard.get(self._EXTENSION_VERSION) != extension_version or
+                                      shard.get(self._CLOUD_PROFILE) != self.cloud_profile):
+                shard.data = {self._VERSION: self.version, self._EXTENSION_VERSION: extension_version,
+                              self._CLOUD_PROFILE: self.cloud_profile, self._ARGUMENTS: {}, self._DESCRIPTIONS: {}}
+            self._shards[module_name] = shard
+        return self._shards[module_name]
+
+    def _set(self, shard, section, key, mtime, value):
+        if shard is not None:
+            shard[section][key] = {'mtime': mtime, 'value': value}
+            if not any(s is shard for s in self._dirty_shards):
+                self._dirty_shards.append(shard)
+
+
+def _is_json_value(value):
+    if isinstance(value, list):
+        return all(type(v) in _JSON_TYPES for v in value)  # pylint: disable=unidiomatic-typecheck
+    # Subclasses like enums or DefaultStr don't survive a JSON round trip
+    return type(value) in _JSON_TYPES  # pylint: disable=unidiomatic-typecheck
+
+
+def _get_source_mtime(module_name, op_path):
+    """Get the modified time of the source file of an operation inside the given module, without importing it."""
+    op_module = op_path.split('#', 1)[0]
+    module = sys.modules.get(module_name)
+    if not op_module.startswith(module_name + '.') or not getattr(module, '__file__', None):
+        return None
+    path = os.path.join(os.path.dirname(module.__file__), *op_module[len(module_name) + 1:].split('.'))
+    for source in (path + '.py', os.path.join(path, '__init__.py')):
+        try:
+            return os.stat(source).st_mtime
+        except OSError:
+            continue
+    return None
@@ -26,6 +26,14 @@ from knack.util import todict, CLIError
 logger = get_logger(__name__)
 EXCLUDED_NON_CLIENT_PARAMS = list(set(EXCLUDED_PARAMS) - set(['self', 'client']))
 
+RESOURCE_ID_CACHE_FILE = 'resourceIdCache.json'
+# minutes to keep the IDs of the resources found by name, configurable as `core.resource_id_cache_ttl`
+DEFAULT_RESOURCE_ID_CACHE_TTL = 60
+
+# (cache file, scope, key) of the IDs served from the cache in this process. Kept at module level rather than in
+# cli_ctx.data, which the invoker copies for each job.
+_cached_resource_ids_in_use = set()
+
 
 # pylint:disable=too-many-lines
 class ArmTemplateBuilder:
@@ -172,6 +180,95 @@ def resource_exists(cli_ctx, resource_group, name, namespace, type, **_):  # pyl
     return existing
 
 
+def get_resource_ids_by_name(cli_ctx, resource_type, name, refresh=False):
+    """
+    Get the IDs of the resources of a type with the given name in the current subscription, e.g. to find the resource
+    group of a resource given by name only.
+
+    The resources are looked up with a single query filtered by type and name, and the IDs found are cached per
+    subscription in a JSON file in the config dir for `core.resource_id_cache_ttl` minutes. Set the TTL to 0 to turn
+    the cache off. The IDs served from the cache are dropped if the command fails with a 404, see
+    `invalidate_cached_resource_ids`.
+
+    :param str resource_type: The resource type, e.g. 'Microsoft.KeyVault/vaults'
+    :param str name: The name of the resource, case-insensitive
+    :param bool refresh: Look the resource up again, e.g. when the cached ID turned out to be stale
+    :return: The IDs of the matching resources, empty if none is found
+    :rtype: list
+    """
+    import os
+    import time
+    from azure.cli.core._session import Session
+    from azure.cli.core.commands.client_factory import get_subscription_id
+
+    ttl = int(cli_ctx.config.get('core', 'resource_id_cache_ttl', DEFAULT_RESOURCE_ID_CACHE_TTL)) * 60
+    scope = '{}/{}'.format(cli_ctx.cloud.name, get_subscription_id(cli_ctx))
+    key = '{}/{}'.format(resource_type, name).lower()
+    cache_file = os.path.join(cli_ctx.config.config_dir, RESOURCE_ID_CACHE_FILE)
+    session = Session()
+    if ttl > 0:
+        try:
+            session.load(cache_file)
+        except OSError as ex:
+            logger.debug('Failed to load the resource ID cache: %s', ex)
+        entry = session.data.get(scope, {}).get(key)
+        if entry and entry.get('time', 0) + ttl > time.time() and not refresh:
+            logger.debug("Found the IDs of resource '%s' of type '%s' in the local cache.", name, resource_type)
+            _cached_resource_ids_in_use.add((cache_file, scope, key))
+            return entry['ids']
+
+    odata_filter = "resourceType eq '{}' and name eq '{}'".format(resource_type, name)
+    client = get_mgmt_service_client(cli_ctx, ResourceType.MGMT_RESOURCE_RESOURCES).resources
+    ids = [r.id for r in client.list(filter=odata_filter) if r.name.lower() == name.lower()]
+
+    # resources not found aren't cached, they may be created at any time
+    if ttl > 0 and (ids or refresh):
+        now = time.time()
+        entries = session.data.setdefault(scope, {})
+        for expired in [k for k, e in entries.items() if e.get('time', 0) + ttl <= now]:
+            del entries[expired]
+        entries.pop(key, None)
+        if ids:
+            entries[key] = {'time': now, 'ids': ids}
+        try:
+            session.save_with_retry()
+        except OSError as ex:
+            logger.debug('Failed to save the resource ID cache: %s', ex)
+    return ids
+
+
+def is_not_found_error(ex):
+    """ Whether the exception is a 404 of a management or data plane request. """
+    from azure.core.exceptions import ResourceNotFoundError
+    if isinstance(ex, ResourceNotFoundError):
+        return True
+    status_code = getattr(ex, 'status_code', None) or getattr(getattr(ex, 'response', None), 'status_code', None)
+    return status_code == 404
+
+
+def invalidate_cached_resource_ids():
+    """
+    Drop the IDs served from the cache by `get_resource_ids_by_name` in this process, e.g. when the command failed
+    with a 404 because a resource was deleted and recreated in another resource group within the TTL.
+    """
+    from azure.cli.core._session import Session
+
+    by_file = {}
+    while _cached_resource_ids_in_use:
+        cache_file, scope, key = _cached_resource_ids_in_use.pop()
+        by_file.setdefault(cache_file, []).append((scope, key))
+    for cache_file, keys in by_file.items():
+        session = Session()
+        try:
+            session.load(cache_file)
+            for scope, key in keys:
+                logger.debug("Dropping the cached IDs of '%s', they may be stale.", key)
+                session.data.get(scope, {}).pop(key, None)
+            session.save_with_retry()
+        except OSError as ex:
+            logger.debug('Failed to drop the IDs from the resource ID cache: %s', ex)
+
+
 # pylint: disable=too-many-statements
 def register_ids_argument(cli_ctx):
 
@@ -297,6 +297,22 @@ def check_version_compatibility(azext_metadata):
         raise CLIError("\n".join(min_max_msgs))
 
 
+def _get_extension_modname_or_none(ext_name, ext_dir):
+    try:
+        return get_extension_modname(ext_name=ext_name, ext_dir=ext_dir)
+    except (AssertionError, OSError) as ex:
+        logger.debug("Failed to get the module name of extension '%s': %s", ext_name, ex)
+        return None
+
+
+def _invalidate_command_index(ext_modname, reindex=True):
+    # Only update the entries of the extension if its module is known. Otherwise rebuild the whole command index.
+    if ext_modname:
+        CommandIndex().invalidate_extension(ext_modname, reindex=reindex)
+    else:
+        CommandIndex().invalidate()
+
+
 def add_extension(cmd=None, source=None, extension_name=None, index_url=None, yes=None,  # pylint: disable=unused-argument, too-many-statements
                   pip_extra_index_urls=None, pip_proxy=None, system=None,
                   version=None, cli_ctx=None, upgrade=None):
@@ -345,7 +361,7 @@ def add_extension(cmd=None, source=None, extension_name=None, index_url=None, ye
                            "Please use with discretion.", extension_name)
         elif extension_name and ext.preview:
             logger.warning("The installed extension '%s' is in preview.", extension_name)
-        CommandIndex().invalidate()
+        _invalidate_command_index(_get_extension_modname_or_none(ext.name, ext.path))
     except ExtensionNotInstalledException:
         pass
 
@@ -364,8 +380,9 @@ def remove_extension(extension_name):
                 "`azdev extension remove {name}`".format(name=extension_name))
         # We call this just before we remove the extension so we can get the metadata before it is gone
         _augment_telemetry_with_ext_info(extension_name, ext)
+        ext_modname = _get_extension_modname_or_none(ext.name, ext.path)
         shutil.rmtree(ext.path, onerror=log_err)
-        CommandIndex().invalidate()
+        _invalidate_command_index(ext_modname, reindex=False)
     except ExtensionNotInstalledException as e:
         raise CLIError(e)
 
@@ -421,7 +438,7 @@ def update_extension(cmd=None, extension_name=None, index_url=None, pip_extra_in
             logger.debug('Copying %s to %s', backup_dir, extension_path)
             shutil.copytree(backup_dir, extension_path)
             raise CLIError('Failed to update. Rolled {} back to {}.'.format(extension_name, cur_version))
-        CommandIndex().invalidate()
+        _invalidate_command_index(_get_extension_modname_or_none(extension_name, extension_path))
     except ExtensionNotInstalledException as e:
         raise CLIError(e)
 
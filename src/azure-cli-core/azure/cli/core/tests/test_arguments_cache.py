@@ -0,0 +1,105 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from knack.introspection import extract_args_from_signature
+
+from azure.cli.core.commands.arguments_cache import CommandArgumentsCache
+
+
+def sample_operation(resource_group_name, name, tags=None, no_wait=False, count=3):
+    """Sample operation.
+    :param resource_group_name: The name of the resource group.
+    :param name: The name of the resource.
+    """
+    pass
+
+
+def sample_operation_with_object_default(name, options=object()):
+    pass
+
+
+class TestCommandArgumentsCache(unittest.TestCase):
+
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.cli_ctx = mock.MagicMock()
+        self.cli_ctx.config.config_dir = self.config_dir
+        self.cli_ctx.cloud.profile = 'latest'
+        self.command = mock.MagicMock()
+        self.command.loader.__module__ = 'azure.cli.command_modules.sample'
+        self.command_operation = mock.MagicMock(op_path='azure.mgmt.sample.operations#SampleOperations.create',
+                                                merged_kwargs={'operation_group': 'samples'})
+
+    def tearDown(self):
+        shutil.rmtree(self.config_dir)
+
+    def _get_arguments(self, operation, cache=None):
+        cache = cache or CommandArgumentsCache(self.cli_ctx)
+        loader = mock.MagicMock(side_effect=lambda: list(extract_args_from_signature(operation)))
+        cmd_args = cache.get_arguments(self.command, self.command_operation, loader)
+        cache.save()
+        return cmd_args, loader.call_count
+
+    def test_arguments_cache_round_trip(self):
+        expected, calls = self._get_arguments(sample_operation)
+        self.assertEqual(calls, 1)
+
+        cmd_args, calls = self._get_arguments(sample_operation)
+        self.assertEqual(calls, 0)
+        self.assertEqual([name for name, _ in cmd_args], [name for name, _ in expected])
+        for (_, actual_arg), (_, expected_arg) in zip(cmd_args, expected):
+            self.assertEqual(actual_arg.type.settings, expected_arg.type.settings)
+        self.assertEqual(dict(cmd_args)['no_wait'].type.settings['action'], 'store_true')
+        self.assertEqual(dict(cmd_args)['name'].type.settings['help'], 'The name of the resource.')
+
+    def test_arguments_cache_skips_unserializable_arguments(self):
+        self._get_arguments(sample_operation_with_object_default)
+        _, calls = self._get_arguments(sample_operation_with_object_default)
+        self.assertEqual(calls, 1)
+
+    def test_arguments_cache_is_discarded_on_version_or_profile_change(self):
+        self._get_arguments(sample_operation)
+        with mock.patch('azure.cli.core.__version__', '9.9.9'):
+            _, calls = self._get_arguments(sample_operation)
+        self.assertEqual(calls, 1)
+
+        self.cli_ctx.cloud.profile = '2019-03-01-hybrid'
+        _, calls = self._get_arguments(sample_operation)
+        self.assertEqual(calls, 1)
+
+    def test_arguments_cache_of_extension_is_discarded_on_extension_update(self):
+        from azure.cli.core.commands import ExtensionCommandSource
+        self.command.loader.__module__ = 'azext_sample'
+        self.command.command_source = ExtensionCommandSource(extension_name='sample', extension_version='1.0.0')
+        self._get_arguments(sample_operation)
+        _, calls = self._get_arguments(sample_operation)
+        self.assertEqual(calls, 0)
+
+        self.command.command_source = ExtensionCommandSource(extension_name='sample', extension_version='1.1.0')
+        _, calls = self._get_arguments(sample_operation)
+        self.assertEqual(calls, 1)
+
+    def test_description_cache(self):
+        loader = mock.MagicMock(return_value='Create a sample.')
+        cache = CommandArgumentsCache(self.cli_ctx)
+        self.assertEqual(cache.get_description(self.command, self.command_operation, loader), 'Create a sample.')
+        cache.save()
+        cache = CommandArgumentsCache(self.cli_ctx)
+        self.assertEqual(cache.get_description(self.command, self.command_operation, loader), 'Create a sample.')
+        self.assertEqual(loader.call_count, 1)
+
+        # Another operation group of the same operation is a different entry
+        self.command_operation.merged_kwargs = {'operation_group': 'others'}
+        cache.get_description(self.command, self.command_operation, loader)
+        self.assertEqual(loader.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from azure.cli.core.commands import (AzCliCommandInvoker, LongRunningOperation, _PendingJob, _copy_cli_data,
+                                     _get_throttling_delay, _get_correlation_id, _get_retry_after)
+
+
+class _ThrottledError(Exception):
+    def __init__(self, retry_after=None):
+        super(_ThrottledError, self).__init__('Too many requests')
+        self.status_code = 429
+        self.response = mock.MagicMock(headers={'Retry-After': retry_after} if retry_after else {})
+
+
+class _FakePoller(object):
+    """Poller done after being waited for the given times."""
+
+    def __init__(self, result, waits=1, exception=None):
+        self._result = result
+        self._waits = waits
+        self._exception = exception
+        self.done_calls = 0
+        # the initial response of a msrest poller and the last response of its polling method
+        self._response = SimpleNamespace(_content=b'{"properties": {"correlationId": "cid"}}')
+        self._polling_method = SimpleNamespace(_response=SimpleNamespace(headers={'Retry-After': '15'}))
+
+    def done(self):
+        self.done_calls += 1
+        return self._waits <= 0
+
+    def wait(self, timeout=None):
+        self._waits -= 1
+
+    def result(self):
+        if self._exception:
+            raise self._exception
+        return self._result
+
+
+class TestLongRunningOperation(unittest.TestCase):
+
+    def setUp(self):
+        self.operation = LongRunningOperation(mock.MagicMock(), progress_bar=mock.MagicMock())
+
+    def test_wait_all_pollers_from_one_loop(self):
+        pollers = [_FakePoller('a', waits=1), _FakePoller('b', waits=3), _FakePoller(None, exception=ValueError('x'))]
+        outcomes = self.operation.wait_all(pollers)
+        self.assertEqual([result for result, _ in outcomes], ['a', 'b', None])
+        self.assertEqual([type(ex) for _, ex in outcomes], [type(None), type(None), ValueError])
+        self.operation.progress_bar.end.assert_called_once_with()
+
+    def test_call_raises_error_of_poller(self):
+        self.assertEqual(self.operation(_FakePoller('a')), 'a')
+        with self.assertRaises(ValueError):
+            self.operation(_FakePoller(None, exception=ValueError('x')))
+
+    def test_poller_hints(self):
+        poller = _FakePoller('a')
+        self.assertEqual(_get_correlation_id(poller), 'cid')
+        self.assertEqual(_get_retry_after(poller), 15)
+        self.assertIsNone(_get_correlation_id(object()))
+        self.assertIsNone(_get_retry_after(object()))
+
+
+class TestIdsFanOut(unittest.TestCase):
+
+    def setUp(self):
+        self.invoker = object.__new__(AzCliCommandInvoker)
+        self.lock = threading.Lock()
+        self.running, self.peak = 0, 0
+
+    def _run(self, run_job, count, max_workers=4):
+        jobs = [(i, mock.MagicMock(exception_handler=None)) for i in range(count)]
+        ids = ['id{}'.format(i) for i in range(count)]
+        with mock.patch.object(AzCliCommandInvoker, '_run_job', side_effect=run_job), \
+                mock.patch('time.sleep'):
+            return self.invoker._run_jobs_concurrently(jobs, ids, max_workers)
+
+    def _track(self, job):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.001)
+        with self.lock:
+            self.running -= 1
+        return job
+
+    def test_ids_results_keep_order_and_bound_concurrency(self):
+        def _run_job(job, _, **kwargs):
+            self._track(job)
+            if job % 3 == 0:
+                raise ValueError(job)
+            return job
+
+        results, exceptions = self._run(_run_job, 20)
+        self.assertEqual(results, [i for i in range(20) if i % 3])
+        self.assertEqual([(ex.args[0], id_arg) for ex, id_arg in exceptions],
+                         [(i, 'id{}'.format(i)) for i in range(20) if i % 3 == 0])
+        self.assertLessEqual(self.peak, 4)
+
+    def test_ids_throttled_jobs_are_retried(self):
+        attempts = {}
+
+        def _run_job(job, _, **kwargs):
+            attempts[job] = attempts.get(job, 0) + 1
+            if job == 1 and attempts[job] < 3:
+                raise _ThrottledError()
+            if job == 2:
+                raise _ThrottledError('1')
+            return job
+
+        results, exceptions = self._run(_run_job, 4)
+        self.assertEqual(results, [0, 1, 3])
+        self.assertEqual(attempts[1], 3)
+        self.assertEqual(attempts[2], 4)
+        self.assertEqual([id_arg for _, id_arg in exceptions], ['id2'])
+
+    def test_ids_long_running_operations_are_waited_together(self):
+        def _run_job(job, cmd, wait_poller=True):
+            self.assertFalse(wait_poller)
+            return _PendingJob(_FakePoller(job, exception=ValueError(job) if job == 1 else None), cmd)
+
+        self.invoker.cli_ctx = mock.MagicMock()
+        with mock.patch.object(AzCliCommandInvoker, '_transform_job_result', side_effect=lambda r, _: r * 10), \
+                mock.patch.object(LongRunningOperation, 'wait_all', autospec=True,
+                                  side_effect=LongRunningOperation.wait_all) as wait_all:
+            results, exceptions = self._run(_run_job, 3)
+        self.assertEqual(wait_all.call_count, 1)
+        self.assertEqual(results, [0, 20])
+        self.assertEqual([id_arg for _, id_arg in exceptions], ['id1'])
+
+    def test_iter_concurrently_yields_as_completed(self):
+        from azure.cli.core.commands import iter_concurrently
+        others_done = threading.Event()
+
+        def _call(item):
+            if item == 'slow':
+                others_done.wait(5)
+            elif item == 'bad':
+                raise ValueError(item)
+            return item.upper()
+
+        outcomes = []
+        for item, result, ex in iter_concurrently(_call, ['slow', 'fast', 'bad'], max_workers=3):
+            outcomes.append((item, result, str(ex) if ex else None))
+            if len(outcomes) == 2:
+                others_done.set()
+        self.assertEqual(outcomes[-1], ('slow', 'SLOW', None))
+        self.assertCountEqual(outcomes[:2], [('fast', 'FAST', None), ('bad', None, 'bad')])
+
+    def test_get_throttling_delay(self):
+        self.assertIsNone(_get_throttling_delay(ValueError(), 0))
+        self.assertEqual(_get_throttling_delay(_ThrottledError('7'), 0), 7)
+        self.assertEqual(_get_throttling_delay(_ThrottledError('3600'), 0), 60)
+        self.assertTrue(4 <= _get_throttling_delay(_ThrottledError(), 2) < 5)
+
+    def test_copy_cli_data(self):
+        data = {'headers': {'CommandName': 'vm show'}, 'command': 'vm show'}
+        data_copy = _copy_cli_data(data)
+        data_copy['headers']['CommandName'] = 'vm list'
+        data_copy['subscription_id'] = 'sub'
+        self.assertEqual(data, {'headers': {'CommandName': 'vm show'}, 'command': 'vm show'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -160,10 +160,10 @@ class TestCommandRegistration(unittest.TestCase):
             return "azext_always_loaded"
 
     def _mock_get_extensions():
-        MockExtension = namedtuple('Extension', ['name', 'preview', 'experimental', 'path', 'get_metadata'])
-        return [MockExtension(name=__name__ + '.ExtCommandsLoader', preview=False, experimental=False, path=None, get_metadata=lambda: {}),
-                MockExtension(name=__name__ + '.Ext2CommandsLoader', preview=False, experimental=False, path=None, get_metadata=lambda: {}),
-                MockExtension(name=__name__ + '.ExtAlwaysLoadedCommandsLoader', preview=False, experimental=False, path=None, get_metadata=lambda: {})]
+        MockExtension = namedtuple('Extension', ['name', 'preview', 'experimental', 'path', 'get_metadata', 'version'])
+        return [MockExtension(name=__name__ + '.ExtCommandsLoader', preview=False, experimental=False, path=None, get_metadata=lambda: {}, version='1.0.0'),
+                MockExtension(name=__name__ + '.Ext2CommandsLoader', preview=False, experimental=False, path=None, get_metadata=lambda: {}, version='1.0.0'),
+                MockExtension(name=__name__ + '.ExtAlwaysLoadedCommandsLoader', preview=False, experimental=False, path=None, get_metadata=lambda: {}, version='1.0.0')]
 
     def _mock_load_command_loader(loader, args, name, prefix):
 
@@ -275,6 +275,8 @@ class TestCommandRegistration(unittest.TestCase):
 
         def _set_index(dict_):
             INDEX[CommandIndex._COMMAND_INDEX] = dict_
+            # Fall back to the top-level index, like an index built before the command path index was added
+            INDEX[CommandIndex._COMMAND_PATH_INDEX] = {}
 
         def _check_index():
             self.assertEqual(INDEX[CommandIndex._COMMAND_INDEX_VERSION], __version__)
@@ -382,8 +384,9 @@ class TestCommandRegistration(unittest.TestCase):
         cmd_tbl = loader.load_command_table(["hello", "overridden"])
         hello_overridden_cmd = cmd_tbl['hello overridden']
         self.assertTrue(isinstance(hello_overridden_cmd.command_source, ExtensionCommandSource))
+        self.assertTrue(hello_overridden_cmd.command_source.overrides_command)
         _check_index()
-        self.assertListEqual(list(cmd_tbl), ['hello mod-only', 'hello overridden', 'hello ext-only'])
+        self.assertListEqual(list(cmd_tbl), ['hello mod-only', 'hello overridden'])
 
         del INDEX[CommandIndex._COMMAND_INDEX_VERSION]
         del INDEX[CommandIndex._COMMAND_INDEX_CLOUD_PROFILE]
@@ -436,13 +439,150 @@ class TestCommandRegistration(unittest.TestCase):
         # Test command index is used by command with positional argument
         cmd_tbl = loader.load_command_table(["hello", "mod-only", "positional_argument"])
         self.assertDictEqual(INDEX[CommandIndex._COMMAND_INDEX], self.expected_command_index)
-        self.assertEqual(list(cmd_tbl), ['hello mod-only', 'hello overridden', 'hello ext-only'])
+        self.assertEqual(list(cmd_tbl), ['hello mod-only', 'hello overridden'])
 
         # Test command index is used by command with positional argument
         cmd_tbl = loader.load_command_table(["extra", "final", "positional_argument2"])
         self.assertDictEqual(INDEX[CommandIndex._COMMAND_INDEX], self.expected_command_index)
         self.assertEqual(list(cmd_tbl), ['extra final'])
 
+    @mock.patch('importlib.import_module', _mock_import_lib)
+    @mock.patch('pkgutil.iter_modules', _mock_iter_modules)
+    @mock.patch('azure.cli.core.commands._load_command_loader', _mock_load_command_loader)
+    @mock.patch('azure.cli.core.extension.get_extension_modname', _mock_get_extension_modname)
+    @mock.patch('azure.cli.core.extension.get_extensions', _mock_get_extensions)
+    def test_command_path_index(self):
+        from azure.cli.core._session import INDEX
+        from azure.cli.core import CommandIndex
+
+        cli = DummyCli()
+        loader = cli.commands_loader
+        index = CommandIndex(cli)
+        index.invalidate()
+
+        loader.load_command_table(None)
+        self.assertDictEqual(INDEX[CommandIndex._COMMAND_PATH_INDEX], {
+            'hello mod-only': ['azure.cli.command_modules.hello'],
+            'hello overridden': ['azure.cli.command_modules.hello', 'azext_hello2'],
+            'hello ext-only': ['azext_hello1'],
+            'extra final': ['azure.cli.command_modules.extra']})
+
+        # Only the module providing the command is loaded
+        self.assertEqual(index.get(['hello', 'ext-only', '--debug']), ([], ['azext_hello1']))
+        cmd_tbl = loader.load_command_table(['hello', 'ext-only'])
+        self.assertListEqual(list(cmd_tbl), ['hello ext-only'])
+
+        # All modules providing commands in a group are loaded for the group
+        self.assertEqual(index.get(['hello', '-h']), (['hello'], ['azext_hello2', 'azext_hello1']))
+        cmd_tbl = loader.load_command_table(['hello', '-h'])
+        self.assertListEqual(list(cmd_tbl), self.expected_command_table[:2] + self.expected_command_table[3:])
+
+        # Fall back to the top-level index when the command path index is outdated
+        INDEX[CommandIndex._COMMAND_PATH_INDEX] = {'hello mod-only': ['azure.cli.command_modules.extra']}
+        self.assertEqual(index.get(['hello', 'mod-only'], use_command_path=False),
+                         (['hello'], ['azext_hello2', 'azext_hello1']))
+        cmd_tbl = loader.load_command_table(['hello', 'mod-only'])
+        self.assertListEqual(list(cmd_tbl), ['hello mod-only', 'hello overridden', 'hello ext-only'])
+
+        index.invalidate()
+        self.assertFalse(INDEX[CommandIndex._COMMAND_PATH_INDEX])
+
+    @mock.patch('importlib.import_module', _mock_import_lib)
+    @mock.patch('pkgutil.iter_modules', _mock_iter_modules)
+    @mock.patch('azure.cli.core.commands._load_command_loader', _mock_load_command_loader)
+    @mock.patch('azure.cli.core.extension.get_extension_modname', _mock_get_extension_modname)
+    @mock.patch('azure.cli.core.extension.get_extensions', _mock_get_extensions)
+    def test_command_index_incremental_update(self):
+        from azure.cli.core._session import INDEX
+        from azure.cli.core import CommandIndex
+
+        cli = DummyCli()
+        loader = cli.commands_loader
+        index = CommandIndex(cli)
+        index.invalidate()
+        loader.load_command_table(None)
+        expected_command_path_index = dict(INDEX[CommandIndex._COMMAND_PATH_INDEX])
+
+        with mock.patch.object(CommandIndex, 'update') as update:
+            # Installing an extension only indexes the extension
+            index.invalidate_extension('azext_hello1')
+            self.assertEqual(INDEX[CommandIndex._COMMAND_INDEX]['hello'],
+                             ['azure.cli.command_modules.hello', 'azext_hello2'])
+            self.assertNotIn('hello ext-only', INDEX[CommandIndex._COMMAND_PATH_INDEX])
+            self.assertEqual(index.get_pending_modules(), ([], ['azext_hello1']))
+
+            cmd_tbl = loader.load_command_table(['hello', 'ext-only'])
+            self.assertListEqual(list(cmd_tbl), ['hello ext-only'])
+            self.assertEqual(index.get_pending_modules(), ([], []))
+            self.assertDictEqual(INDEX[CommandIndex._COMMAND_INDEX], self.expected_command_index)
+            self.assertDictEqual(INDEX[CommandIndex._COMMAND_PATH_INDEX], expected_command_path_index)
+
+            # Removing an extension drops its entries
+            index.invalidate_extension('azext_hello2', reindex=False)
+            self.assertEqual(INDEX[CommandIndex._COMMAND_PATH_INDEX]['hello overridden'],
+                             ['azure.cli.command_modules.hello'])
+            self.assertEqual(index.get_pending_modules(), ([], []))
+            update.assert_not_called()
+
+    @mock.patch('importlib.import_module', _mock_import_lib)
+    @mock.patch('pkgutil.iter_modules', _mock_iter_modules)
+    @mock.patch('azure.cli.core.commands._load_command_loader', _mock_load_command_loader)
+    @mock.patch('azure.cli.core.extension.get_extension_modname', _mock_get_extension_modname)
+    @mock.patch('azure.cli.core.extension.get_extensions', _mock_get_extensions)
+    def test_command_index_lazy_rebuild_after_upgrade(self):
+        from azure.cli.core._session import INDEX
+        from azure.cli.core import CommandIndex
+
+        cli = DummyCli()
+        loader = cli.commands_loader
+        CommandIndex(cli).invalidate()
+        loader.load_command_table(None)
+        expected_command_path_index = dict(INDEX[CommandIndex._COMMAND_PATH_INDEX])
+
+        with mock.patch("azure.cli.core.__version__", "9.9.9"), \
+                mock.patch.object(CommandIndex, 'update') as update:
+            # Top-level commands are re-indexed one at a time, instead of loading all modules
+            cmd_tbl = loader.load_command_table(['hello', 'mod-only'])
+            self.assertListEqual(list(cmd_tbl), ['hello mod-only', 'hello overridden', 'hello ext-only'])
+            self.assertEqual(INDEX[CommandIndex._COMMAND_INDEX_VERSION], '9.9.9')
+            self.assertEqual(INDEX[CommandIndex._COMMAND_INDEX_STALE], ['extra'])
+
+            # Once re-indexed, the command path index is used again
+            cmd_tbl = loader.load_command_table(['hello', 'mod-only'])
+            self.assertListEqual(list(cmd_tbl), ['hello mod-only', 'hello overridden'])
+
+            cmd_tbl = loader.load_command_table(['extra', 'final'])
+            self.assertListEqual(list(cmd_tbl), ['extra final'])
+            self.assertEqual(INDEX[CommandIndex._COMMAND_INDEX_STALE], [])
+            self.assertDictEqual(INDEX[CommandIndex._COMMAND_INDEX], self.expected_command_index)
+            self.assertDictEqual(INDEX[CommandIndex._COMMAND_PATH_INDEX], expected_command_path_index)
+            update.assert_not_called()
+
+    @mock.patch('importlib.import_module', _mock_import_lib)
+    @mock.patch('pkgutil.iter_modules', _mock_iter_modules)
+    @mock.patch('azure.cli.core.commands._load_command_loader', _mock_load_command_loader)
+    @mock.patch('azure.cli.core.extension.get_extension_modname', _mock_get_extension_modname)
+    @mock.patch('azure.cli.core.extension.get_extensions', _mock_get_extensions)
+    def test_command_index_rebuilt_after_upgrade_removing_module(self):
+        from azure.cli.core._session import INDEX
+        from azure.cli.core import CommandIndex
+
+        cli = DummyCli()
+        loader = cli.commands_loader
+        CommandIndex(cli).invalidate()
+        loader.load_command_table(None)
+        # A module of the previous CLI version, which the current version doesn't have any more
+        INDEX[CommandIndex._COMMAND_INDEX]['hello'].append('azure.cli.command_modules.removed')
+        INDEX[CommandIndex._COMMAND_INDEX]['removed'] = ['azure.cli.command_modules.removed']
+
+        with mock.patch("azure.cli.core.__version__", "9.9.9"):
+            self.assertIsNone(CommandIndex(cli).get(['hello', 'mod-only']))
+            cmd_tbl = loader.load_command_table(['hello', 'mod-only'])
+            self.assertListEqual(list(cmd_tbl), self.expected_command_table)
+            self.assertEqual(INDEX[CommandIndex._COMMAND_INDEX_VERSION], '9.9.9')
+            self.assertEqual(INDEX[CommandIndex._COMMAND_INDEX_STALE], [])
+            self.assertDictEqual(INDEX[CommandIndex._COMMAND_INDEX], self.expected_command_index)
+
     def test_argument_with_overrides(self):
 
         global_vm_name_type = CLIArgumentType(
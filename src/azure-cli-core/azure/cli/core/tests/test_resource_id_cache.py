@@ -0,0 +1,89 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from azure.cli.core.commands.arm import (get_resource_ids_by_name, invalidate_cached_resource_ids,
+                                         is_not_found_error)
+
+VAULT_ID = '/subscriptions/sub/resourceGroups/rg/providers/Microsoft.KeyVault/vaults/MyVault'
+
+
+def _resource(resource_id):
+    resource = mock.MagicMock(id=resource_id)
+    resource.name = resource_id.split('/')[-1]
+    return resource
+
+
+@mock.patch('azure.cli.core.commands.client_factory.get_subscription_id', return_value='sub')
+class TestResourceIdCache(unittest.TestCase):
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.client = mock.MagicMock()
+        self.client.resources.list.return_value = [_resource(VAULT_ID)]
+        patcher = mock.patch('azure.cli.core.commands.arm.get_mgmt_service_client', return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.config_dir)
+
+    def _cli_ctx(self, ttl=None):
+        cli_ctx = mock.MagicMock()
+        cli_ctx.cloud.name = 'AzureCloud'
+        cli_ctx.config.config_dir = self.config_dir
+        cli_ctx.config.get.side_effect = lambda section, key, default=None: ttl if ttl is not None else default
+        return cli_ctx
+
+    def test_get_resource_ids_by_name_filtered_and_cached(self, _):
+        self.assertEqual(get_resource_ids_by_name(self._cli_ctx(), 'Microsoft.KeyVault/vaults', 'myvault'),
+                         [VAULT_ID])
+        self.client.resources.list.assert_called_once_with(
+            filter="resourceType eq 'Microsoft.KeyVault/vaults' and name eq 'myvault'")
+
+        self.assertEqual(get_resource_ids_by_name(self._cli_ctx(), 'Microsoft.KeyVault/vaults', 'MyVault'),
+                         [VAULT_ID])
+        self.assertEqual(self.client.resources.list.call_count, 1)
+
+        with mock.patch('time.time', return_value=10 ** 12):
+            get_resource_ids_by_name(self._cli_ctx(), 'Microsoft.KeyVault/vaults', 'MyVault')
+        self.assertEqual(self.client.resources.list.call_count, 2)
+
+        get_resource_ids_by_name(self._cli_ctx(), 'Microsoft.KeyVault/vaults', 'MyVault', refresh=True)
+        self.assertEqual(self.client.resources.list.call_count, 3)
+
+    def test_get_resource_ids_by_name_not_found_or_uncached(self, _):
+        self.client.resources.list.return_value = []
+        self.assertEqual(get_resource_ids_by_name(self._cli_ctx(), 'Microsoft.KeyVault/vaults', 'other'), [])
+        self.assertEqual(get_resource_ids_by_name(self._cli_ctx(), 'Microsoft.KeyVault/vaults', 'other'), [])
+        self.assertEqual(self.client.resources.list.call_count, 2)
+
+        self.client.resources.list.return_value = [_resource(VAULT_ID)]
+        get_resource_ids_by_name(self._cli_ctx(ttl='0'), 'Microsoft.KeyVault/vaults', 'MyVault')
+        get_resource_ids_by_name(self._cli_ctx(ttl='0'), 'Microsoft.KeyVault/vaults', 'MyVault')
+        self.assertEqual(self.client.resources.list.call_count, 4)
+
+    def test_cached_ids_dropped_after_not_found(self, _):
+        from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
+        get_resource_ids_by_name(self._cli_ctx(), 'Microsoft.KeyVault/vaults', 'MyVault')
+        get_resource_ids_by_name(self._cli_ctx(), 'Microsoft.KeyVault/vaults', 'MyVault')
+        self.assertEqual(self.client.resources.list.call_count, 1)
+
+        invalidate_cached_resource_ids()
+        get_resource_ids_by_name(self._cli_ctx(), 'Microsoft.KeyVault/vaults', 'MyVault')
+        self.assertEqual(self.client.resources.list.call_count, 2)
+
+        self.assertTrue(is_not_found_error(ResourceNotFoundError('gone')))
+        self.assertTrue(is_not_found_error(mock.MagicMock(spec=['status_code'], status_code=404)))
+        self.assertTrue(is_not_found_error(mock.MagicMock(spec=['response'], response=mock.MagicMock(status_code=404))))
+        self.assertFalse(is_not_found_error(HttpResponseError('throttled')))
+        self.assertFalse(is_not_found_error(ValueError('bad')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from azure.cli.core._session import Session
+
+
+class TestSession(unittest.TestCase):
+
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.config_dir, 'az.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.config_dir)
+
+    def _read(self):
+        with open(self.filename, encoding='utf-8-sig') as f:
+            return json.load(f)
+
+    def test_session_saves_direct_modifications(self):
+        session = Session()
+        session.load(self.filename)
+        session['a'] = 1
+        self.assertEqual(self._read(), {'a': 1})
+        del session['a']
+        self.assertEqual(self._read(), {})
+
+    def test_session_deferred_save_is_flushed_once(self):
+        session = Session()
+        session.load(self.filename)
+        session.defer_save()
+        session['a'] = 1
+        session['b'] = 2
+        del session['b']
+        self.assertEqual(self._read(), {})
+
+        session.flush()
+        self.assertEqual(self._read(), {'a': 1})
+        self.assertEqual(session.data, {'a': 1})
+
+    def test_session_flush_merges_concurrent_changes(self):
+        session = Session()
+        session.load(self.filename)
+        session['shared'] = 'old'
+        session['removed'] = True
+        session.defer_save()
+
+        other = Session()
+        other.load(self.filename)
+        other['other'] = 'kept'
+        other['shared'] = 'theirs'
+
+        session['shared'] = 'mine'
+        del session['removed']
+        session.flush()
+        self.assertEqual(self._read(), {'shared': 'mine', 'other': 'kept'})
+        self.assertEqual(session.data, self._read())
+
+    def test_session_saved_immediately_after_post_execute_flush(self):
+        from azure.cli.core import _flush_sessions
+        session = Session()
+        session.load(self.filename)
+        session.defer_save()
+        session['a'] = 1
+        _flush_sessions([session])
+        self.assertEqual(self._read(), {'a': 1})
+
+        # e.g. the version check of the auto-upgrade, after the command is executed
+        session['versions'] = {'core': '2.24.0'}
+        self.assertEqual(self._read(), {'a': 1, 'versions': {'core': '2.24.0'}})
+
+    def test_session_load_flushes_pending_changes(self):
+        session = Session()
+        session.load(self.filename)
+        session.defer_save()
+        session['a'] = 1
+        session.load(self.filename)
+        self.assertEqual(session.data, {'a': 1})
+
+    def test_session_save_replaces_file(self):
+        session = Session()
+        session.load(self.filename)
+        session['a'] = 1
+        os.chmod(self.filename, 0o640)
+        session['a'] = 2
+        self.assertEqual(self._read(), {'a': 2})
+        self.assertEqual(os.stat(self.filename).st_mode & 0o777, 0o640)
+        self.assertEqual(sorted(os.listdir(self.config_dir)), ['az.json', 'az.json.lock'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -59,6 +59,7 @@ DEPENDENCIES = [
     'msrestazure>=0.6.3',
     'paramiko>=2.0.8,<3.0.0',
     'pkginfo>=1.5.0.1',
+    'portalocker~=1.6',
     'PyJWT==1.7.1',
     'pyopenssl>=17.1.0',  # https://github.com/pyca/pyopenssl/pull/612
     'requests~=2.22',
@@ -3,10 +3,12 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import io
 import tarfile
 import os
 import re
 import codecs
+import time
 from io import open
 import requests
 from knack.log import get_logger
@@ -19,27 +21,30 @@ from ._constants import TASK_VALID_VSTS_URLS
 logger = get_logger(__name__)
 
 
+# size of the blocks the archived source code is uploaded in, and number of blocks uploaded concurrently
+UPLOAD_BLOCK_SIZE = 4 * 1024 * 1024
+UPLOAD_MAX_CONNECTIONS = 4
+SOURCE_UPLOAD_CACHE_FILE = 'acrSourceUploadCache.json'
+# minutes to reuse the upload of an unchanged source code, configurable as `acr.source_upload_cache_ttl`
+DEFAULT_SOURCE_UPLOAD_CACHE_TTL = 60
+
+
 def upload_source_code(cmd, client,
                        registry_name,
                        resource_group_name,
                        source_location,
-                       tar_file_path,
                        docker_file_path,
                        docker_file_in_tar):
-    _pack_source_code(source_location,
-                      tar_file_path,
-                      docker_file_path,
-                      docker_file_in_tar)
+    cache = _SourceUploadCache(cmd.cli_ctx, registry_name, resource_group_name)
+    source_hash = None
+    if cache.enabled:
+        source_hash = _get_source_code_hash(source_location, docker_file_path, docker_file_in_tar)
+        relative_path = cache.get(source_hash)
+        if relative_path:
+            logger.warning("Source code is unchanged since its last upload. Sending context to registry: %s...",
+                           registry_name)
+            return relative_path
 
-    size = os.path.getsize(tar_file_path)
-    unit = 'GiB'
-    for S in ['Bytes', 'KiB', 'MiB', 'GiB']:
-        if size < 1024:
-            unit = S
-            break
-        size = size / 1024.0
-
-    logger.warning("Uploading archived source code from '%s'...", tar_file_path)
     upload_url = None
     relative_path = None
     try:
@@ -54,67 +59,232 @@ def upload_source_code(cmd, client,
         raise CLIError("Failed to get a SAS URL to upload context.")
 
     account_name, endpoint_suffix, container_name, blob_name, sas_token = get_blob_info(upload_url)
-    BlockBlobService = get_sdk(cmd.cli_ctx, ResourceType.DATA_STORAGE, 'blob#BlockBlobService')
-    BlockBlobService(account_name=account_name,
-                     sas_token=sas_token,
-                     endpoint_suffix=endpoint_suffix).create_blob_from_path(
-                         container_name=container_name,
-                         blob_name=blob_name,
-                         file_path=tar_file_path)
+    BlockBlobService, BlobBlock = get_sdk(cmd.cli_ctx, ResourceType.DATA_STORAGE,
+                                          'blob#BlockBlobService', 'blob#BlobBlock')
+    blob_service = BlockBlobService(account_name=account_name,
+                                    sas_token=sas_token,
+                                    endpoint_suffix=endpoint_suffix)
+
+    # the archive is uploaded while it is packed, without being written to disk
+    logger.warning("Packing and uploading source code...")
+    with _BlockBlobWriter(blob_service, BlobBlock, container_name, blob_name) as blob_writer:
+        with tarfile.open(fileobj=blob_writer, mode="w|gz") as tar:
+            _pack_source_code(tar, source_location, docker_file_path, docker_file_in_tar)
+
+    size = blob_writer.size
+    unit = 'GiB'
+    for S in ['Bytes', 'KiB', 'MiB', 'GiB']:
+        if size < 1024:
+            unit = S
+            break
+        size = size / 1024.0
+
     logger.warning("Sending context ({0:.3f} {1}) to registry: {2}...".format(
         size, unit, registry_name))
+    if source_hash:
+        cache.set(source_hash, relative_path)
     return relative_path
 
 
-def _pack_source_code(source_location, tar_file_path, docker_file_path, docker_file_in_tar):
-    logger.warning("Packing source code into tar to upload...")
+class _BlockBlobWriter:
+    """
+    Write-only file object uploading what is written to a block blob, in blocks uploaded concurrently. The blob is
+    committed when the writer is closed.
+    """
+
+    def __init__(self, blob_service, blob_block_type, container_name, blob_name,
+                 block_size=UPLOAD_BLOCK_SIZE, max_connections=UPLOAD_MAX_CONNECTIONS):
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        self.size = 0
+        self._blob_service = blob_service
+        self._blob_block_type = blob_block_type
+        self._container_name = container_name
+        self._blob_name = blob_name
+        self._block_size = block_size
+        self._buffer = bytearray()
+        self._block_ids = []
+        self._futures = []
+        self._executor = ThreadPoolExecutor(max_workers=max_connections)
+        # bound the blocks held in memory while they are uploaded
+        self._pending_blocks = threading.BoundedSemaphore(max_connections * 2)
+
+    def write(self, data):
+        self._buffer.extend(data)
+        self.size += len(data)
+        while len(self._buffer) >= self._block_size:
+            self._put_block(bytes(self._buffer[:self._block_size]))
+            del self._buffer[:self._block_size]
+        return len(data)
+
+    def _put_block(self, block):
+        # raise the error of a failed upload as soon as possible
+        for future in self._futures:
+            if future.done() and future.exception():
+                raise future.exception()
+        # block ids are base64 encoded by the SDK and must all have the same length
+        block_id = '{:08d}'.format(len(self._block_ids))
+        self._block_ids.append(block_id)
+        self._pending_blocks.acquire()
+        future = self._executor.submit(self._blob_service.put_block, self._container_name, self._blob_name,
+                                       block, block_id)
+        future.add_done_callback(lambda _: self._pending_blocks.release())
+        self._futures.append(future)
+
+    def close(self):
+        try:
+            if self._buffer or not self._block_ids:
+                self._put_block(bytes(self._buffer))
+                self._buffer = bytearray()
+            for future in self._futures:
+                future.result()
+            self._blob_service.put_block_list(self._container_name, self._blob_name,
+                                              [self._blob_block_type(id=block_id) for block_id in self._block_ids])
+        finally:
+            self._executor.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            for future in self._futures:
+                future.cancel()
+            self._executor.shutdown(wait=False)
+
+
+class _SourceHasher:
+    """
+    Tar file like object computing the SHA-256 hash of the names, sizes, modified times, modes, link targets and
+    contents of the files added to it, streaming the contents rather than packing them.
+    """
+
+    def __init__(self):
+        import hashlib
+        self.hash = hashlib.sha256()
+        # only used to create the TarInfo objects of the files
+        self._tar = tarfile.TarFile(fileobj=io.BytesIO(), mode='w')
+
+    def gettarinfo(self, name, arcname):
+        return self._tar.gettarinfo(name, arcname)
+
+    def addfile(self, tarinfo, fileobj=None):
+        self.hash.update(repr((tarinfo.name, tarinfo.type, tarinfo.size, tarinfo.mtime, tarinfo.mode,
+                               tarinfo.linkname)).encode('utf-8', 'surrogateescape'))
+        if fileobj is not None:
+            for block in iter(lambda: fileobj.read(UPLOAD_BLOCK_SIZE), b''):
+                self.hash.update(block)
+
+
+def _get_source_code_hash(source_location, docker_file_path, docker_file_in_tar):
+    # the hash of the files that would be uploaded, including the Dockerfile, without packing and compressing them
+    hasher = _SourceHasher()
+    _pack_source_code(hasher, source_location, docker_file_path, docker_file_in_tar, log=False)
+    return hasher.hash.hexdigest()
+
+
+class _SourceUploadCache:
+    """
+    Cache of the source code uploaded to a registry by the hash of its archive, backed by a JSON file in the config
+    dir, so that unchanged source code isn't uploaded again for `acr.source_upload_cache_ttl` minutes. Set the TTL
+    to 0 to turn the cache off.
+    """
+
+    def __init__(self, cli_ctx, registry_name, resource_group_name):
+        from azure.cli.core.commands.client_factory import get_subscription_id
+        self.cli_ctx = cli_ctx
+        self.ttl = int(cli_ctx.config.get('acr', 'source_upload_cache_ttl', DEFAULT_SOURCE_UPLOAD_CACHE_TTL)) * 60
+        self.enabled = self.ttl > 0
+        self._scope = None
+        if self.enabled:
+            self._scope = '{}/{}/{}/{}'.format(cli_ctx.cloud.name, get_subscription_id(cli_ctx),
+                                               resource_group_name, registry_name).lower()
+        self._session = None
+
+    def get(self, source_hash):
+        entry = self._get_session().get(self._scope, {}).get(source_hash)
+        if entry and entry.get('time', 0) + self.ttl > time.time():
+            return entry['relative_path']
+        return None
+
+    def set(self, source_hash, relative_path):
+        now = time.time()
+        session = self._get_session()
+        for scope, entries in list(session.data.items()):
+            for expired in [k for k, e in entries.items() if e.get('time', 0) + self.ttl <= now]:
+                del entries[expired]
+            if not entries:
+                del session.data[scope]
+        session.data.setdefault(self._scope, {})[source_hash] = {'time': now, 'relative_path': relative_path}
+        try:
+            session.save_with_retry()
+        except OSError as ex:
+            logger.debug('Failed to save the source upload cache: %s', ex)
+
+    def _get_session(self):
+        if self._session is None:
+            from azure.cli.core._session import Session
+            self._session = Session()
+            try:
+                self._session.load(os.path.join(self.cli_ctx.config.config_dir, SOURCE_UPLOAD_CACHE_FILE))
+            except OSError as ex:
+                logger.debug('Failed to load the source upload cache: %s', ex)
+        return self._session
+
+
+def _pack_source_code(tar, source_location, docker_file_path, docker_file_in_tar, log=True):
+    if log:
+        logger.warning("Packing source code into tar to upload...")
 
     original_docker_file_name = os.path.basename(docker_file_path.replace("\\", os.sep))
     ignore_list, ignore_list_size = _load_dockerignore_file(source_location, original_docker_file_name)
+    matcher = DockerIgnoreMatcher(ignore_list) if ignore_list is not None else None
     common_vcs_ignore_list = {'.git', '.gitignore', '.bzr', 'bzrignore', '.hg', '.hgignore', '.svn'}
 
-    def _ignore_check(tarinfo, parent_ignored, parent_matching_rule_index):
+    def _ignore_check(name, parent_ignored, parent_matching_rule_index):
         # ignore common vcs dir or file
-        if tarinfo.name in common_vcs_ignore_list:
-            logger.warning("Excluding '%s' based on default ignore rules", tarinfo.name)
+        if name in common_vcs_ignore_list:
+            if log:
+                logger.warning("Excluding '%s' based on default ignore rules", name)
             return True, parent_matching_rule_index
 
-        if ignore_list is None:
+        if matcher is None:
             # if .dockerignore doesn't exists, inherit from parent
             # eg, it will ignore the files under .git folder.
             return parent_ignored, parent_matching_rule_index
 
-        for index, item in enumerate(ignore_list):
-            # stop checking the remaining rules whose priorities are lower than the parent matching rule
-            # at this point, current item should just inherit from parent
-            if index >= parent_matching_rule_index:
-                break
-            if re.match(item.pattern, tarinfo.name):
-                logger.debug(".dockerignore: rule '%s' matches '%s'.",
-                             item.rule, tarinfo.name)
-                return item.ignore, index
+        # only the rules whose priorities are higher than the parent matching rule are checked,
+        # otherwise the item should just inherit from parent
+        index = matcher.match(name, parent_matching_rule_index)
+        if index is not None:
+            logger.debug(".dockerignore: rule '%s' matches '%s'.", ignore_list[index].rule, name)
+            return ignore_list[index].ignore, index
 
-        logger.debug(".dockerignore: no rule for '%s'. parent ignore '%s'",
-                     tarinfo.name, parent_ignored)
+        logger.debug(".dockerignore: no rule for '%s'. parent ignore '%s'", name, parent_ignored)
         # inherit from parent
         return parent_ignored, parent_matching_rule_index
 
-    with tarfile.open(tar_file_path, "w:gz") as tar:
-        # need to set arcname to empty string as the archive root path
-        _archive_file_recursively(tar,
-                                  source_location,
-                                  arcname="",
-                                  parent_ignored=False,
-                                  parent_matching_rule_index=ignore_list_size,
-                                  ignore_check=_ignore_check)
+    def _may_include_below(name, matching_rule_index):
+        return matcher is not None and matcher.may_include_below(name, matching_rule_index)
+
+    # need to set arcname to empty string as the archive root path
+    _archive_file_recursively(tar,
+                              source_location,
+                              arcname="",
+                              parent_ignored=False,
+                              parent_matching_rule_index=ignore_list_size,
+                              ignore_check=_ignore_check,
+                              may_include_below=_may_include_below)
 
-        # Add the Dockerfile if it's specified.
-        # In the case of run, there will be no Dockerfile.
-        if docker_file_path:
-            docker_file_tarinfo = tar.gettarinfo(
-                docker_file_path, docker_file_in_tar)
-            with open(docker_file_path, "rb") as f:
-                tar.addfile(docker_file_tarinfo, f)
+    # Add the Dockerfile if it's specified.
+    # In the case of run, there will be no Dockerfile.
+    if docker_file_path:
+        docker_file_tarinfo = tar.gettarinfo(
+            docker_file_path, docker_file_in_tar)
+        with open(docker_file_path, "rb") as f:
+            tar.addfile(docker_file_tarinfo, f)
 
 
 class IgnoreRule:  # pylint: disable=too-few-public-methods
@@ -145,6 +315,62 @@ class IgnoreRule:  # pylint: disable=too-few-public-methods
         self.pattern += "$"
 
 
+class DockerIgnoreMatcher:
+    """
+    Match names against a list of ignore rules, from the highest priority to the lowest, with a single regex.
+    """
+
+    # characters of a rule which aren't translated into a regex, and can make it match across path separators
+    _REGEX_CHARS = set('[](){}+|^$\\')
+
+    def __init__(self, ignore_list):
+        self.regex = re.compile('|'.join('(?P<r{}>{})'.format(index, item.pattern)
+                                         for index, item in enumerate(ignore_list))) if ignore_list else None
+        # the path tokens of the exception rules, None for tokens which can match any number of path segments
+        self._exceptions = [(index, self._get_token_regexes(item.rule[1:]))
+                            for index, item in enumerate(ignore_list) if not item.ignore]
+
+    def match(self, name, max_index):
+        """Get the index of the highest priority rule matching the name, if it is lower than max_index."""
+        match = self.regex.match(name) if self.regex else None
+        if not match:
+            return None
+        # the alternatives are tried in order, so the first one matching is the highest priority rule
+        index = int(match.lastgroup[1:]) if match.lastgroup and match.lastgroup.startswith('r') else \
+            next(int(k[1:]) for k, v in match.groupdict().items() if v is not None)
+        return index if index < max_index else None
+
+    def may_include_below(self, dir_name, max_index):
+        """Whether an exception rule whose index is lower than max_index may match an item below the dir."""
+        segments = dir_name.split('/') if dir_name else []
+        for index, tokens in self._exceptions:
+            if index >= max_index:
+                break
+            if self._may_match_below(tokens, segments):
+                return True
+        return False
+
+    @staticmethod
+    def _may_match_below(tokens, segments):
+        for token, segment in zip(tokens, segments):
+            if token is None:
+                return True
+            if not token.match(segment):
+                return False
+        return len(tokens) > len(segments)
+
+    @classmethod
+    def _get_token_regexes(cls, rule):
+        token_regexes = []
+        for token in rule.split('/'):
+            if token == "**" or cls._REGEX_CHARS.intersection(token):
+                token_regexes.append(None)
+            else:
+                token_regexes.append(re.compile("^" + token.replace(
+                    "*", "[^/]*").replace("?", "[^/]").replace(".", "\\.") + "$"))
+        return token_regexes
+
+
 def _load_dockerignore_file(source_location, original_docker_file_name):
     # reference: https://docs.docker.com/engine/reference/builder/#dockerignore-file
     docker_ignore_file = os.path.join(source_location, ".dockerignore")
@@ -181,31 +407,40 @@ def _load_dockerignore_file(source_location, original_docker_file_name):
     return ignore_list, len(ignore_list)
 
 
-def _archive_file_recursively(tar, name, arcname, parent_ignored, parent_matching_rule_index, ignore_check):
-    # create a TarInfo object from the file
-    tarinfo = tar.gettarinfo(name, arcname)
+def _archive_file_recursively(tar, name, arcname, parent_ignored, parent_matching_rule_index, ignore_check,
+                              may_include_below, is_dir=None):
+    # check if the file/dir is ignored by its name in the archive, before it is stat'ed
+    name_in_tar = arcname.replace(os.sep, "/").lstrip("/")
+    ignored, matching_rule_index = ignore_check(name_in_tar, parent_ignored, parent_matching_rule_index)
 
-    if tarinfo is None:
-        raise CLIError("tarfile: unsupported type {}".format(name))
+    if not ignored:
+        # create a TarInfo object from the file
+        tarinfo = tar.gettarinfo(name, arcname)
 
-    # check if the file/dir is ignored
-    ignored, matching_rule_index = ignore_check(
-        tarinfo, parent_ignored, parent_matching_rule_index)
+        if tarinfo is None:
+            raise CLIError("tarfile: unsupported type {}".format(name))
 
-    if not ignored:
         # append the tar header and data to the archive
         if tarinfo.isreg():
             with open(name, "rb") as f:
                 tar.addfile(tarinfo, f)
         else:
             tar.addfile(tarinfo)
-
-    # even the dir is ignored, its child items can still be included, so continue to scan
-    if tarinfo.isdir():
-        for f in os.listdir(name):
-            _archive_file_recursively(tar, os.path.join(name, f), os.path.join(arcname, f),
+        is_dir = tarinfo.isdir()
+    elif is_dir is None:
+        is_dir = os.path.isdir(name) and not os.path.islink(name)
+
+    # even the dir is ignored, its child items can still be included by an exception rule, so continue to scan
+    # unless no exception rule can match below it
+    if is_dir:
+        if ignored and not may_include_below(name_in_tar, matching_rule_index):
+            logger.debug("Skipping ignored directory '%s'.", name)
+            return
+        for entry in sorted(os.scandir(name), key=lambda e: e.name):
+            _archive_file_recursively(tar, entry.path, os.path.join(arcname, entry.name),
                                       parent_ignored=ignored, parent_matching_rule_index=matching_rule_index,
-                                      ignore_check=ignore_check)
+                                      ignore_check=ignore_check, may_include_below=may_include_below,
+                                      is_dir=entry.is_dir(follow_symlinks=False))
 
 
 def check_remote_source_code(source_location):
@@ -3,15 +3,13 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 import os
-import uuid
-import tempfile
 
 from knack.util import CLIError
 from knack.log import get_logger
 
 from msrestazure.azure_exceptions import CloudError
 from azure.cli.core.commands import LongRunningOperation
-from azure.cli.core.commands.parameters import get_resources_in_subscription
+from azure.cli.core.commands.arm import get_resource_ids_by_name
 
 from ._constants import (
     REGISTRY_RESOURCE_TYPE,
@@ -32,14 +30,12 @@ from ._archive_utils import upload_source_code, check_remote_source_code
 logger = get_logger(__name__)
 
 
-def _arm_get_resource_by_name(cli_ctx, resource_name, resource_type):
-    """Returns the ARM resource in the current subscription with resource_name.
+def _arm_get_resource_id_by_name(cli_ctx, resource_name, resource_type):
+    """Returns the ID of the ARM resource in the current subscription with resource_name.
     :param str resource_name: The name of resource
     :param str resource_type: The type of resource
     """
-    result = get_resources_in_subscription(cli_ctx, resource_type)
-    elements = [item for item in result if item.name.lower() ==
-                resource_name.lower()]
+    elements = get_resource_ids_by_name(cli_ctx, resource_type, resource_name)
 
     if not elements:
         from azure.cli.core._profile import Profile
@@ -82,10 +78,10 @@ def get_resource_group_name_by_registry_name(cli_ctx, registry_name,
     :param str resource_group_name: The name of resource group
     """
     if not resource_group_name:
-        arm_resource = _arm_get_resource_by_name(
+        resource_id = _arm_get_resource_id_by_name(
             cli_ctx, registry_name, REGISTRY_RESOURCE_TYPE)
         resource_group_name = _get_resource_group_name_by_resource_id(
-            arm_resource.id)
+            resource_id)
     return resource_group_name
 
 
@@ -93,9 +89,8 @@ def get_resource_id_by_registry_name(cli_ctx, registry_name):
     """Returns the resource id for the container registry.
     :param str storage_account_name: The name of container registry
     """
-    arm_resource = _arm_get_resource_by_name(
+    return _arm_get_resource_id_by_name(
         cli_ctx, registry_name, REGISTRY_RESOURCE_TYPE)
-    return arm_resource.id
 
 
 def get_registry_by_name(cli_ctx, registry_name, resource_group_name=None):
@@ -415,22 +410,12 @@ def prepare_source_location(cmd, source_location, client_registries, registry_na
             raise CLIError(
                 "Source location should be a local directory path or remote URL.")
 
-        tar_file_path = os.path.join(tempfile.gettempdir(
-        ), 'cli_source_archive_{}.tar.gz'.format(uuid.uuid4().hex))
-
         try:
             source_location = upload_source_code(
                 cmd, client_registries, registry_name, resource_group_name,
-                source_location, tar_file_path, "", "")
+                source_location, "", "")
         except Exception as err:
             raise CLIError(err)
-        finally:
-            try:
-                logger.debug(
-                    "Deleting the archived source code from '%s'...", tar_file_path)
-                os.remove(tar_file_path)
-            except OSError:
-                pass
     else:
         source_location = check_remote_source_code(source_location)
         logger.warning("Sending context to registry: %s...", registry_name)
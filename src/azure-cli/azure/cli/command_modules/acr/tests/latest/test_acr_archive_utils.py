@@ -0,0 +1,172 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+from unittest import mock
+
+from azure.cli.command_modules.acr._archive_utils import (
+    upload_source_code, _BlockBlobWriter, _pack_source_code, _get_source_code_hash, DockerIgnoreMatcher, IgnoreRule)
+
+
+class _FakeBlockBlobService(object):
+    blobs = {}
+
+    def __init__(self, **kwargs):
+        self.blocks = {}
+
+    def put_block(self, container_name, blob_name, block, block_id):
+        self.blocks[block_id] = block
+
+    def put_block_list(self, container_name, blob_name, block_list):
+        _FakeBlockBlobService.blobs[blob_name] = b''.join(self.blocks[b.id] for b in block_list)
+
+
+class _FakeBlobBlock(object):
+    def __init__(self, id=None):  # pylint: disable=redefined-builtin
+        self.id = id
+
+
+class TestAcrArchiveUtils(unittest.TestCase):
+
+    def setUp(self):
+        self.source_dir = tempfile.mkdtemp()
+        self.config_dir = tempfile.mkdtemp()
+        for name, content in [('Dockerfile', 'FROM scratch'), ('app.py', 'print(1)'), ('.dockerignore', '*.log'),
+                              ('debug.log', 'ignored')]:
+            with open(os.path.join(self.source_dir, name), 'w') as f:
+                f.write(content)
+
+        self.cmd = mock.MagicMock()
+        self.cmd.cli_ctx.cloud.name = 'AzureCloud'
+        self.cmd.cli_ctx.config.config_dir = self.config_dir
+        self.cmd.cli_ctx.config.get.side_effect = lambda section, key, default=None: default
+        self.client = mock.MagicMock()
+        self.client.get_build_source_upload_url.side_effect = lambda *_: mock.MagicMock(
+            upload_url='https://account.blob.core.windows.net/container/source{}.tar.gz?sig=1'.format(
+                self.client.get_build_source_upload_url.call_count),
+            relative_path='source{}.tar.gz'.format(self.client.get_build_source_upload_url.call_count))
+        _FakeBlockBlobService.blobs = {}
+
+        for patcher in [mock.patch('azure.cli.command_modules.acr._archive_utils.get_sdk',
+                                   return_value=(_FakeBlockBlobService, _FakeBlobBlock)),
+                        mock.patch('azure.cli.core.commands.client_factory.get_subscription_id', return_value='sub')]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.source_dir)
+        shutil.rmtree(self.config_dir)
+
+    def _upload(self):
+        return upload_source_code(self.cmd, self.client, 'myregistry', 'myrg', self.source_dir,
+                                  os.path.join(self.source_dir, 'Dockerfile'), 'abc_Dockerfile')
+
+    def test_upload_source_code_streamed(self):
+        self.assertEqual(self._upload(), 'source1.tar.gz')
+        with tarfile.open(fileobj=io.BytesIO(_FakeBlockBlobService.blobs['source1.tar.gz']), mode='r:gz') as tar:
+            self.assertEqual(sorted(tar.getnames()), ['', '.dockerignore', 'Dockerfile', 'abc_Dockerfile', 'app.py'])
+            self.assertEqual(tar.extractfile('app.py').read(), b'print(1)')
+
+    def test_upload_of_unchanged_source_code_reused(self):
+        self.assertEqual(self._upload(), 'source1.tar.gz')
+        self.assertEqual(self._upload(), 'source1.tar.gz')
+        self.assertEqual(self.client.get_build_source_upload_url.call_count, 1)
+
+        with open(os.path.join(self.source_dir, 'app.py'), 'w') as f:
+            f.write('print(2)')
+        self.assertEqual(self._upload(), 'source2.tar.gz')
+
+        self.cmd.cli_ctx.config.get.side_effect = lambda section, key, default=None: '0'
+        self.assertEqual(self._upload(), 'source3.tar.gz')
+
+    def test_source_code_hash_of_contents(self):
+        def _hash():
+            return _get_source_code_hash(self.source_dir, os.path.join(self.source_dir, 'Dockerfile'),
+                                         'abc_Dockerfile')
+
+        def _write(name, content):
+            # keep the size and modified time, like `cp -p` of a file of the same size
+            path = os.path.join(self.source_dir, name)
+            stat = os.stat(path)
+            with open(path, 'w') as f:
+                f.write(content)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        source_hash = _hash()
+        _write('app.py', 'print(2)')
+        self.assertNotEqual(_hash(), source_hash)
+        source_hash = _hash()
+        # the files which are ignored don't count, unlike the Dockerfile
+        with open(os.path.join(self.source_dir, 'debug.log'), 'w') as f:
+            f.write('changed')
+        self.assertEqual(_hash(), source_hash)
+        _write('Dockerfile', 'FROM ubuntu')
+        self.assertNotEqual(_hash(), source_hash)
+        # there's no Dockerfile to hash for `az acr run`
+        self.assertNotEqual(_get_source_code_hash(self.source_dir, '', ''), source_hash)
+
+    def test_block_blob_writer(self):
+        service = _FakeBlockBlobService()
+        data = os.urandom(10000)
+        with _BlockBlobWriter(service, _FakeBlobBlock, 'container', 'blob', block_size=1024,
+                              max_connections=3) as writer:
+            for i in range(0, len(data), 700):
+                writer.write(data[i:i + 700])
+        self.assertEqual(len(service.blocks), 10)
+        self.assertEqual(_FakeBlockBlobService.blobs['blob'], data)
+        self.assertEqual(writer.size, len(data))
+
+    def _pack(self, ignore_rules):
+        with open(os.path.join(self.source_dir, '.dockerignore'), 'w') as f:
+            f.write('\n'.join(ignore_rules))
+        stream = io.BytesIO()
+        with tarfile.open(fileobj=stream, mode='w|') as tar:
+            _pack_source_code(tar, self.source_dir, os.path.join(self.source_dir, 'Dockerfile'), 'abc_Dockerfile')
+        stream.seek(0)
+        with tarfile.open(fileobj=stream) as tar:
+            return sorted(tar.getnames())
+
+    def test_pack_source_code_prunes_ignored_dirs(self):
+        for path in ['node_modules/lib/index.js', 'node_modules/keep.txt', 'docs/a.md', 'docs/b.log']:
+            os.makedirs(os.path.dirname(os.path.join(self.source_dir, path)), exist_ok=True)
+            with open(os.path.join(self.source_dir, path), 'w') as f:
+                f.write(path)
+
+        scanned = []
+        scandir = os.scandir
+        with mock.patch('os.scandir', side_effect=lambda p: scanned.append(os.path.relpath(p, self.source_dir)) or
+                        scandir(p)):
+            names = self._pack(['node_modules', '*.log', 'docs', '!docs/*.md'])
+        self.assertEqual(names, ['', '.dockerignore', 'Dockerfile', 'abc_Dockerfile', 'app.py', 'docs/a.md'])
+        self.assertNotIn('node_modules', scanned)
+
+        names = self._pack(['node_modules', '!node_modules/keep.txt'])
+        self.assertIn('node_modules/keep.txt', names)
+        self.assertNotIn('node_modules/lib/index.js', names)
+
+    def test_docker_ignore_matcher(self):
+        # the rules at the end of .dockerignore have higher priority
+        rules = [IgnoreRule(r) for r in reversed(['**/*.md', '!docs/**', 'build', '!build/keep/*'])]
+        matcher = DockerIgnoreMatcher(rules)
+        self.assertEqual(matcher.match('build', len(rules)), 1)
+        self.assertEqual(matcher.match('build/keep/a', len(rules)), 0)
+        self.assertIsNone(matcher.match('build/keep/a', 0))
+        self.assertEqual(matcher.match('src/a.md', len(rules)), 3)
+        self.assertTrue(matcher.may_include_below('build', 1))
+        self.assertTrue(matcher.may_include_below('build/keep', 1))
+        self.assertFalse(matcher.may_include_below('build/other', 1))
+        self.assertFalse(matcher.may_include_below('build', 0))
+        self.assertTrue(matcher.may_include_below('docs', 3))
+        self.assertFalse(matcher.may_include_below('src', 3))
+        self.assertIsNone(DockerIgnoreMatcher([]).match('a', 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -58,10 +58,10 @@ def get_auth_management_client(cli_ctx, scope=None, **_):
     return get_mgmt_service_client(cli_ctx, ResourceType.MGMT_AUTHORIZATION, subscription_id=subscription_id)
 
 
-def get_container_service_client(cli_ctx, **_):
+def get_container_service_client(cli_ctx, subscription_id=None, **_):
     from azure.mgmt.containerservice import ContainerServiceClient
 
-    return get_mgmt_service_client(cli_ctx, ContainerServiceClient)
+    return get_mgmt_service_client(cli_ctx, ContainerServiceClient, subscription_id=subscription_id)
 
 
 def get_osa_container_service_client(cli_ctx, **_):
@@ -710,6 +710,8 @@ examples:
   - name: Get access credentials for a managed Kubernetes cluster. (autogenerated)
     text: az aks get-credentials --name MyManagedCluster --resource-group MyResourceGroup
     crafted: true
+  - name: Get access credentials for all the managed Kubernetes clusters of a resource group.
+    text: az aks get-credentials --resource-group MyResourceGroup --clusters $(az aks list -g MyResourceGroup --query [].name -o tsv)
 """
 
 helps['aks get-upgrades'] = """
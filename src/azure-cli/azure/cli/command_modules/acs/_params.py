@@ -328,6 +328,9 @@ def load_arguments(self, _):
                    help='If specified, overwrite the default context name.')
         c.argument('path', options_list=['--file', '-f'], type=file_type, completer=FilesCompleter(),
                    default=os.path.join(os.path.expanduser('~'), '.kube', 'config'))
+        c.argument('clusters', nargs='+', arg_group='Multiple Clusters',
+                   help='Space-separated names or resource IDs of clusters. Their credentials are fetched concurrently '
+                        'and merged into the kubeconfig file at once. Names are of clusters in --resource-group.')
 
     for scope in ['aks', 'acs kubernetes', 'acs dcos']:
         with self.argument_context('{} install-cli'.format(scope)) as c:
@@ -27,6 +27,7 @@ import time
 import uuid
 import webbrowser
 import zipfile
+from collections import OrderedDict
 from distutils.version import StrictVersion
 from math import isnan
 from six.moves.urllib.request import urlopen  # pylint: disable=import-error
@@ -1150,33 +1151,95 @@ def _k8s_get_credentials_internal(name, acs_info, path, ssh_key_file, overwrite_
                 'The credentials have been saved to %s', path_candidate)
 
 
-def _handle_merge(existing, addition, key, replace):
-    if not addition.get(key, False):
-        return
-    if not existing.get(key):
-        existing[key] = addition[key]
+def _handle_merge(existing, additions, key, replace):
+    """Merge the entries of the additions into the existing entries, in one pass over the entries indexed by name.
+    An entry replaces the entry of the same name, if any, and is moved to the end."""
+    if not any(addition.get(key, False) for addition in additions):
         return
 
-    for i in addition[key]:
-        for j in existing[key]:
-            if not i.get('name', False) or not j.get('name', False):
-                continue
-            if i['name'] == j['name']:
-                if replace or i == j:
-                    existing[key].remove(j)
-                else:
-                    msg = 'A different object named {} already exists in your kubeconfig file.\nOverwrite?'
-                    overwrite = False
-                    try:
-                        overwrite = prompt_y_n(msg.format(i['name']))
-                    except NoTTYException:
-                        pass
-                    if overwrite:
-                        existing[key].remove(j)
-                    else:
-                        msg = 'A different object named {} already exists in {} in your kubeconfig file.'
-                        raise CLIError(msg.format(i['name'], key))
-        existing[key].append(i)
+    entries = OrderedDict((j.get('name') or id(j), j) for j in existing.get(key) or [])
+    for addition in additions:
+        for i in addition.get(key) or []:
+            name = i.get('name') or id(i)
+            j = entries.pop(name, None)
+            if j is not None and not replace and i != j:
+                msg = 'A different object named {} already exists in your kubeconfig file.\nOverwrite?'
+                overwrite = False
+                try:
+                    overwrite = prompt_y_n(msg.format(i['name']))
+                except NoTTYException:
+                    pass
+                if not overwrite:
+                    msg = 'A different object named {} already exists in {} in your kubeconfig file.'
+                    raise CLIError(msg.format(i['name'], key))
+            entries[name] = i
+    existing[key] = list(entries.values())
+
+
+def _merge_kubernetes_configuration(existing, additions, replace):
+    """Merge the additional configurations into the existing one, in order. Return the merged configuration."""
+    if existing is None:
+        existing, additions = additions[0], additions[1:]
+        if not additions:
+            return existing
+    _handle_merge(existing, additions, 'clusters', replace)
+    _handle_merge(existing, additions, 'users', replace)
+    _handle_merge(existing, additions, 'contexts', replace)
+    existing['current-context'] = additions[-1]['current-context']
+    return existing
+
+
+def _rename_admin_context(addition):
+    # rename the admin context so it doesn't overwrite the user context
+    for ctx in addition.get('contexts', []):
+        try:
+            if ctx['context']['user'].startswith('clusterAdmin'):
+                admin_name = ctx['name'] + '-admin'
+                addition['current-context'] = ctx['name'] = admin_name
+                break
+        except (KeyError, TypeError):
+            continue
+
+
+def _ensure_kubernetes_configuration_file(path):
+    # ensure that at least an empty ~/.kube/config exists
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        try:
+            os.makedirs(directory)
+        except OSError as ex:
+            if ex.errno != errno.EEXIST:
+                raise
+    if not os.path.exists(path):
+        with os.fdopen(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600), 'wt'):
+            pass
+
+
+def _write_kubernetes_configuration(filename, config):
+    """Write the configuration to a temporary file that then replaces the file, so that the file is never seen
+    partially written. The file keeps its permissions, and a symlink to it stays a symlink."""
+    # check that ~/.kube/config is only read- and writable by its owner
+    if platform.system() != 'Windows':
+        existing_file_perms = "{:o}".format(
+            stat.S_IMODE(os.lstat(filename).st_mode))
+        if not existing_file_perms.endswith('600'):
+            logger.warning('%s has permissions "%s".\nIt should be readable and writable only by its owner.',
+                           filename, existing_file_perms)
+
+    filename = os.path.realpath(filename)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(filename), prefix=os.path.basename(filename) + '.')
+    try:
+        with os.fdopen(fd, 'w') as stream:
+            yaml.safe_dump(config, stream, default_flow_style=False)
+        if platform.system() != 'Windows':
+            os.chmod(temp_path, stat.S_IMODE(os.stat(filename).st_mode))
+        os.replace(temp_path, filename)
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
 
 
 def load_kubernetes_configuration(filename):
@@ -1201,38 +1264,14 @@ def merge_kubernetes_configurations(existing_file, addition_file, replace, conte
         addition['clusters'][0]['name'] = context_name
         addition['current-context'] = context_name
 
-    # rename the admin context so it doesn't overwrite the user context
-    for ctx in addition.get('contexts', []):
-        try:
-            if ctx['context']['user'].startswith('clusterAdmin'):
-                admin_name = ctx['name'] + '-admin'
-                addition['current-context'] = ctx['name'] = admin_name
-                break
-        except (KeyError, TypeError):
-            continue
+    _rename_admin_context(addition)
 
     if addition is None:
         raise CLIError(
             'failed to load additional configuration from {}'.format(addition_file))
 
-    if existing is None:
-        existing = addition
-    else:
-        _handle_merge(existing, addition, 'clusters', replace)
-        _handle_merge(existing, addition, 'users', replace)
-        _handle_merge(existing, addition, 'contexts', replace)
-        existing['current-context'] = addition['current-context']
-
-    # check that ~/.kube/config is only read- and writable by its owner
-    if platform.system() != 'Windows':
-        existing_file_perms = "{:o}".format(
-            stat.S_IMODE(os.lstat(existing_file).st_mode))
-        if not existing_file_perms.endswith('600'):
-            logger.warning('%s has permissions "%s".\nIt should be readable and writable only by its owner.',
-                           existing_file, existing_file_perms)
-
-    with open(existing_file, 'w+') as stream:
-        yaml.safe_dump(existing, stream, default_flow_style=False)
+    existing = _merge_kubernetes_configuration(existing, [addition], replace)
+    _write_kubernetes_configuration(existing_file, existing)
 
     current_context = addition.get('current-context', 'UNKNOWN')
     msg = 'Merged "{}" as current context in {}'.format(
@@ -2456,10 +2495,20 @@ def aks_get_versions(cmd, client, location):
     return client.list_orchestrators(location, resource_type='managedClusters')
 
 
-def aks_get_credentials(cmd, client, resource_group_name, name, admin=False,
+def aks_get_credentials(cmd, client, resource_group_name=None, name=None, admin=False,
                         path=os.path.join(os.path.expanduser(
                             '~'), '.kube', 'config'),
-                        overwrite_existing=False, context_name=None):
+                        overwrite_existing=False, context_name=None, clusters=None):
+    if clusters:
+        if name or context_name:
+            raise CLIError('usage error: --name NAME --resource-group NAME [--context NAME] | '
+                           '--clusters NAME_OR_ID [NAME_OR_ID ...] [--resource-group NAME]')
+        _aks_get_credentials_of_clusters(cmd, client, resource_group_name, clusters, admin, path, overwrite_existing)
+        return
+    if not resource_group_name or not name:
+        raise CLIError('usage error: --name NAME --resource-group NAME [--context NAME] | '
+                       '--clusters NAME_OR_ID [NAME_OR_ID ...] [--resource-group NAME]')
+
     credentialResults = None
     if admin:
         credentialResults = client.list_cluster_admin_credentials(
@@ -2479,6 +2528,93 @@ def aks_get_credentials(cmd, client, resource_group_name, name, admin=False,
         raise CLIError("Fail to find kubeconfig file.")
 
 
+def _aks_get_credentials_of_clusters(cmd, client, resource_group_name, clusters, admin, path, overwrite_existing):
+    """Get the credentials of many clusters concurrently, and merge them into the kubeconfig file at once, in the
+    order of the clusters. The file is left unchanged if a merge fails."""
+    from msrestazure.tools import is_valid_resource_id, parse_resource_id, resource_id
+    from azure.cli.core.commands import DEFAULT_MAX_CONCURRENT_IDS, iter_concurrently
+    from ._client_factory import get_container_service_client
+
+    subscription_id = get_subscription_id(cmd.cli_ctx).lower()
+    targets = OrderedDict()
+    for cluster in clusters:
+        if is_valid_resource_id(cluster):
+            parts = parse_resource_id(cluster)
+            target = (parts['subscription'].lower(), parts['resource_group'], parts['name'])
+        elif resource_group_name:
+            target = (subscription_id, resource_group_name, cluster)
+        else:
+            raise CLIError('usage error: --clusters ID [ID ...] | --clusters NAME [NAME ...] --resource-group NAME')
+        targets[target] = None
+
+    # the entries of the kubeconfig file are named after the clusters, so clusters of the same name in other
+    # resource groups or subscriptions would overwrite each other
+    ids_by_name = OrderedDict()
+    for subscription, cluster_resource_group, cluster_name in targets:
+        cluster_id = resource_id(subscription=subscription, resource_group=cluster_resource_group,
+                                 namespace='Microsoft.ContainerService', type='managedClusters', name=cluster_name)
+        ids_by_name.setdefault(cluster_name.lower(), OrderedDict())[cluster_id.lower()] = cluster_id
+    duplicates = [list(ids.values()) for ids in ids_by_name.values() if len(ids) > 1]
+    if duplicates:
+        raise CLIError('Clusters of the same name would overwrite each other in your kubeconfig file, get their '
+                       'credentials one at a time with --context instead:\n{}'.format(
+                           '\n'.join(', '.join(ids) for ids in duplicates)))
+
+    # clients for the clusters of other subscriptions
+    clients = {subscription_id: client}
+    for subscription, _, _ in targets:
+        if subscription not in clients:
+            clients[subscription] = get_container_service_client(
+                cmd.cli_ctx, subscription_id=subscription).managed_clusters
+
+    def _get_kubeconfig(target):
+        subscription, cluster_resource_group, cluster_name = target
+        operations = clients[subscription]
+        if admin:
+            credentialResults = operations.list_cluster_admin_credentials(cluster_resource_group, cluster_name)
+        else:
+            credentialResults = operations.list_cluster_user_credentials(cluster_resource_group, cluster_name)
+        if not credentialResults:
+            raise CLIError("No Kubernetes credentials found.")
+        try:
+            kubeconfig = credentialResults.kubeconfigs[0].value.decode(encoding='UTF-8')
+        except (IndexError, ValueError):
+            raise CLIError("Fail to find kubeconfig file.")
+        addition = yaml.safe_load(kubeconfig)
+        if not addition:
+            raise CLIError("Fail to find kubeconfig file.")
+        _rename_admin_context(addition)
+        return addition
+
+    max_workers = cmd.cli_ctx.config.getint('core', 'max_concurrent_ids', DEFAULT_MAX_CONCURRENT_IDS)
+    failed = 0
+    for target, addition, ex in iter_concurrently(_get_kubeconfig, list(targets), max_workers):
+        if ex:
+            logger.error("Failed to get the credentials of cluster '%s' in resource group '%s': %s",
+                         target[2], target[1], ex)
+            failed += 1
+            continue
+        targets[target] = addition
+    additions = [addition for addition in targets.values() if addition]
+
+    if additions:
+        if path == "-":
+            print(yaml.safe_dump(_merge_kubernetes_configuration(None, additions, overwrite_existing),
+                                 default_flow_style=False))
+        else:
+            _ensure_kubernetes_configuration_file(path)
+            try:
+                existing = load_kubernetes_configuration(path)
+                existing = _merge_kubernetes_configuration(existing, additions, overwrite_existing)
+                _write_kubernetes_configuration(path, existing)
+                print('Merged the credentials of {} clusters in {}, with "{}" as current context'.format(
+                    len(additions), path, existing.get('current-context', 'UNKNOWN')))
+            except yaml.YAMLError as ex:
+                logger.warning('Failed to merge credentials to kube config file: %s', ex)
+    if failed:
+        raise CLIError('Failed to get the credentials of {} of {} clusters.'.format(failed, len(targets)))
+
+
 def aks_list(cmd, client, resource_group_name=None):
     if resource_group_name:
         managed_clusters = client.list_by_resource_group(resource_group_name)
@@ -4180,17 +4316,7 @@ def _print_or_merge_credentials(path, kubeconfig, overwrite_existing, context_na
         print(kubeconfig)
         return
 
-    # ensure that at least an empty ~/.kube/config exists
-    directory = os.path.dirname(path)
-    if directory and not os.path.exists(directory):
-        try:
-            os.makedirs(directory)
-        except OSError as ex:
-            if ex.errno != errno.EEXIST:
-                raise
-    if not os.path.exists(path):
-        with os.fdopen(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600), 'wt'):
-            pass
+    _ensure_kubernetes_configuration_file(path)
 
     # merge the new kubeconfig into the existing one
     fd, temp_path = tempfile.mkstemp()
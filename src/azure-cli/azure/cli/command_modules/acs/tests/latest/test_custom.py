@@ -562,6 +562,77 @@ class AcsCustomCommandTest(unittest.TestCase):
         self.assertEqual(merged['users'], expected_users)
         self.assertEqual(merged['current-context'], obj2['current-context'])
 
+    @mock.patch('azure.cli.command_modules.acs.custom.get_subscription_id', return_value='sub')
+    def test_aks_get_credentials_of_clusters(self, _):
+        from azure.cli.command_modules.acs.custom import aks_get_credentials
+
+        def _kubeconfig(name, server):
+            user = 'clusterUser_rg_{}'.format(name)
+            return {
+                'clusters': [{'cluster': {'server': server}, 'name': name}],
+                'contexts': [{'context': {'cluster': name, 'user': user}, 'name': name}],
+                'users': [{'name': user, 'user': {'token': server}}],
+                'current-context': name,
+            }
+
+        def _list_credentials(resource_group_name, name):
+            if name == 'bad':
+                raise CloudError(mock.MagicMock(status_code=404), 'not found')
+            kubeconfig = yaml.safe_dump(_kubeconfig(name, 'https://new'))
+            return mock.MagicMock(kubeconfigs=[mock.MagicMock(value=kubeconfig.encode('utf-8'))])
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path, link = os.path.join(directory, 'config'), os.path.join(directory, 'link')
+        with open(path, 'w') as stream:
+            yaml.safe_dump(_kubeconfig('c1', 'https://old'), stream)
+        os.chmod(path, 0o600)
+        os.symlink(path, link)
+
+        cmd, client, other_client = mock.MagicMock(), mock.MagicMock(), mock.MagicMock()
+        cmd.cli_ctx.config.getint.return_value = 4
+        client.list_cluster_user_credentials.side_effect = _list_credentials
+        other_client.managed_clusters.list_cluster_user_credentials.side_effect = _list_credentials
+        clusters = ['c1', 'bad', '/subscriptions/other/resourceGroups/rg2/providers/'
+                                 'Microsoft.ContainerService/managedClusters/c2']
+        with mock.patch('azure.cli.command_modules.acs._client_factory.get_container_service_client',
+                        return_value=other_client) as get_client:
+            # c1 is different, and can't be overwritten without asking
+            with self.assertRaisesRegex(CLIError, 'A different object named c1 already exists'):
+                aks_get_credentials(cmd, client, 'rg', path=link, clusters=clusters)
+            with open(path) as stream:
+                self.assertEqual(yaml.safe_load(stream), _kubeconfig('c1', 'https://old'))
+
+            with self.assertRaisesRegex(CLIError, 'Failed to get the credentials of 1 of 3 clusters'):
+                aks_get_credentials(cmd, client, 'rg', path=link, overwrite_existing=True, clusters=clusters)
+        get_client.assert_called_with(cmd.cli_ctx, subscription_id='other')
+        other_client.managed_clusters.list_cluster_user_credentials.assert_called_with('rg2', 'c2')
+
+        self.assertTrue(os.path.islink(link))
+        if platform.system() != 'Windows':
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+        with open(path) as stream:
+            merged = yaml.safe_load(stream)
+        self.assertEqual([c['name'] for c in merged['clusters']], ['c1', 'c2'])
+        self.assertEqual([c['cluster']['server'] for c in merged['clusters']], ['https://new', 'https://new'])
+        self.assertEqual([c['name'] for c in merged['users']], ['clusterUser_rg_c1', 'clusterUser_rg_c2'])
+        self.assertEqual(merged['current-context'], 'c2')
+        self.assertCountEqual(os.listdir(directory), ['config', 'link'])
+
+        with self.assertRaisesRegex(CLIError, 'usage error'):
+            aks_get_credentials(cmd, client, None, path=link, clusters=['c1'])
+
+        # clusters of the same name are reported before any credentials are queried
+        client.reset_mock()
+        with self.assertRaisesRegex(CLIError, 'Clusters of the same name') as context:
+            aks_get_credentials(cmd, client, 'rg', path=link, clusters=[
+                'c1', 'c2', '/subscriptions/sub/resourceGroups/rg2/providers/Microsoft.ContainerService/'
+                            'managedClusters/C1'])
+        self.assertIn('/subscriptions/sub/resourceGroups/rg/providers/Microsoft.ContainerService/managedClusters/c1, '
+                      '/subscriptions/sub/resourceGroups/rg2/providers/Microsoft.ContainerService/managedClusters/C1',
+                      str(context.exception))
+        client.list_cluster_user_credentials.assert_not_called()
+
     def test_acs_sp_create_failed_with_polished_error_if_due_to_permission(self):
 
         class FakedError(object):
@@ -7,7 +7,7 @@
 from knack.log import get_logger
 from knack.util import CLIError
 from azure.appconfiguration import AzureAppConfigurationClient
-from azure.core.exceptions import HttpResponseError
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
 
 from ._client_factory import cf_configstore
 from ._constants import HttpHeaders
@@ -34,13 +34,21 @@ def construct_connection_string(cmd, config_store_name):
 
 
 def resolve_store_metadata(cmd, config_store_name):
+    from azure.cli.core.commands.arm import get_resource_ids_by_name
     try:
         config_store_client = cf_configstore(cmd.cli_ctx)
-        all_stores = config_store_client.list()
-        for store in all_stores:
-            if store.name.lower() == config_store_name.lower():
-                # Id has a fixed structure /subscriptions/subscriptionName/resourceGroups/groupName/providers/providerName/configurationStores/storeName"
-                return store.id.split('/')[4], store.endpoint
+        for refresh in (False, True):
+            store_ids = get_resource_ids_by_name(cmd.cli_ctx, 'Microsoft.AppConfiguration/configurationStores',
+                                                 config_store_name, refresh=refresh)
+            if not store_ids:
+                break
+            # Id has a fixed structure /subscriptions/subscriptionName/resourceGroups/groupName/providers/providerName/configurationStores/storeName"
+            resource_group_name = store_ids[0].split('/')[4]
+            try:
+                store = config_store_client.get(resource_group_name, config_store_name)
+                return resource_group_name, store.endpoint
+            except ResourceNotFoundError:
+                pass  # the cached store was deleted, look it up again
     except HttpResponseError as ex:
         raise CLIError("Failed to get the list of App Configuration stores for the current user. Make sure that the account that logged in has sufficient permissions to access the App Configuration store.\n{}".format(str(ex)))
 
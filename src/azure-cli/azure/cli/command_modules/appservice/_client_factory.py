@@ -29,10 +29,11 @@ def ex_handler_factory(creating_plan=False, no_throw=False):
     return _polish_bad_errors
 
 
-def web_client_factory(cli_ctx, api_version=None, **_):
+def web_client_factory(cli_ctx, api_version=None, subscription_id=None, **_):
     from azure.cli.core.profiles import ResourceType
     from azure.cli.core.commands.client_factory import get_mgmt_service_client
-    return get_mgmt_service_client(cli_ctx, ResourceType.MGMT_APPSERVICE, api_version=api_version)
+    return get_mgmt_service_client(cli_ctx, ResourceType.MGMT_APPSERVICE, api_version=api_version,
+                                   subscription_id=subscription_id)
 
 
 def dns_client_factory(cli_ctx, api_version=None, **_):
@@ -20,6 +20,9 @@ from ._constants import (NETCORE_VERSION_DEFAULT, NETCORE_VERSIONS, NODE_VERSION
 
 logger = get_logger(__name__)
 
+# bytes read from each file, and about the size of each chunk of a zip built on the fly
+ZIP_CHUNK_SIZE = 1024 * 1024
+
 
 def _resource_client_factory(cli_ctx, **_):
     from azure.cli.core.profiles import ResourceType
@@ -31,46 +34,74 @@ def web_client_factory(cli_ctx, **_):
     return get_mgmt_service_client(cli_ctx, WebSiteManagementClient)
 
 
-def zip_contents_from_dir(dirPath, lang):
-    import tempfile
-    import uuid
-    relroot = os.path.abspath(tempfile.gettempdir())
-    path_and_file = os.path.splitdrive(dirPath)[1]
-    file_val = os.path.split(path_and_file)[1]
-    file_val_unique = file_val + str(uuid.uuid4())[:259]
-    zip_file_path = relroot + os.path.sep + file_val_unique + ".zip"
-    abs_src = os.path.abspath(dirPath)
+def iter_zip_contents_from_dir(dirPath, lang, chunk_size=ZIP_CHUNK_SIZE):
+    """Zip the contents of a directory on the fly, without a temp file, yielding the zip in chunks of about
+    chunk_size bytes as they are compressed."""
+    stream = _ZipStream()
     try:
-        with zipfile.ZipFile("{}".format(zip_file_path), "w", zipfile.ZIP_DEFLATED) as zf:
-            for dirname, subdirs, files in os.walk(dirPath):
-                # skip node_modules folder for Node apps,
-                # since zip_deployment will perform the build operation
-                if lang.lower() == NODE_RUNTIME_NAME:
-                    subdirs[:] = [d for d in subdirs if 'node_modules' not in d]
-                elif lang.lower() == NETCORE_RUNTIME_NAME:
-                    subdirs[:] = [d for d in subdirs if d not in ['obj', 'bin']]
-                elif lang.lower() == PYTHON_RUNTIME_NAME:
-                    subdirs[:] = [d for d in subdirs if 'env' not in d]  # Ignores dir that contain env
-
-                    filtered_files = []
-                    for filename in files:
-                        if filename == '.env':
-                            logger.info("Skipping file: %s/%s", dirname, filename)
-                        else:
-                            filtered_files.append(filename)
-                    files[:] = filtered_files
-
-                for filename in files:
-                    absname = os.path.abspath(os.path.join(dirname, filename))
-                    arcname = absname[len(abs_src) + 1:]
-                    zf.write(absname, arcname)
+        with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as zf:
+            for absname, arcname in _get_zip_entries(dirPath, lang):
+                zinfo = zipfile.ZipInfo.from_file(absname, arcname)
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+                with open(absname, 'rb') as src, zf.open(zinfo, 'w') as dest:
+                    for data in iter(lambda: src.read(chunk_size), b''):  # pylint: disable=cell-var-from-loop
+                        dest.write(data)
+                        if stream.size >= chunk_size:
+                            yield stream.pop()
     except IOError as e:
-        if e.errno == 13:
-            raise CLIError('Insufficient permissions to create a zip in current directory. '
-                           'Please re-run the command with administrator privileges')
+        # raised while the zip is being uploaded, don't let it pass for a network error
         raise CLIError(e)
+    yield stream.pop()
+
+
+class _ZipStream(object):
+    """Write-only, unseekable file that collects the zip written by iter_zip_contents_from_dir. The zip entries
+    are written with data descriptors, since their headers can't be updated once sent."""
+
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        self.size = 0
+        return data
+
+
+def _get_zip_entries(dirPath, lang):
+    """Yield the absolute and archive names of the files of a directory to deploy for the language."""
+    abs_src = os.path.abspath(dirPath)
+    for dirname, subdirs, files in os.walk(dirPath):
+        # skip node_modules folder for Node apps,
+        # since zip_deployment will perform the build operation
+        if lang.lower() == NODE_RUNTIME_NAME:
+            subdirs[:] = [d for d in subdirs if 'node_modules' not in d]
+        elif lang.lower() == NETCORE_RUNTIME_NAME:
+            subdirs[:] = [d for d in subdirs if d not in ['obj', 'bin']]
+        elif lang.lower() == PYTHON_RUNTIME_NAME:
+            subdirs[:] = [d for d in subdirs if 'env' not in d]  # Ignores dir that contain env
+
+            filtered_files = []
+            for filename in files:
+                if filename == '.env':
+                    logger.info("Skipping file: %s/%s", dirname, filename)
+                else:
+                    filtered_files.append(filename)
+            files[:] = filtered_files
 
-    return zip_file_path
+        for filename in files:
+            absname = os.path.abspath(os.path.join(dirname, filename))
+            arcname = absname[len(abs_src) + 1:]
+            yield absname, arcname
 
 
 def get_runtime_version_details(file_path, lang_name):
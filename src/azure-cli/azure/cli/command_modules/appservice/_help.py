@@ -1845,6 +1845,12 @@ examples:
 helps['webapp log tail'] = """
 type: command
 short-summary: Start live log tracing for a web app.
+long-summary: Several web apps and slots can be traced at once with --targets, over shared connections.
+examples:
+  - name: Trace the logs of a web app and of its staging slot, prefixing each line with the app it comes from.
+    text: az webapp log tail --name MyWebApp --resource-group MyResourceGroup --targets MyWebApp/staging
+  - name: Trace the errors of several web apps.
+    text: az webapp log tail --name MyWebApp --resource-group MyResourceGroup --targets MyApi MyWorker --filter "(?i)error"
 """
 
 helps['webapp log deployment'] = """
@@ -427,6 +427,10 @@ def load_arguments(self, _):
     with self.argument_context('webapp log tail') as c:
         c.argument('provider',
                    help="By default all live traces configured by `az webapp log config` will be shown, but you can scope to certain providers/folders, e.g. 'application', 'http', etc. For details, check out https://github.com/projectkudu/kudu/wiki/Diagnostic-Log-Stream")
+        c.argument('targets', nargs='+',
+                   help="Space-separated other web apps to stream along with this one, as names or NAME/SLOT in the resource group, or resource IDs of web apps or slots. Each line is prefixed with the app it comes from.")
+        c.argument('filter_pattern', options_list=['--filter'],
+                   help='Only show the lines that match this regular expression.')
 
     with self.argument_context('webapp log download') as c:
         c.argument('log_file', default='webapp_logs.zip', type=file_type, completer=FilesCompleter(),
@@ -55,10 +55,11 @@ from ._params import AUTH_TYPES, MULTI_CONTAINER_TYPES
 from ._client_factory import web_client_factory, ex_handler_factory, providers_client_factory
 from ._appservice_utils import _generic_site_operation, _generic_settings_operation
 from .utils import _normalize_sku, get_sku_name, retryable_method
-from ._create_util import (zip_contents_from_dir, get_runtime_version_details, create_resource_group, get_app_details,
-                           should_create_new_rg, set_location, get_site_availability, get_profile_username,
-                           get_plan_to_use, get_lang_from_content, get_rg_to_use, get_sku_to_use,
-                           detect_os_form_src, get_current_stack_from_runtime, generate_default_app_name)
+from ._create_util import (ZIP_CHUNK_SIZE, iter_zip_contents_from_dir, get_runtime_version_details,
+                           create_resource_group, get_app_details, should_create_new_rg, set_location,
+                           get_site_availability, get_profile_username, get_plan_to_use, get_lang_from_content,
+                           get_rg_to_use, get_sku_to_use, detect_os_form_src, get_current_stack_from_runtime,
+                           generate_default_app_name)
 from ._constants import (FUNCTIONS_STACKS_API_JSON_PATHS, FUNCTIONS_STACKS_API_KEYS,
                          FUNCTIONS_LINUX_RUNTIME_VERSION_REGEX, FUNCTIONS_WINDOWS_RUNTIME_VERSION_REGEX,
                          NODE_EXACT_VERSION_DEFAULT, RUNTIME_STACKS, FUNCTIONS_NO_V2_REGIONS, PUBLIC_CLOUD)
@@ -402,6 +403,11 @@ def enable_zip_deploy_webapp(cmd, resource_group_name, name, src, timeout=None,
 
 
 def enable_zip_deploy(cmd, resource_group_name, name, src, timeout=None, slot=None):
+    return _enable_zip_deploy(cmd, resource_group_name, name, src, None, timeout=timeout, slot=slot)
+
+
+def _enable_zip_deploy(cmd, resource_group_name, name, src, lang, timeout=None, slot=None):
+    """Deploy a zip file or, with lang, a directory of an app in that language zipped while it's uploaded."""
     logger.warning("Getting scm site credentials for zip deployment")
     user_name, password = _get_site_credential(cmd.cli_ctx, resource_group_name, name, slot)
 
@@ -420,15 +426,11 @@ def enable_zip_deploy(cmd, resource_group_name, name, src, timeout=None, slot=No
     headers['Cache-Control'] = 'no-cache'
     headers['User-Agent'] = get_az_user_agent()
 
-    import requests
     import os
-    from azure.cli.core.util import should_disable_connection_verify
-    # Read file content
-    with open(os.path.realpath(os.path.expanduser(src)), 'rb') as fs:
-        zip_content = fs.read()
-        logger.warning("Starting zip deployment. This operation can take a while to complete ...")
-        res = requests.post(zip_url, data=zip_content, headers=headers, verify=not should_disable_connection_verify())
-        logger.warning("Deployment endpoint responded with status code %d", res.status_code)
+    body = _ZipDeployBody(cmd.cli_ctx, os.path.realpath(os.path.expanduser(src)), lang)
+    logger.warning("Starting zip deployment. This operation can take a while to complete ...")
+    res = _post_zip_deploy(zip_url, body, headers)
+    logger.warning("Deployment endpoint responded with status code %d", res.status_code)
 
     # check if there's an ongoing process
     if res.status_code == 409:
@@ -442,6 +444,65 @@ def enable_zip_deploy(cmd, resource_group_name, name, src, timeout=None, slot=No
     return response
 
 
+def _post_zip_deploy(zip_url, body, headers):
+    import requests
+    from azure.cli.core.util import should_disable_connection_verify
+    retries = 3
+    retry_delay = 5  # seconds, doubled after each failed attempt
+    for attempt in range(retries + 1):
+        try:
+            return requests.post(zip_url, data=body, headers=headers, verify=not should_disable_connection_verify())
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout) as ex:
+            if attempt == retries:
+                raise
+            # the zip deploy API can't resume an upload, so the next attempt sends the zip from the start
+            logger.warning("Zip deployment upload failed: %s. Retrying in %d seconds ...", ex, retry_delay)
+            time.sleep(retry_delay)
+            retry_delay *= 2
+    return None
+
+
+class _ZipDeployBody(object):
+    """
+    Request body of a zip deployment, streamed in chunks from a zip file or from a directory zipped on the fly,
+    reporting the bytes sent. Every iteration sends the zip from the start, so the body can be posted again.
+    """
+
+    def __init__(self, cli_ctx, src, lang=None, chunk_size=ZIP_CHUNK_SIZE):
+        import os
+        self.cli_ctx = cli_ctx
+        self.src = src
+        self.lang = lang
+        self.chunk_size = chunk_size
+        # requests sends the length of a zip file as Content-Length, and a zip built on the fly chunked
+        self.len = None if lang else os.path.getsize(src)
+
+    def __iter__(self):
+        if self.lang:
+            chunks = iter_zip_contents_from_dir(self.src, self.lang, self.chunk_size)
+        else:
+            chunks = self._read_chunks()
+        hook = self.cli_ctx.get_progress_controller(det=bool(self.len))
+        sent = 0
+        try:
+            for chunk in chunks:
+                yield chunk
+                sent += len(chunk)
+                if self.len:
+                    hook.add(message='Uploading', value=sent, total_val=self.len)
+                else:
+                    hook.add(message='Uploaded {:.1f} MB'.format(sent / 1024 / 1024))
+        finally:
+            chunks.close()
+            hook.end()
+
+    def _read_chunks(self):
+        with open(self.src, 'rb') as fs:
+            for chunk in iter(lambda: fs.read(self.chunk_size), b''):
+                yield chunk
+
+
 def add_remote_build_app_settings(cmd, resource_group_name, name, slot):
     settings = get_app_settings(cmd, resource_group_name, name, slot)
     scm_do_build_during_deployment = None
@@ -1948,9 +2009,15 @@ def _get_local_git_url(cli_ctx, client, resource_group_name, name, slot=None):
                                       parsed.netloc, name)
 
 
-def _get_scm_url(cmd, resource_group_name, name, slot=None):
+def _get_scm_url(cmd, resource_group_name, name, slot=None, client=None):
     from azure.mgmt.web.models import HostType
-    webapp = show_webapp(cmd, resource_group_name, name, slot=slot)
+    if client:
+        # the web app is in the subscription of the given client rather than the current one
+        webapp = _generic_site_operation(cmd.cli_ctx, resource_group_name, name, 'get', slot, client=client)
+        if not webapp:
+            raise ResourceNotFoundError("WebApp'{}', is not found on RG '{}'.".format(name, resource_group_name))
+    else:
+        webapp = show_webapp(cmd, resource_group_name, name, slot=slot)
     for host in webapp.host_name_ssl_states or []:
         if host.host_type == HostType.repository:
             return "https://{}".format(host.name)
@@ -2283,21 +2350,89 @@ def show_cors(cmd, resource_group_name, name, slot=None):
     return configs.cors
 
 
-def get_streaming_log(cmd, resource_group_name, name, provider=None, slot=None):
-    scm_url = _get_scm_url(cmd, resource_group_name, name, slot)
-    streaming_url = scm_url + '/logstream'
-    if provider:
-        streaming_url += ('/' + provider.lstrip('/'))
+# bytes read at a time from a log stream or a log download
+LOG_READ_SIZE = 64 * 1024
 
-    user, password = _get_site_credential(cmd.cli_ctx, resource_group_name, name, slot)
-    t = threading.Thread(target=_get_log, args=(streaming_url, user, password))
-    t.daemon = True
-    t.start()
+
+def get_streaming_log(cmd, resource_group_name, name, provider=None, slot=None, targets=None, filter_pattern=None):
+    import re
+    from azure.cli.core.commands.client_factory import get_subscription_id
+    sources = [(None, resource_group_name, name, slot)]
+    current_subscription = get_subscription_id(cmd.cli_ctx) if targets else None
+    for target in targets or []:
+        source = _parse_log_target(resource_group_name, target, current_subscription)
+        if source not in sources:
+            sources.append(source)
+    line_filter = None
+    if filter_pattern:
+        try:
+            line_filter = re.compile(filter_pattern)
+        except re.error as ex:
+            raise ValidationError("Invalid --filter pattern '{}': {}".format(filter_pattern, ex))
+
+    def _get_log_source(source):
+        source_subscription, source_rg, source_name, source_slot = source
+        client = web_client_factory(cmd.cli_ctx, subscription_id=source_subscription) if source_subscription \
+            else None
+        scm_url = _get_scm_url(cmd, source_rg, source_name, source_slot, client=client)
+        streaming_url = scm_url + '/logstream'
+        if provider:
+            streaming_url += ('/' + provider.lstrip('/'))
+        user, password = _get_site_credential(cmd.cli_ctx, source_rg, source_name, source_slot, client=client)
+        return streaming_url, user, password
+
+    if len(sources) == 1:
+        log_sources = [_get_log_source(sources[0])]
+    else:
+        from azure.cli.core.commands import DEFAULT_MAX_CONCURRENT_IDS, run_concurrently
+        max_workers = cmd.cli_ctx.config.getint('core', 'max_concurrent_ids', DEFAULT_MAX_CONCURRENT_IDS)
+        log_sources = []
+        for result, ex in run_concurrently(_get_log_source, sources, max_workers):
+            if ex:
+                raise ex
+            log_sources.append(result)
+
+    # the streams of all the apps share a pool manager, and print whole lines one at a time
+    http = _get_log_pool_manager(len(sources))
+    lock = threading.Lock()
+
+    def _print_log_line(prefix, line):
+        if line_filter and not line_filter.search(line):
+            return
+        with lock:
+            _print_log_line_to_stdout_encoding(prefix + line)
+
+    def _tail_log(source_label, streaming_url, user, password):
+        prefix = '[{}] '.format(source_label) if len(sources) > 1 else ''
+        try:
+            _get_log(streaming_url, user, password, http=http,
+                     print_line=lambda line: _print_log_line(prefix, line))
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.error('%s%s', prefix, ex)
+
+    for (_, _, source_name, source_slot), (streaming_url, user, password) in zip(sources, log_sources):
+        source_label = source_name + ('/' + source_slot if source_slot else '')
+        t = threading.Thread(target=_tail_log, args=(source_label, streaming_url, user, password))
+        t.daemon = True
+        t.start()
 
     while True:
         time.sleep(100)  # so that ctrl+c can stop the command
 
 
+def _parse_log_target(resource_group_name, target, current_subscription):
+    """Get the subscription, resource group, name and slot of a web app given as a resource ID, NAME or NAME/SLOT.
+    The subscription is None unless it is another subscription than the current one."""
+    if is_valid_resource_id(target):
+        parts = parse_resource_id(target)
+        slot = parts['child_name_1'] if parts.get('child_type_1', '').lower() == 'slots' else None
+        subscription = parts['subscription'] if parts['subscription'].lower() != current_subscription.lower() \
+            else None
+        return subscription, parts['resource_group'], parts['name'], slot
+    name, _, slot = target.partition('/')
+    return None, resource_group_name, name, slot or None
+
+
 def download_historical_logs(cmd, resource_group_name, name, log_file=None, slot=None):
     scm_url = _get_scm_url(cmd, resource_group_name, name, slot)
     url = scm_url.rstrip('/') + '/dump'
@@ -2306,13 +2441,14 @@ def download_historical_logs(cmd, resource_group_name, name, log_file=None, slot
     logger.warning('Downloaded logs to %s', log_file)
 
 
-def _get_site_credential(cli_ctx, resource_group_name, name, slot=None):
-    creds = _generic_site_operation(cli_ctx, resource_group_name, name, 'begin_list_publishing_credentials', slot)
+def _get_site_credential(cli_ctx, resource_group_name, name, slot=None, client=None):
+    creds = _generic_site_operation(cli_ctx, resource_group_name, name, 'begin_list_publishing_credentials', slot,
+                                    client=client)
     creds = creds.result()
     return (creds.publishing_user_name, creds.publishing_password)
 
 
-def _get_log(url, user_name, password, log_file=None):
+def _get_log_pool_manager(num_pools=1):
     import certifi
     import urllib3
     try:
@@ -2321,7 +2457,19 @@ def _get_log(url, user_name, password, log_file=None):
     except ImportError:
         pass
 
-    http = urllib3.PoolManager(cert_reqs='CERT_REQUIRED', ca_certs=certifi.where())
+    return urllib3.PoolManager(num_pools=max(10, num_pools), cert_reqs='CERT_REQUIRED', ca_certs=certifi.where())
+
+
+def _print_log_line_to_stdout_encoding(line):
+    # Extra encode() and decode for stdout which does not surpport 'utf-8'
+    std_encoding = sys.stdout.encoding
+    logger.warning(line.encode(std_encoding, errors='replace').decode(std_encoding, errors='replace'))
+
+
+def _get_log(url, user_name, password, log_file=None, http=None, print_line=_print_log_line_to_stdout_encoding):
+    import codecs
+    import urllib3
+    http = http or _get_log_pool_manager()
     headers = urllib3.util.make_headers(basic_auth='{0}:{1}'.format(user_name, password))
     r = http.request(
         'GET',
@@ -2334,20 +2482,20 @@ def _get_log(url, user_name, password, log_file=None):
             url, r.status, r.reason))
     if log_file:  # download logs
         with open(log_file, 'wb') as f:
-            while True:
-                data = r.read(1024)
-                if not data:
-                    break
+            for data in r.stream(LOG_READ_SIZE):
                 f.write(data)
     else:  # streaming
-        std_encoding = sys.stdout.encoding
-        for chunk in r.stream():
-            if chunk:
-                # Extra encode() and decode for stdout which does not surpport 'utf-8'
-                logger.warning(chunk.decode(encoding='utf-8', errors='replace')
-                               .encode(std_encoding, errors='replace')
-                               .decode(std_encoding, errors='replace')
-                               .rstrip('\n\r'))  # each line of log has CRLF.
+        # a chunk can end in the middle of a line, or of a character
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        pending = ''
+        for chunk in r.stream(LOG_READ_SIZE):
+            lines = (pending + decoder.decode(chunk)).split('\n')
+            pending = lines.pop()
+            for line in lines:
+                print_line(line.rstrip('\r'))  # each line of log has CRLF.
+        pending += decoder.decode(b'', final=True)
+        if pending:
+            print_line(pending.rstrip('\r'))
     r.release_conn()
 
 
@@ -3862,10 +4010,8 @@ def webapp_up(cmd, name=None, resource_group_name=None, plan=None, location=None
                 _update_app_settings_for_windows_if_needed(cmd, rg_name, name, match, site_config, runtime_version)
         create_json['runtime_version'] = runtime_version
     # Zip contents & Deploy
-    logger.warning("Creating zip with contents of dir %s ...", src_dir)
-    # zip contents & deploy
-    zip_file_path = zip_contents_from_dir(src_dir, language)
-    enable_zip_deploy(cmd, rg_name, name, zip_file_path)
+    logger.warning("Zipping and uploading the contents of dir %s ...", src_dir)
+    _enable_zip_deploy(cmd, rg_name, name, src_dir, language)
 
     if launch_browser:
         logger.warning("Launching app using default browser")
@@ -2,6 +2,7 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
+import os
 import unittest
 import mock
 
@@ -27,7 +28,9 @@ from azure.cli.command_modules.appservice.custom import (set_deployment_user,
                                                          restore_deleted_webapp,
                                                          list_snapshots,
                                                          restore_snapshot,
-                                                         create_managed_ssl_cert)
+                                                         create_managed_ssl_cert,
+                                                         enable_zip_deploy,
+                                                         _enable_zip_deploy)
 
 # pylint: disable=line-too-long
 from vsts_cd_manager.continuous_delivery_manager import ContinuousDeliveryResult
@@ -310,7 +313,62 @@ class TestWebappMocked(unittest.TestCase):
             self.fail('test exception was not thrown')
         except ErrorToExitInfiniteLoop:
             # assert
-            site_op_mock.assert_called_with(cli_ctx_mock, 'rg', 'web1', 'begin_list_publishing_credentials', None)
+            site_op_mock.assert_called_with(cli_ctx_mock, 'rg', 'web1', 'begin_list_publishing_credentials', None,
+                                            client=None)
+
+    @mock.patch('azure.cli.command_modules.appservice.custom._print_log_line_to_stdout_encoding', autospec=True)
+    @mock.patch('azure.cli.command_modules.appservice.custom._get_log_pool_manager', autospec=True)
+    @mock.patch('azure.cli.command_modules.appservice.custom._get_site_credential', return_value=('usr', 'pwd'))
+    @mock.patch('azure.cli.command_modules.appservice.custom._get_scm_url', autospec=True)
+    @mock.patch('azure.cli.command_modules.appservice.custom.web_client_factory', autospec=True)
+    @mock.patch('azure.cli.core.commands.client_factory.get_subscription_id', return_value='SUB')
+    def test_log_stream_multiple_targets(self, _, web_client_factory_mock, get_scm_url_mock, site_credential_mock,
+                                         pool_manager_mock, print_mock):
+        import threading
+
+        class ErrorToExitInfiniteLoop(Exception):
+            pass
+
+        streams = {
+            'https://web1.scm/logstream/application': [b'2021 error: fail', b'ed\r\n2021 info: ok\r\n'],
+            'https://web1-staging.scm/logstream/application': [b'2021 Error: \xe2\x9c', b'\x97\r\n'],
+            'https://web2.scm/logstream/application': [b'2021 error: last line'],
+            'https://web3.scm/logstream/application': [b'2021 error: other subscription']
+        }
+        done = threading.Semaphore(0)
+
+        def _request(method, url, headers, preload_content):
+            return mock.MagicMock(status=200, stream=lambda amt: iter(streams[url]),
+                                  release_conn=done.release)
+
+        def _sleep(_):
+            for _ in streams:
+                done.acquire(timeout=10)
+            raise ErrorToExitInfiniteLoop()
+
+        get_scm_url_mock.side_effect = lambda cmd, rg, name, slot, client=None: 'https://{}.scm'.format(
+            name + ('-' + slot if slot else ''))
+        pool_manager_mock.return_value.request.side_effect = _request
+        cmd_mock = mock.MagicMock()
+        cmd_mock.cli_ctx.config.getint.return_value = 4
+
+        with mock.patch('azure.cli.command_modules.appservice.custom.time.sleep', side_effect=_sleep):
+            with self.assertRaises(ErrorToExitInfiniteLoop):
+                get_streaming_log(cmd_mock, 'rg', 'web1', provider='application', filter_pattern='(?i)error',
+                                  targets=['web1/staging', 'web1',
+                                           '/subscriptions/sub/resourceGroups/rg2/providers/Microsoft.Web/sites/web2',
+                                           '/subscriptions/sub2/resourceGroups/rg3/providers/Microsoft.Web/sites/web3'])
+
+        pool_manager_mock.assert_called_once_with(4)
+        get_scm_url_mock.assert_any_call(cmd_mock, 'rg2', 'web2', None, client=None)
+        # the web apps of other subscriptions are queried with clients of their subscription
+        web_client_factory_mock.assert_called_once_with(cmd_mock.cli_ctx, subscription_id='sub2')
+        get_scm_url_mock.assert_any_call(cmd_mock, 'rg3', 'web3', None, client=web_client_factory_mock.return_value)
+        site_credential_mock.assert_any_call(cmd_mock.cli_ctx, 'rg3', 'web3', None,
+                                             client=web_client_factory_mock.return_value)
+        self.assertEqual(sorted(c[0][0] for c in print_mock.call_args_list),
+                         ['[web1/staging] 2021 Error: \u2717', '[web1] 2021 error: failed', '[web2] 2021 error: last line',
+                          '[web3] 2021 error: other subscription'])
 
     @mock.patch('azure.cli.command_modules.appservice.custom._generic_site_operation', autospec=True)
     def test_restore_deleted_webapp(self, site_op_mock):
@@ -387,7 +445,8 @@ class TestWebappMocked(unittest.TestCase):
         download_historical_logs(cmd_mock, 'rg', 'web1')
 
         # assert
-        site_op_mock.assert_called_with(cli_ctx_mock, 'rg', 'web1', 'begin_list_publishing_credentials', None)
+        site_op_mock.assert_called_with(cli_ctx_mock, 'rg', 'web1', 'begin_list_publishing_credentials', None,
+                                            client=None)
         get_log_mock.assert_called_with(test_scm_url + '/dump', 'great_user', 'secret_password', None)
 
     def test_valid_linux_create_options(self):
@@ -437,6 +496,62 @@ class TestWebappMocked(unittest.TestCase):
         client.certificates.create_or_update.assert_called_once_with(name=host_name, resource_group_name=rg_name,
                                                                      certificate_envelope=cert_def)
 
+    @mock.patch('time.sleep', autospec=True)
+    @mock.patch('requests.post', autospec=True)
+    @mock.patch('azure.cli.command_modules.appservice.custom._check_zip_deployment_status', autospec=True)
+    @mock.patch('azure.cli.command_modules.appservice.custom._get_scm_url', return_value='https://scm')
+    @mock.patch('azure.cli.command_modules.appservice.custom._get_site_credential', return_value=('usr', 'pwd'))
+    def test_zip_deploy_streamed_with_retry(self, _, __, check_status_mock, post_mock, sleep_mock):
+        import io
+        import shutil
+        import tempfile
+        import zipfile
+        import requests
+
+        src_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, src_dir)
+        content = os.urandom(3 * 1024 * 1024)
+        for path, data in [('app.js', content), ('node_modules/lib.js', b'skipped'), ('lib/util.js', b'util')]:
+            os.makedirs(os.path.dirname(os.path.join(src_dir, path)), exist_ok=True)
+            with open(os.path.join(src_dir, path), 'wb') as f:
+                f.write(data)
+
+        uploads = []
+
+        def _post(url, data, headers, verify):
+            chunks = iter(data)
+            uploads.append((data.len, next(chunks)))
+            if len(uploads) == 1:
+                raise requests.exceptions.ConnectionError('connection reset')
+            uploads[-1] = (data.len, uploads[-1][1] + b''.join(chunks))
+            return FakedResponse(202)
+
+        post_mock.side_effect = _post
+        cmd_mock = mock.MagicMock()
+
+        _enable_zip_deploy(cmd_mock, 'rg', 'web1', src_dir, 'node')
+        self.assertEqual(post_mock.call_args[0][0], 'https://scm/api/zipdeploy?isAsync=true')
+        self.assertEqual(len(uploads), 2)
+        sleep_mock.assert_called_once_with(5)
+        check_status_mock.assert_called_once()
+        size, zip_content = uploads[1]
+        self.assertIsNone(size)
+        with zipfile.ZipFile(io.BytesIO(zip_content)) as zf:
+            self.assertEqual(sorted(zf.namelist()), ['app.js', os.path.join('lib', 'util.js')])
+            self.assertEqual(zf.read('app.js'), content)
+
+        zip_file = os.path.join(src_dir, 'app.zip')
+        with open(zip_file, 'wb') as f:
+            f.write(zip_content)
+        uploads.clear()
+        enable_zip_deploy(cmd_mock, 'rg', 'web1', zip_file)
+        self.assertEqual(uploads[1], (len(zip_content), zip_content))
+
+        post_mock.side_effect = requests.exceptions.ConnectionError('connection reset')
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            enable_zip_deploy(cmd_mock, 'rg', 'web1', zip_file)
+        self.assertEqual(post_mock.call_count, 8)
+
 
 class FakedResponse(object):  # pylint: disable=too-few-public-methods
     def __init__(self, status_code):
@@ -292,6 +292,29 @@ def validate_cert_settings(namespace):
     namespace.thumbprint_algorithm = 'sha1'
 
 
+def _get_batch_account_by_endpoint(cli_ctx, client, account_name, host):
+    """Find the Batch account with the name and endpoint host, and its resource group. Accounts in different
+    regions can have the same name."""
+    from msrestazure.azure_exceptions import CloudError
+    from msrestazure.tools import parse_resource_id
+    from azure.cli.core.commands.arm import get_resource_ids_by_name
+    for refresh in (False, True):
+        for account_id in get_resource_ids_by_name(cli_ctx, 'Microsoft.Batch/batchAccounts', account_name,
+                                                   refresh=refresh):
+            rg = parse_resource_id(account_id)['resource_group']
+            try:
+                acc = client.batch_account.get(rg, account_name)
+            except CloudError as ex:
+                if ex.status_code == 404:  # the cached account was deleted, look it up again
+                    break
+                raise
+            if acc.account_endpoint == host:
+                return acc, rg
+        else:
+            break
+    return None, None
+
+
 def validate_client_parameters(cmd, namespace):
     """Retrieves Batch connection parameters from environment variables"""
     from azure.mgmt.batch import BatchManagementClient
@@ -316,11 +339,8 @@ def validate_client_parameters(cmd, namespace):
             endpoint = urlsplit(namespace.account_endpoint)
             host = endpoint.netloc
             client = get_mgmt_service_client(cmd.cli_ctx, BatchManagementClient)
-            acc = next((x for x in client.batch_account.list()
-                        if x.name == namespace.account_name and x.account_endpoint == host), None)
+            acc, rg = _get_batch_account_by_endpoint(cmd.cli_ctx, client, namespace.account_name, host)
             if acc:
-                from msrestazure.tools import parse_resource_id
-                rg = parse_resource_id(acc.id)['resource_group']
                 namespace.account_key = \
                     client.batch_account.get_keys(rg,  # pylint: disable=no-member
                                                   namespace.account_name).primary
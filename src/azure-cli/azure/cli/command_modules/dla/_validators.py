@@ -5,34 +5,32 @@
 
 from knack.util import CLIError
 
-from azure.cli.core.commands.client_factory import get_mgmt_service_client
+from azure.cli.core.commands.client_factory import get_subscription_id
 
 
 # Helpers
-def _get_resource_group_from_account_name(client, account_name):
+def _get_resource_group_from_account_name(cli_ctx, account_name):
     """
-    Fetch resource group from vault name
-    :param str vault_name: name of the key vault
-    :return: resource group name or None
+    Fetch resource group from account name
+    :param str account_name: name of the Data Lake Analytics account
+    :return: resource group name
     :rtype: str
     """
+    from azure.cli.core.commands.arm import get_resource_ids_by_name
     from msrestazure.tools import parse_resource_id
-    for acct in client.list():
-        id_comps = parse_resource_id(acct.id)
-        if id_comps['name'] == account_name:
-            return id_comps['resource_group']
+    ids = get_resource_ids_by_name(cli_ctx, 'Microsoft.DataLakeAnalytics/accounts', account_name)
+    if ids:
+        return parse_resource_id(ids[0])['resource_group']
     raise CLIError(
         "The Resource 'Microsoft.DataLakeAnalytics/accounts/{}'".format(account_name) +
-        " not found within subscription: {}".format(client.config.subscription_id))
+        " not found within subscription: {}".format(get_subscription_id(cli_ctx)))
 
 
 # COMMAND NAMESPACE VALIDATORS
 def validate_resource_group_name(cmd, ns):
-    from azure.mgmt.datalake.analytics.account import DataLakeAnalyticsAccountManagementClient
     if not ns.resource_group_name:
         account_name = ns.account_name
-        client = get_mgmt_service_client(cmd.cli_ctx, DataLakeAnalyticsAccountManagementClient).account
-        group_name = _get_resource_group_from_account_name(client, account_name)
+        group_name = _get_resource_group_from_account_name(cmd.cli_ctx, account_name)
         ns.resource_group_name = group_name
 
 
@@ -40,23 +40,19 @@ def _get_resource_group_from_resource_name(cli_ctx, vault_name, hsm_name=None):
     :return: resource group name or None
     :rtype: str
     """
-    from azure.cli.core.profiles import ResourceType
+    from azure.cli.core.commands.arm import get_resource_ids_by_name
     from msrestazure.tools import parse_resource_id
 
     if vault_name:
-        client = get_mgmt_service_client(cli_ctx, ResourceType.MGMT_KEYVAULT).vaults
-        for vault in client.list():
-            id_comps = parse_resource_id(vault.id)
-            if id_comps.get('name', None) and id_comps['name'].lower() == vault_name.lower():
-                return id_comps['resource_group']
+        ids = get_resource_ids_by_name(cli_ctx, 'Microsoft.KeyVault/vaults', vault_name)
+        if ids:
+            return parse_resource_id(ids[0])['resource_group']
 
     if hsm_name:
-        client = get_mgmt_service_client(cli_ctx, ResourceType.MGMT_KEYVAULT).managed_hsms
         try:
-            for hsm in client.list_by_subscription():
-                id_comps = parse_resource_id(hsm.id)
-                if id_comps.get('name', None) and id_comps['name'].lower() == hsm_name.lower():
-                    return id_comps['resource_group']
+            ids = get_resource_ids_by_name(cli_ctx, 'Microsoft.KeyVault/managedHSMs', hsm_name)
+            if ids:
+                return parse_resource_id(ids[0])['resource_group']
         except:  # pylint: disable=bare-except
             return None
 
@@ -364,6 +364,8 @@ examples:
     text: az monitor activity-log list --correlation-id b5eac9d2-e829-4c9a-9efb-586d19417c5f
   - name: List events within the past hour based on resource group.
     text: az monitor activity-log list -g {ResourceGroup} --offset 1h
+  - name: Stream up to 100000 events of the past 30 days as lines of JSON.
+    text: az monitor activity-log list --offset 30d --max-events 100000 --stream
 """
 
 helps['monitor activity-log list-categories'] = """
@@ -1625,6 +1627,11 @@ examples:
 helps['monitor metrics list'] = """
 type: command
 short-summary: List the metric values for a resource.
+long-summary: >
+    To list the metrics of many resources, give their IDs with --resources, or a resource group and a resource type to
+    list the metrics of all the resources of that type in the resource group. The resources are queried concurrently,
+    and long time ranges are split into windows queried in parallel. The metrics of each resource are printed as a line
+    of JSON as soon as they are listed.
 parameters:
   - name: --aggregation
     short-summary: The list of aggregation types (space-separated) to retrieve.
@@ -1690,6 +1697,12 @@ examples:
         az monitor metrics list --resource {ResourceName} --metric Transactions \\
                                 --filter "ApiName eq '*'" \\
                                 --start-time 2017-01-01T00:00:00Z
+  - name: List the CPU usage of two VMs for the past day
+    text: >
+        az monitor metrics list --resources {VirtualMachineID} {VirtualMachineID2} --metric "Percentage CPU" --offset 1d
+  - name: List the CPU usage of all the VMs in a resource group for the past hour
+    text: >
+        az monitor metrics list -g {ResourceGroup} --resource-type Microsoft.Compute/virtualMachines --metric "Percentage CPU"
 """
 
 helps['monitor metrics list-definitions'] = """
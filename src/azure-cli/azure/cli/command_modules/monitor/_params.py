@@ -17,7 +17,7 @@ from azure.cli.command_modules.monitor.util import get_operator_map, get_aggrega
 from azure.cli.command_modules.monitor.validators import (
     process_webhook_prop, validate_autoscale_recurrence, validate_autoscale_timegrain, get_action_group_validator,
     get_action_group_id_validator, validate_metric_dimension, validate_storage_accounts_name_or_id,
-    process_subscription_id, process_workspace_data_export_destination)
+    process_subscription_id, process_workspace_data_export_destination, validate_metrics_list_resources)
 
 from knack.arguments import CLIArgumentType
 
@@ -95,7 +95,10 @@ def load_arguments(self, _):
 
     with self.argument_context('monitor metrics list') as c:
         from azure.mgmt.monitor.models import AggregationType
-        c.resource_parameter('resource', arg_group='Target Resource')
+        c.resource_parameter('resource', arg_group='Target Resource', required=False, skip_validator=True)
+        c.argument('resources', nargs='+', arg_group='Target Resource', validator=validate_metrics_list_resources,
+                   help='Space-separated list of IDs of resources to list the metrics of concurrently. '
+                        'The metrics of each resource are printed as a line of JSON as soon as they are listed.')
         c.argument('metadata', action='store_true')
         c.argument('dimension', nargs='*', validator=validate_metric_dimension)
         c.argument('aggregation', arg_type=get_enum_type(t for t in AggregationType if t.name != 'none'), nargs='*')
@@ -323,6 +326,9 @@ def load_arguments(self, _):
         activity_log_props = [x['key'] for x in EventData()._attribute_map.values()]  # pylint: disable=protected-access
         c.argument('select', nargs='+', arg_type=get_enum_type(activity_log_props))
         c.argument('max_events', type=int)
+        c.argument('stream', action='store_true',
+                   help='Split the time range into windows queried concurrently, and print the events as lines of '
+                        'JSON while they arrive. Events are de-duplicated on their ID, but not sorted.')
 
     with self.argument_context('monitor activity-log list', arg_group='Time') as c:
         c.argument('start_time', arg_type=get_datetime_type(help='Start time of the query.'))
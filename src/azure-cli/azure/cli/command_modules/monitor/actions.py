@@ -5,11 +5,15 @@
 
 import argparse
 
+from knack.log import get_logger
+
 from azure.cli.command_modules.monitor.util import (
     get_aggregation_map, get_operator_map, get_autoscale_scale_direction_map)
 
 from azure.cli.core.azclierror import InvalidArgumentValueError
 
+logger = get_logger(__name__)
+
 
 def timezone_name_type(value):
     from azure.cli.command_modules.monitor._autoscale_util import AUTOSCALE_TIMEZONES
@@ -90,12 +94,8 @@ def get_period_type(as_timedelta=False):
 class MetricAlertConditionAction(argparse._AppendAction):
 
     def __call__(self, parser, namespace, values, option_string=None):
-        # antlr4 is not available everywhere, restrict the import scope so that commands
-        # that do not need it don't fail when it is absent
-        import antlr4
-
         from azure.cli.command_modules.monitor.grammar.metric_alert import (
-            MetricAlertConditionLexer, MetricAlertConditionParser, MetricAlertConditionValidator)
+            ConditionParser, MetricAlertConditionSyntaxError, MetricAlertConditionValidator)
         from azure.mgmt.monitor.models import MetricCriteria, DynamicMetricCriteria
 
         usage = 'usage error: --condition {avg,min,max,total,count} [NAMESPACE.]METRIC\n' \
@@ -106,15 +106,15 @@ class MetricAlertConditionAction(argparse._AppendAction):
 
         string_val = ' '.join(values)
 
-        lexer = MetricAlertConditionLexer(antlr4.InputStream(string_val))
-        stream = antlr4.CommonTokenStream(lexer)
-        parser = MetricAlertConditionParser(stream)
-        tree = parser.expression()
+        try:
+            condition_parser = ConditionParser(string_val)
+        except MetricAlertConditionSyntaxError as ex:
+            logger.debug('Failed to parse the condition: %s', ex)
+            raise InvalidArgumentValueError(usage)
 
         try:
             validator = MetricAlertConditionValidator()
-            walker = antlr4.ParseTreeWalker()
-            walker.walk(validator, tree)
+            condition_parser.walk(validator)
             metric_condition = validator.result()
             if isinstance(metric_condition, MetricCriteria):
                 # static metric criteria
@@ -10,25 +10,121 @@ from knack.log import get_logger
 logger = get_logger(__name__)
 
 
+def _print_json_line(obj):
+    import json
+    import sys
+    from knack.util import todict
+    sys.stdout.write(json.dumps(todict(obj)) + '\n')
+    sys.stdout.flush()
+
+
 # region ActivityLog
-def list_activity_log(client, filters=None, correlation_id=None, resource_group=None, resource_id=None,
+# the number of windows of the time range per concurrent query when streaming the activity log, and their least size
+ACTIVITY_LOG_WINDOWS_PER_WORKER = 4
+ACTIVITY_LOG_MIN_WINDOW_MINUTES = 60
+# the most events buffered while streaming the activity log, the queries wait for them to be printed beyond that
+ACTIVITY_LOG_MAX_BUFFERED_EVENTS = 1000
+
+
+def list_activity_log(cmd, client, filters=None, correlation_id=None, resource_group=None, resource_id=None,
                       resource_provider=None, start_time=None, end_time=None, caller=None, status=None, max_events=50,
-                      select=None, offset='6h'):
+                      select=None, offset='6h', stream=False):
+    select_filters = _activity_log_select_filter_builder(select)
+    logger.info('Select Filter: %s', select_filters)
+    if stream and not filters:
+        return _stream_activity_log(cmd, client, correlation_id, resource_group, resource_id, resource_provider,
+                                    start_time, end_time, caller, status, max_events, select_filters, offset)
+
     if filters:
         odata_filters = filters
     else:
         odata_filters = _build_activity_log_odata_filter(correlation_id, resource_group, resource_id, resource_provider,
                                                          start_time, end_time, caller, status, offset)
 
-    select_filters = _activity_log_select_filter_builder(select)
     logger.info('OData Filter: %s', odata_filters)
-    logger.info('Select Filter: %s', select_filters)
     activity_log = client.list(filter=odata_filters, select=select_filters)
+    if stream:
+        for event in _limit_results(activity_log, max_events, as_list=False):
+            _print_json_line(event)
+        return None
     return _limit_results(activity_log, max_events)
 
 
-def _build_activity_log_odata_filter(correlation_id=None, resource_group=None, resource_id=None, resource_provider=None,
-                                     start_time=None, end_time=None, caller=None, status=None, offset=None):
+def _stream_activity_log(cmd, client, correlation_id, resource_group, resource_id, resource_provider, start_time,
+                         end_time, caller, status, max_events, select_filters, offset):
+    """Query windows of the time range concurrently, printing the events as lines of JSON while the pages arrive.
+
+    Events on the boundary of two windows are returned by both queries, so they are de-duplicated on their ID.
+    """
+    import threading
+    from six.moves import queue
+    from knack.util import CLIError
+    from azure.cli.core.commands import DEFAULT_MAX_CONCURRENT_IDS, iter_concurrently
+
+    start_time, end_time = _get_activity_log_time_range(start_time, end_time, offset)
+    max_workers = cmd.cli_ctx.config.getint('core', 'max_concurrent_ids', DEFAULT_MAX_CONCURRENT_IDS)
+    windows = _split_time_range(start_time, end_time, max_workers * ACTIVITY_LOG_WINDOWS_PER_WORKER,
+                                ACTIVITY_LOG_MIN_WINDOW_MINUTES * 60)
+    events = queue.Queue(maxsize=ACTIVITY_LOG_MAX_BUFFERED_EVENTS)
+    stopped = threading.Event()
+    done = object()
+
+    def _put(item):
+        # don't block forever on a full queue once the events are no longer read
+        while not stopped.is_set():
+            try:
+                events.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _list_window(window):
+        if stopped.is_set():
+            return
+        odata_filters = _build_activity_log_odata_filter(correlation_id, resource_group, resource_id,
+                                                         resource_provider, window[0], window[1], caller, status)
+        logger.info('OData Filter: %s', odata_filters)
+        for event in client.list(filter=odata_filters, select=select_filters):
+            if not _put(event):
+                return
+
+    def _list_windows():
+        try:
+            for _, _, ex in iter_concurrently(_list_window, windows, max_workers):
+                if ex:
+                    _put(ex)
+        finally:
+            _put(done)
+
+    producer = threading.Thread(target=_list_windows)
+    producer.daemon = True
+    producer.start()
+    seen, errors, printed = set(), [], 0
+    try:
+        while printed < max_events:
+            event = events.get()
+            if event is done:
+                break
+            if isinstance(event, Exception):
+                logger.error('Failed to list the activity log: %s', event)
+                errors.append(event)
+                continue
+            event_id = event.event_data_id or event.id
+            if event_id:
+                if event_id in seen:
+                    continue
+                seen.add(event_id)
+            _print_json_line(event)
+            printed += 1
+    finally:
+        stopped.set()
+    producer.join()
+    if errors:
+        raise CLIError('Failed to list the activity log of {} of {} time windows.'.format(len(errors), len(windows)))
+
+
+def _get_activity_log_time_range(start_time=None, end_time=None, offset=None):
     from datetime import datetime
     import dateutil.parser
 
@@ -41,7 +137,28 @@ def _build_activity_log_odata_filter(correlation_id=None, resource_group=None, r
     elif not end_time:
         # if no end_time, apply offset fowards from start_time
         end_time = (dateutil.parser.parse(start_time) + offset).isoformat()
+    return start_time, end_time
+
+
+def _split_time_range(start_time, end_time, count, min_seconds=1):
+    """Split the time range into at most the given number of windows of whole seconds, each at least as long as
+    given unless it's the last one."""
+    from datetime import timedelta
+    import dateutil.parser
+
+    start, end = dateutil.parser.parse(start_time), dateutil.parser.parse(end_time)
+    size = timedelta(seconds=max(min_seconds, int((end - start).total_seconds() // count) + 1))
+    windows = []
+    while start + size < end:
+        windows.append((start.isoformat(), (start + size).isoformat()))
+        start += size
+    windows.append((start.isoformat(), end.isoformat()))
+    return windows
 
+
+def _build_activity_log_odata_filter(correlation_id=None, resource_group=None, resource_id=None, resource_provider=None,
+                                     start_time=None, end_time=None, caller=None, status=None, offset=None):
+    start_time, end_time = _get_activity_log_time_range(start_time, end_time, offset)
     odata_filters = 'eventTimestamp ge {} and eventTimestamp le {}'.format(start_time, end_time)
 
     if correlation_id:
@@ -86,23 +203,23 @@ def _single(collection):
     return len([x for x in collection if x]) == 1
 
 
-def _limit_results(paged, limit):
-    results = []
-    for index, item in enumerate(paged):
-        if index < limit:
-            results.append(item)
-        else:
-            break
-    return list(results)
+def _limit_results(paged, limit, as_list=True):
+    from itertools import islice
+    results = islice(paged, limit)
+    return list(results) if as_list else results
 # endregion
 
 
 # region Metrics
+# the most data points to query a resource for at once, longer timespans are split into windows queried in parallel
+METRICS_MAX_POINTS_PER_QUERY = 1440
+
+
 # pylint:disable=unused-argument
-def list_metrics(cmd, resource,
+def list_metrics(cmd, resource=None,
                  start_time=None, end_time=None, offset='1h', interval='1m',
                  metadata=None, dimension=None, aggregation=None, metrics=None,
-                 filters=None, metric_namespace=None, orderby=None, top=10):
+                 filters=None, metric_namespace=None, orderby=None, top=10, resources=None):
 
     from azure.mgmt.monitor.models import ResultType
     from datetime import datetime
@@ -119,18 +236,107 @@ def list_metrics(cmd, resource,
         # if no end_time, apply offset fowards from start_time
         end_time = (dateutil.parser.parse(start_time) + offset).isoformat()
 
+    query = {
+        'interval': interval,
+        'metricnames': ','.join(metrics) if metrics else None,
+        'aggregation': ','.join(aggregation) if aggregation else None,
+        'top': top,
+        'orderby': orderby,
+        'filter': filters,
+        'result_type': ResultType.metadata if metadata else None,
+        'metricnamespace': metric_namespace
+    }
+    client = cf_metrics(cmd.cli_ctx, None)
+    if resources:
+        return _list_metrics_of_resources(cmd, client, resources, start_time, end_time, query)
+
     timespan = '{}/{}'.format(start_time, end_time)
+    return client.list(resource_uri=resource, timespan=quote_plus(timespan), **query)
 
-    client = cf_metrics(cmd.cli_ctx, None)
-    return client.list(
-        resource_uri=resource,
-        timespan=quote_plus(timespan),
-        interval=interval,
-        metricnames=','.join(metrics) if metrics else None,
-        aggregation=','.join(aggregation) if aggregation else None,
-        top=top,
-        orderby=orderby,
-        filter=filters,
-        result_type=ResultType.metadata if metadata else None,
-        metricnamespace=metric_namespace)
+
+def _list_metrics_of_resources(cmd, client, resources, start_time, end_time, query):
+    """Query the metrics of many resources concurrently, printing the metrics of each resource as a line of JSON as
+    soon as all its windows of the timespan are queried. The timespan isn't split when the metrics are filtered or
+    ordered by dimension."""
+    from knack.util import CLIError
+    from six.moves.urllib.parse import quote_plus
+    from azure.cli.core.commands import DEFAULT_MAX_CONCURRENT_IDS, iter_concurrently
+
+    if query['filter'] or query['orderby']:
+        # `top` and `orderby` pick the time series of the dimensions in each query, so the top series of separate
+        # windows can't be merged into the top series of the timespan
+        windows = [(start_time, end_time)]
+    else:
+        windows = _get_metrics_windows(start_time, end_time, query['interval'])
+    queries = [(resource, index, window) for resource in resources for index, window in enumerate(windows)]
+    max_workers = cmd.cli_ctx.config.getint('core', 'max_concurrent_ids', DEFAULT_MAX_CONCURRENT_IDS)
+
+    def _query(item):
+        resource, _, window = item
+        return client.list(resource_uri=resource, timespan=quote_plus('{}/{}'.format(*window)), **query)
+
+    responses = {resource: [None] * len(windows) for resource in resources}
+    failed = set()
+    for (resource, index, _), response, ex in iter_concurrently(_query, queries, max_workers):
+        if resource in failed:
+            continue
+        if ex:
+            logger.error("Failed to list the metrics of '%s': %s", resource, ex)
+            failed.add(resource)
+            continue
+        responses[resource][index] = response
+        if all(r is not None for r in responses[resource]):
+            _print_json_line(_merge_metrics_responses(responses.pop(resource)))
+    if failed:
+        raise CLIError('Failed to list the metrics of {} of {} resources.'.format(len(failed), len(resources)))
+
+
+def _get_metrics_windows(start_time, end_time, interval):
+    """Split the timespan into windows of a whole number of intervals, so that no data point spans two windows."""
+    import dateutil.parser
+    import isodate
+
+    start, end = dateutil.parser.parse(start_time), dateutil.parser.parse(end_time)
+    try:
+        window_size = isodate.parse_duration(interval) * METRICS_MAX_POINTS_PER_QUERY
+    except (isodate.ISO8601Error, TypeError):
+        window_size = None
+    if not window_size or start + window_size <= start:
+        return [(start_time, end_time)]
+
+    windows = []
+    while start + window_size < end:
+        windows.append((start.isoformat(), (start + window_size).isoformat()))
+        start += window_size
+    windows.append((start.isoformat(), end.isoformat()))
+    return windows
+
+
+def _merge_metrics_responses(responses):
+    """Merge the metrics of consecutive windows of a timespan into the first, joining the data of the same time
+    series."""
+    merged = responses[0]
+    if len(responses) == 1:
+        return merged
+    merged.timespan = '{}/{}'.format(merged.timespan.split('/')[0], responses[-1].timespan.split('/')[-1])
+    merged.cost = sum(r.cost or 0 for r in responses)
+    metrics = {metric.id: metric for metric in merged.value}
+    for response in responses[1:]:
+        for metric in response.value:
+            target = metrics.get(metric.id)
+            if target is None:
+                metrics[metric.id] = metric
+                merged.value.append(metric)
+                continue
+            series = {_get_time_series_key(ts): ts for ts in target.timeseries or []}
+            for ts in metric.timeseries or []:
+                if _get_time_series_key(ts) in series:
+                    series[_get_time_series_key(ts)].data.extend(ts.data or [])
+                else:
+                    target.timeseries = (target.timeseries or []) + [ts]
+    return merged
+
+
+def _get_time_series_key(time_series):
+    return tuple((m.name.value, m.value) for m in time_series.metadatavalues or [])
 # endregion
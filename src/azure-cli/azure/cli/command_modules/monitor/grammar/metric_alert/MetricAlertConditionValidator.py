@@ -3,9 +3,6 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
-from .MetricAlertConditionListener import MetricAlertConditionListener
-
-
 op_conversion = {
     '=': 'Equals',
     '!=': 'NotEquals',
@@ -36,8 +33,9 @@ dim_op_conversion = {
 }
 
 
-# This class defines a complete listener for a parse tree produced by MetricAlertConditionParser.
-class MetricAlertConditionValidator(MetricAlertConditionListener):
+# This class listens to the parse tree produced by ConditionParser. It doesn't derive from the ANTLR generated
+# MetricAlertConditionListener so that validating a condition doesn't need the antlr4 runtime.
+class MetricAlertConditionValidator(object):
 
     def __init__(self):
         super(MetricAlertConditionValidator, self).__init__()
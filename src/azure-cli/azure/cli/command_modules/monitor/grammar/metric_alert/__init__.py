@@ -3,8 +3,8 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+# The ANTLR generated MetricAlertConditionLexer, MetricAlertConditionParser and MetricAlertConditionListener are not
+# imported here, as the CLI parses conditions with ConditionParser and doesn't need the antlr4 runtime for it.
 # pylint: disable=unused-import
-from .MetricAlertConditionLexer import MetricAlertConditionLexer
-from .MetricAlertConditionParser import MetricAlertConditionParser
-from .MetricAlertConditionListener import MetricAlertConditionListener
+from .condition_parser import ConditionParser, MetricAlertConditionSyntaxError
 from .MetricAlertConditionValidator import MetricAlertConditionValidator
@@ -0,0 +1,274 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Hand-written recursive-descent parser for the grammar in MetricAlertCondition.g4.
+
+It builds the same parse tree as the ANTLR generated parser for the conditions that grammar accepts, and calls the
+same `enter<Rule>`/`exit<Rule>` methods of a listener, such as MetricAlertConditionValidator, for its rules. Unlike the
+ANTLR parser, which reports syntax errors and recovers from them, it raises MetricAlertConditionSyntaxError for any
+input the grammar does not match entirely.
+"""
+
+import re
+
+
+class MetricAlertConditionSyntaxError(ValueError):
+    pass
+
+
+KEYWORDS = {'where', 'and', 'includes', 'excludes', 'or', 'dynamic', 'of', 'since'}
+
+# Tokens in the order of priority of the lexer rules when they match as many characters. A NUMBER is only a NUMBER if
+# it is not the start of a longer WORD, and a lone '_' is a literal rather than a WORD.
+_TOKEN_REGEX = re.compile(r"""
+    (?P<OPERATOR><=|>=|!=|><|<|=|>)
+  | (?P<NUMBER>[0-9]+[.,][0-9]+|[0-9]+(?![A-Za-z0-9_]))
+  | (?P<WORD>[A-Za-z0-9_]{2,}|[A-Za-z0-9])
+  | (?P<QUOTE>['"])
+  | (?P<WHITESPACE>[ \t]+)
+  | (?P<NEWLINE>(?:\r?\n|\r)+)
+  | (?P<LITERAL>[./_\\:%\-,|*~+])
+""", re.VERBOSE)
+
+_NAMESPACE = {'NUMBER', 'WORD', '/', '.'}
+_METRIC = {'NUMBER', 'WORD', 'WHITESPACE', '.', '/', '_', '\\', ':', '%', '-', ',', '|'}
+_DATETIME = {'NUMBER', 'WORD', '.', '-', ':', '+'}
+_DIM_VALUE = {'NUMBER', 'WORD', '-', '.', '*', 'WHITESPACE', ':', '~', ',', '|', '%', '_'}
+_DIM_OPERATOR = {'INCLUDES', 'EXCLUDES'}
+
+
+def tokenize(text):
+    """Split the text into a list of (type, text) tokens. Literal tokens have the literal as type."""
+    tokens = []
+    pos = 0
+    end = len(text)
+    while pos < end:
+        match = _TOKEN_REGEX.match(text, pos)
+        if not match:
+            raise MetricAlertConditionSyntaxError("unexpected character '{}' at {}".format(text[pos], pos))
+        kind = match.lastgroup
+        value = match.group()
+        if kind == 'WORD' and value.lower() in KEYWORDS:
+            kind = value.upper()
+        elif kind == 'LITERAL':
+            kind = value
+        tokens.append((kind, value))
+        pos = match.end()
+    return tokens
+
+
+class RuleContext(object):
+    """A node of the parse tree, exposing the text of the tokens it spans like an ANTLR rule context."""
+
+    __slots__ = ('rule', 'start', 'stop', '_tokens')
+
+    def __init__(self, rule, tokens, start):
+        self.rule = rule
+        self.start = start
+        self.stop = start
+        self._tokens = tokens
+
+    def getText(self):  # pylint: disable=invalid-name
+        return ''.join(value for _, value in self._tokens[self.start:self.stop])
+
+
+class ConditionParser(object):  # pylint: disable=too-few-public-methods
+    """
+    Parse a condition and replay the parse tree to a listener:
+
+        validator = MetricAlertConditionValidator()
+        ConditionParser(text).walk(validator)
+    """
+
+    def __init__(self, text):
+        self._tokens = tokenize(text)
+        self._pos = 0
+        self._events = []
+        self._expression()
+
+    def walk(self, listener):
+        for method, ctx in self._events:
+            handler = getattr(listener, method, None)
+            if handler:
+                handler(ctx)
+
+    # helpers
+
+    def _type(self, offset=0):
+        index = self._pos + offset
+        return self._tokens[index][0] if index < len(self._tokens) else None
+
+    def _error(self, expected):
+        if self._pos < len(self._tokens):
+            found = "'{}'".format(self._tokens[self._pos][1])
+        else:
+            found = 'end of condition'
+        raise MetricAlertConditionSyntaxError('expected {}, found {}'.format(expected, found))
+
+    def _match(self, *kinds):
+        if self._type() not in kinds:
+            self._error(' or '.join(kinds))
+        self._pos += 1
+
+    def _enter(self, rule):
+        ctx = RuleContext(rule, self._tokens, self._pos)
+        self._events.append(('enter' + rule, ctx))
+        return ctx
+
+    def _exit(self, ctx):
+        ctx.stop = self._pos
+        self._events.append(('exit' + ctx.rule, ctx))
+
+    def _rule(self, rule, length):
+        """Add a rule spanning the next `length` tokens, which have been checked already."""
+        ctx = self._enter(rule)
+        self._pos += length
+        self._exit(ctx)
+
+    # rules
+
+    def _expression(self):
+        ctx = self._enter('Expression')
+        self._aggregation()
+        self._namespace_and_metric()
+        self._operator()
+        if self._type() == 'DYNAMIC':
+            self._dynamics()
+        else:
+            self._threshold()
+        while self._type() == 'WHITESPACE' and self._type(1) == 'WHERE':
+            self._pos += 1
+            self._dimensions()
+        while self._type() == 'NEWLINE':
+            self._pos += 1
+        # the grammar doesn't end with EOF, but unlike the ANTLR parser, don't ignore what can't be parsed
+        if self._pos < len(self._tokens):
+            self._error("'where' or end of condition")
+        self._exit(ctx)
+
+    def _aggregation(self):
+        ctx = self._enter('Aggregation')
+        self._match('WORD')
+        self._match('WHITESPACE')
+        self._exit(ctx)
+
+    def _namespace_and_metric(self):
+        # a metric can't contain an operator, so it ends at the first one
+        start = self._pos
+        end = next((i for i in range(start, len(self._tokens)) if self._tokens[i][0] == 'OPERATOR'), None)
+        if end is None:
+            self._error('OPERATOR')
+        kinds = [kind for kind, _ in self._tokens[start:end]]
+
+        if 'QUOTE' in kinds:
+            # [NAMESPACE.]QUOTE METRIC QUOTE WHITESPACE
+            quote = kinds.index('QUOTE')
+            namespace = kinds[:quote]
+            metric = kinds[quote + 1:-2]
+            if kinds[-2:] != ['QUOTE', 'WHITESPACE'] or not metric or any(k not in _METRIC for k in metric):
+                self._error('quoted METRIC')
+            if namespace:
+                if len(namespace) < 2 or namespace[-1] != '.' or any(k not in _NAMESPACE for k in namespace):
+                    self._error('NAMESPACE')
+                self._rule('Namespace', len(namespace) - 1)
+                self._match('.')
+            self._match('QUOTE')
+            self._rule('Metric', len(metric))
+            self._match('QUOTE')
+            self._match('WHITESPACE')
+            return
+
+        # [NAMESPACE.]METRIC, where the namespace is as long as possible
+        if not kinds or any(k not in _METRIC for k in kinds):
+            self._error('METRIC')
+        separator = None
+        for index, kind in enumerate(kinds[:-1]):
+            if kind not in _NAMESPACE:
+                break
+            if kind == '.' and index:
+                separator = index
+        if separator:
+            self._rule('Namespace', separator)
+            self._match('.')
+        self._rule('Metric', end - self._pos)
+
+    def _operator(self):
+        ctx = self._enter('Operator')
+        self._match('OPERATOR')
+        self._match('WHITESPACE')
+        self._exit(ctx)
+
+    def _threshold(self):
+        ctx = self._enter('Threshold')
+        self._match('NUMBER')
+        self._exit(ctx)
+
+    def _dynamics(self):
+        ctx = self._enter('Dynamics')
+        self._keyword_rule('Dynamic', 'DYNAMIC')
+        self._keyword_rule('Dyn_sensitivity', 'WORD')
+        self._keyword_rule('Dyn_violations', 'NUMBER')
+        self._keyword_rule('Dyn_of_separator', 'OF')
+        windows = self._enter('Dyn_windows')
+        self._match('NUMBER')
+        self._exit(windows)
+        while self._type() == 'WHITESPACE' and self._type(1) == 'SINCE':
+            self._pos += 1
+            self._keyword_rule('Dyn_since_seperator', 'SINCE')
+            datetime = self._enter('Dyn_datetime')
+            self._match(*_DATETIME)
+            while self._type() in _DATETIME:
+                self._pos += 1
+            self._exit(datetime)
+        self._exit(ctx)
+
+    def _keyword_rule(self, rule, kind):
+        ctx = self._enter(rule)
+        self._match(kind)
+        self._match('WHITESPACE')
+        self._exit(ctx)
+
+    def _dimensions(self):
+        ctx = self._enter('Dimensions')
+        self._keyword_rule('Where', 'WHERE')
+        self._dimension()
+        while self._type() in ('AND', ',') and self._type(1) == 'WHITESPACE':
+            self._keyword_rule('Dim_separator', self._type())
+            self._dimension()
+        self._exit(ctx)
+
+    def _dimension(self):
+        ctx = self._enter('Dimension')
+        self._keyword_rule('Dim_name', 'WORD')
+        if self._type() not in _DIM_OPERATOR:
+            self._error('includes or excludes')
+        self._keyword_rule('Dim_operator', self._type())
+        self._dim_values()
+        self._exit(ctx)
+
+    def _dim_values(self):
+        ctx = self._enter('Dim_values')
+        self._dim_value()
+        while self._type() == 'OR':
+            self._keyword_rule('Dim_val_separator', 'OR')
+            self._dim_value()
+        self._exit(ctx)
+
+    def _dim_value(self):
+        length = 0
+        while self._type(length) in _DIM_VALUE and not self._ends_dim_value(length):
+            length += 1
+        if not length:
+            self._error('dimension VALUE')
+        self._rule('Dim_value', length)
+
+    def _ends_dim_value(self, offset):
+        # the whitespace of a following `where` clause, or the comma of a following dimension
+        kind = self._type(offset)
+        if kind == 'WHITESPACE':
+            return self._type(offset + 1) == 'WHERE'
+        return kind == ',' and self._type(offset + 1) == 'WHITESPACE' and self._type(offset + 2) == 'WORD' and \
+            self._type(offset + 3) == 'WHITESPACE' and self._type(offset + 4) in _DIM_OPERATOR
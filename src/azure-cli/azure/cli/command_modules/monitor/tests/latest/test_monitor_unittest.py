@@ -90,6 +90,187 @@ class MonitorNameOrIdTest(unittest.TestCase):
         self.assertFalse(hasattr(ns, 'resource_type'))
 
 
+def _metrics_response(start, end, values, api_names=('GetBlob',)):
+    from datetime import datetime
+    from azure.mgmt.monitor.models import (Response, Metric, LocalizableString, TimeSeriesElement, MetricValue,
+                                           MetadataValue)
+    timeseries = [TimeSeriesElement(metadatavalues=[MetadataValue(name=LocalizableString(value='ApiName'), value=n)],
+                                    data=[MetricValue(time_stamp=datetime(2021, 1, 1, v), total=v) for v in values])
+                  for n in api_names]
+    return Response(timespan='{}/{}'.format(start, end), cost=len(values), value=[
+        Metric(id='id/Transactions', type='Microsoft.Insights/metrics', name=LocalizableString(value='Transactions'),
+               unit='Count', timeseries=timeseries)])
+
+
+class MonitorMetricsListTest(unittest.TestCase):
+    RESOURCES = ['/subscriptions/00000000-0000-0000-0000-000000000000/resourceGroups/my-rg/providers/'
+                 'Microsoft.Storage/storageAccounts/sa{}'.format(i) for i in range(3)]
+
+    def test_metrics_windows(self):
+        from azure.cli.command_modules.monitor.custom import _get_metrics_windows
+        self.assertEqual(_get_metrics_windows('2021-01-01T00:00:00', '2021-01-01T12:00:00', 'PT1M'),
+                         [('2021-01-01T00:00:00', '2021-01-01T12:00:00')])
+        self.assertEqual(_get_metrics_windows('2021-01-01T00:00:00', '2021-01-03T12:00:00', 'PT1M'),
+                         [('2021-01-01T00:00:00', '2021-01-02T00:00:00'),
+                          ('2021-01-02T00:00:00', '2021-01-03T00:00:00'),
+                          ('2021-01-03T00:00:00', '2021-01-03T12:00:00')])
+        self.assertEqual(len(_get_metrics_windows('2021-01-01T00:00:00', '2021-01-03T12:00:00', 'PT1H')), 1)
+
+    def test_merge_metrics_responses(self):
+        from azure.cli.command_modules.monitor.custom import _merge_metrics_responses
+        merged = _merge_metrics_responses([_metrics_response('t0', 't1', [1, 2]),
+                                           _metrics_response('t1', 't2', [3], api_names=('GetBlob', 'PutBlob'))])
+        self.assertEqual(merged.timespan, 't0/t2')
+        self.assertEqual(merged.cost, 3)
+        self.assertEqual(len(merged.value), 1)
+        get_blob, put_blob = merged.value[0].timeseries
+        self.assertEqual([v.total for v in get_blob.data], [1, 2, 3])
+        self.assertEqual([v.total for v in put_blob.data], [3])
+
+    def test_list_metrics_of_resources_streamed(self):
+        import io
+        import json
+        from six.moves.urllib.parse import unquote_plus
+        from azure.cli.command_modules.monitor.custom import list_metrics
+
+        def _list(resource_uri, timespan, **kwargs):
+            if resource_uri.endswith('sa1'):
+                raise ValueError('failed')
+            start, end = unquote_plus(timespan).split('/')
+            return _metrics_response(start, end, [int(start[8:10])])
+
+        cmd = mock.MagicMock()
+        cmd.cli_ctx.config.getint.return_value = 4
+        stdout = io.StringIO()
+        with mock.patch('azure.cli.command_modules.monitor.custom.cf_metrics') as cf_metrics, \
+                mock.patch('sys.stdout', stdout):
+            cf_metrics.return_value.list.side_effect = _list
+            with self.assertRaisesRegex(CLIError, '1 of 3 resources'):
+                list_metrics(cmd, resources=self.RESOURCES, start_time='2021-01-01T00:00:00',
+                             end_time='2021-01-03T00:00:00', interval='PT1M', metrics=['Transactions'])
+        self.assertEqual(cf_metrics.return_value.list.call_count, 6)
+        lines = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(len(lines), 2)
+        for line in lines:
+            self.assertEqual(line['timespan'], '2021-01-01T00:00:00/2021-01-03T00:00:00')
+            self.assertEqual([v['total'] for v in line['value'][0]['timeseries'][0]['data']], [1, 2])
+
+    def test_list_metrics_of_resources_top_dimensions_not_split(self):
+        import io
+        from six.moves.urllib.parse import unquote_plus
+        from azure.cli.command_modules.monitor.custom import list_metrics
+
+        cmd = mock.MagicMock()
+        cmd.cli_ctx.config.getint.return_value = 4
+        with mock.patch('azure.cli.command_modules.monitor.custom.cf_metrics') as cf_metrics, \
+                mock.patch('sys.stdout', io.StringIO()):
+            cf_metrics.return_value.list.side_effect = \
+                lambda resource_uri, timespan, **kwargs: _metrics_response(*unquote_plus(timespan).split('/'), [1])
+            list_metrics(cmd, resources=self.RESOURCES, start_time='2021-01-01T00:00:00',
+                         end_time='2021-01-03T00:00:00', interval='PT1M', metrics=['Transactions'],
+                         filters="ApiName eq '*'", orderby='total desc', top=2)
+        self.assertEqual(cf_metrics.return_value.list.call_count, 3)
+        for call in cf_metrics.return_value.list.call_args_list:
+            self.assertEqual(unquote_plus(call[1]['timespan']), '2021-01-01T00:00:00/2021-01-03T00:00:00')
+            self.assertEqual((call[1]['top'], call[1]['orderby']), (2, 'total desc'))
+
+    @mock.patch('azure.cli.core.commands.client_factory.get_subscription_id', _mock_get_subscription_id)
+    def test_metrics_list_resources_validator(self):
+        from argparse import Namespace
+        from azure.cli.command_modules.monitor.validators import validate_metrics_list_resources
+
+        def _namespace(resource=None, resources=None, resource_group=None, resource_type=None):
+            return Namespace(resource=resource, resources=resources, resource_group_name=resource_group,
+                             namespace=None, parent=None, resource_type=resource_type)
+
+        cmd = mock.MagicMock()
+        ns = _namespace('sa0', resource_group='my-rg', resource_type='Microsoft.Storage/storageAccounts')
+        validate_metrics_list_resources(cmd, ns)
+        self.assertEqual((ns.resource, ns.resources), (self.RESOURCES[0], None))
+
+        ns = _namespace(resources=self.RESOURCES)
+        validate_metrics_list_resources(cmd, ns)
+        self.assertEqual(ns.resources, self.RESOURCES)
+        with self.assertRaises(CLIError):
+            validate_metrics_list_resources(cmd, _namespace(resources=['sa0']))
+        with self.assertRaises(CLIError):
+            validate_metrics_list_resources(cmd, _namespace(resources=self.RESOURCES, resource_group='my-rg'))
+
+        with mock.patch('azure.cli.core.commands.client_factory.get_mgmt_service_client') as client_factory:
+            client_factory.return_value.resources.list_by_resource_group.return_value = [
+                mock.MagicMock(id=r) for r in self.RESOURCES]
+            ns = _namespace(resource_group='my-rg', resource_type='Microsoft.Storage/storageAccounts')
+            validate_metrics_list_resources(cmd, ns)
+            self.assertEqual(ns.resources, self.RESOURCES)
+            client_factory.return_value.resources.list_by_resource_group.assert_called_once_with(
+                'my-rg', filter="resourceType eq 'Microsoft.Storage/storageAccounts'")
+            self.assertFalse(hasattr(ns, 'resource_group_name'))
+
+
+class MonitorActivityLogStreamTest(unittest.TestCase):
+
+    def _list(self, filter, select=None):  # pylint: disable=redefined-builtin
+        import re
+        from datetime import timedelta
+        import dateutil.parser
+        from azure.mgmt.monitor.models import EventData
+        self.filters.append(filter)
+        start, end = [dateutil.parser.parse(t) for t in re.findall(r'eventTimestamp \w\w (\S+)', filter)]
+        # an event every hour, returned by both windows on their boundary
+        events = []
+        time = start.replace(minute=0, second=0)
+        while time <= end:
+            if time >= start:
+                event = EventData()
+                event.event_data_id = time.isoformat()
+                events.append(event)
+            time += timedelta(hours=1)
+        return iter(events)
+
+    def _stream(self, max_events, start_time='2021-01-01T00:00:00', end_time='2021-01-03T00:00:00'):
+        import io
+        import json
+        from azure.cli.command_modules.monitor.custom import list_activity_log
+        self.filters = []
+        cmd = mock.MagicMock()
+        cmd.cli_ctx.config.getint.return_value = 4
+        client = mock.MagicMock()
+        client.list.side_effect = self._list
+        stdout = io.StringIO()
+        with mock.patch('sys.stdout', stdout):
+            self.assertIsNone(list_activity_log(cmd, client, resource_group='my-rg', start_time=start_time,
+                                                end_time=end_time, max_events=max_events, stream=True))
+        return [json.loads(line)['eventDataId'] for line in stdout.getvalue().splitlines()]
+
+    def test_activity_log_streamed_from_windows(self):
+        events = self._stream(1000)
+        self.assertEqual(len(self.filters), 16)
+        self.assertTrue(all("resourceGroupName eq 'my-rg'" in f for f in self.filters))
+        self.assertEqual(len(events), 49)
+        self.assertEqual(len(set(events)), 49)
+
+        self.assertEqual(len(self._stream(10)), 10)
+
+        # short time ranges aren't split into windows shorter than an hour
+        self.assertEqual(len(self._stream(1000, end_time='2021-01-01T03:00:00')), 4)
+        self.assertEqual(len(self.filters), 3)
+
+    @mock.patch('azure.cli.command_modules.monitor.custom.ACTIVITY_LOG_MAX_BUFFERED_EVENTS', 2)
+    def test_activity_log_streamed_through_bounded_buffer(self):
+        self.assertEqual(len(set(self._stream(1000))), 49)
+        # the queries blocked on the full buffer stop once enough events are printed
+        self.assertEqual(len(self._stream(3)), 3)
+
+    def test_split_time_range(self):
+        from azure.cli.command_modules.monitor.custom import _split_time_range
+        self.assertEqual(_split_time_range('2021-01-01T00:00:00', '2021-01-01T00:00:10', 3),
+                         [('2021-01-01T00:00:00', '2021-01-01T00:00:04'),
+                          ('2021-01-01T00:00:04', '2021-01-01T00:00:08'),
+                          ('2021-01-01T00:00:08', '2021-01-01T00:00:10')])
+        self.assertEqual(_split_time_range('2021-01-01T00:00:00', '2021-01-01T00:00:10', 3, 60),
+                         [('2021-01-01T00:00:00', '2021-01-01T00:00:10')])
+
+
 class MonitorMetricAlertActionTest(unittest.TestCase):
 
     def _build_namespace(self, name_or_id=None, resource_group=None, provider_namespace=None, parent=None,
@@ -157,6 +338,89 @@ class MonitorMetricAlertActionTest(unittest.TestCase):
         self.check_condition(ns, 'Average', None, 'SuccessE2ELatenc,|y', 'GreaterThan', '250')
         self.check_dimension(ns, 0, 'ApiName', 'Include', ['Get|,%_Blob', 'PutB,_lob'])
 
+        ns = self._build_namespace()
+        self.call_condition(ns, 'max Microsoft.Storage/storageAccounts.Transactions > dynamic High 2 of 4 '
+                                'since 2020-01-01T00:00:00Z where ApiName includes GetBlob, GeoType excludes *')
+        prop = ns.condition[0]
+        self.assertEqual((prop.metric_namespace, prop.metric_name, prop.alert_sensitivity),
+                         ('Microsoft.Storage/storageAccounts', 'Transactions', 'High'))
+        self.assertEqual((prop.failing_periods.min_failing_periods_to_alert,
+                          prop.failing_periods.number_of_evaluation_periods), (2, 4))
+        self.check_dimension(ns, 1, 'GeoType', 'Exclude', ['*'])
+
+        # the ANTLR parser recovered from these syntax errors, dropping what it couldn't parse
+        for condition in ['avg CPU! > 90', 'avg CPU > 90 where ApiName includes GetBlob%where', 'avg CPU > 90 "']:
+            ns = self._build_namespace()
+            with self.assertRaisesRegexp(CLIError, 'usage error: --condition'):
+                self.call_condition(ns, condition)
+
+        ns = self._build_namespace()
+        with self.assertRaisesRegexp(ValueError, 'Violations 5.0 should be smaller or equal to windows 4.0.'):
+            self.call_condition(ns, 'avg CPU > dynamic low 5 of 4')
+
+    def test_monitor_metric_alert_condition_parser_matches_antlr(self):
+        import antlr4
+        from azure.cli.command_modules.monitor.grammar.metric_alert import (
+            ConditionParser, MetricAlertConditionSyntaxError, MetricAlertConditionValidator)
+        from azure.cli.command_modules.monitor.grammar.metric_alert.MetricAlertConditionLexer import \
+            MetricAlertConditionLexer
+        from azure.cli.command_modules.monitor.grammar.metric_alert.MetricAlertConditionListener import \
+            MetricAlertConditionListener
+        from azure.cli.command_modules.monitor.grammar.metric_alert.MetricAlertConditionParser import \
+            MetricAlertConditionParser
+
+        class _AntlrValidator(MetricAlertConditionValidator, MetricAlertConditionListener):
+            pass
+
+        def _events(listener_base, parse):
+            events = []
+
+            class _Recorder(listener_base):
+                def __getattribute__(self, name):
+                    if name.startswith(('enter', 'exit')) and not name.endswith('EveryRule'):
+                        return lambda ctx: events.append((name, ctx.getText()))
+                    return super(_Recorder, self).__getattribute__(name)
+
+            parse(_Recorder())
+            return events
+
+        def _antlr_parse(condition, listener):
+            lexer = MetricAlertConditionLexer(antlr4.InputStream(condition))
+            parser = MetricAlertConditionParser(antlr4.CommonTokenStream(lexer))
+            parser.removeErrorListeners()
+            tree = parser.expression()
+            self.assertEqual(parser.getNumberOfSyntaxErrors(), 0, condition)
+            antlr4.ParseTreeWalker().walk(listener, tree)
+
+        conditions = [
+            'avg ns.foo/bar_doo > 90',
+            'avg a.b..c/d.Percentage CPU, |x\\y:z%-1 <= 1.5',
+            "min 1.5.'CPU Percent' != 0",
+            'total "a.b" >< 1 where ApiName includes Get,Blob or Put|Blob, a or b, Name excludes *:~-._%',
+            'count E2E >= 1,5 where a INCLUDES b and c Excludes d where e includes f or g\n',
+            'max x < dynamic medium 1 of 1 since 2020-01-01T00:00:00.000+08:00 since 2021-01-01T00:00:00Z '
+            'where Name includes or1 OR 2',
+        ]
+        for condition in conditions:
+            self.assertEqual(_events(_AntlrValidator, lambda listener, c=condition: _antlr_parse(c, listener)),
+                             _events(MetricAlertConditionValidator,
+                                     lambda listener, c=condition: ConditionParser(c).walk(listener)))
+
+            results = []
+            for validator, parse in [(_AntlrValidator(), _antlr_parse),
+                                     (MetricAlertConditionValidator(), lambda c, v: ConditionParser(c).walk(v))]:
+                try:
+                    parse(condition, validator)
+                    results.append(validator.result().as_dict())
+                except IndexError as ex:  # for a second `where` clause
+                    results.append(str(ex))
+            self.assertEqual(results[0], results[1])
+
+        for condition in ['avg cpu >90', 'avg CPU > 90 garbage', 'avg Data Of Something > 90', 'avg "cpu > 1',
+                          'avg cpu > 90 where a includes b and', 'avg cpu > 90 where a includes or b']:
+            with self.assertRaises(MetricAlertConditionSyntaxError):
+                ConditionParser(condition)
+
 
 class MonitorAutoscaleActionTest(unittest.TestCase):
 
@@ -140,6 +140,50 @@ def get_target_resource_validator(dest, required, preserve_resource_group_parame
     return _validator
 
 
+def validate_metrics_list_resources(cmd, namespace):
+    """Validate the resources to list the metrics of: a single resource by name or ID, many resources by ID, or all
+    the resources of a type in a resource group."""
+    from msrestazure.tools import is_valid_resource_id
+
+    if namespace.resources is None and (namespace.resource or not namespace.resource_type):
+        get_target_resource_validator('resource', required=True)(cmd, namespace)
+        return
+
+    usage_error = CLIError('usage error: --resource ID | --resource NAME --resource-group NAME --resource-type TYPE '
+                           '[--resource-parent PARENT] [--resource-namespace NAMESPACE] | --resources ID [ID ...] | '
+                           '--resource-group NAME --resource-type TYPE [--resource-namespace NAMESPACE]')
+    if namespace.resource:
+        raise usage_error
+    if namespace.resources:
+        if any((namespace.resource_group_name, namespace.namespace, namespace.parent, namespace.resource_type)):
+            raise usage_error
+        invalid_ids = [r for r in namespace.resources if not is_valid_resource_id(r)]
+        if invalid_ids:
+            raise InvalidArgumentValueError('Invalid resource IDs: {}'.format(', '.join(invalid_ids)))
+    else:
+        # all the resources of a type in a resource group
+        res_type = namespace.resource_type
+        if '/' not in res_type and namespace.namespace:
+            res_type = '{}/{}'.format(namespace.namespace, res_type)
+        if not namespace.resource_group_name or '/' not in res_type or namespace.parent:
+            raise usage_error
+
+        from azure.cli.core.commands.client_factory import get_mgmt_service_client
+        from azure.cli.core.profiles import ResourceType
+        client = get_mgmt_service_client(cmd.cli_ctx, ResourceType.MGMT_RESOURCE_RESOURCES).resources
+        namespace.resources = [r.id for r in client.list_by_resource_group(
+            namespace.resource_group_name, filter="resourceType eq '{}'".format(res_type))]
+        if not namespace.resources:
+            from azure.cli.core.azclierror import ResourceNotFoundError
+            raise ResourceNotFoundError("No resources of type '{}' found in resource group '{}'.".format(
+                res_type, namespace.resource_group_name))
+
+    del namespace.namespace
+    del namespace.parent
+    del namespace.resource_type
+    del namespace.resource_group_name
+
+
 def validate_metrics_alert_dimension(namespace):
     from azure.cli.command_modules.monitor.grammar.metric_alert.MetricAlertConditionValidator import dim_op_conversion
     for keyword, value in dim_op_conversion.items():
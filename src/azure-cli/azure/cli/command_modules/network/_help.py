@@ -2471,6 +2471,12 @@ examples:
   - name: Import a local zone file into a DNS zone resource.
     text: >
         az network dns zone import -g MyResourceGroup -n MyZone -f /path/to/zone/file
+  - name: Make a DNS zone resource match a local zone file, changing only the record sets that differ.
+    text: >
+        az network dns zone import -g MyResourceGroup -n MyZone -f /path/to/zone/file --sync
+  - name: List the changes a zone file would make to a DNS zone resource.
+    text: >
+        az network dns zone import -g MyResourceGroup -n MyZone -f /path/to/zone/file --sync --dry-run
 """
 
 helps['network dns zone list'] = """
@@ -632,6 +632,8 @@ def load_arguments(self, _):
 
     with self.argument_context('network dns zone import') as c:
         c.argument('file_name', options_list=['--file-name', '-f'], type=file_type, completer=FilesCompleter(), help='Path to the DNS zone file to import')
+        c.argument('sync', action='store_true', help='Make the zone match the file: compare it with the existing record sets, then only create, update and delete the record sets that differ, concurrently.')
+        c.argument('dry_run', action='store_true', help='List the record sets the import would create, update or delete, without changing the zone.')
 
     with self.argument_context('network dns zone export') as c:
         c.argument('file_name', options_list=['--file-name', '-f'], type=file_type, completer=FilesCompleter(), help='Path to the DNS zone file to save')
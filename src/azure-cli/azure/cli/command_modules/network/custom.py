@@ -2,7 +2,7 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
-from collections import Counter, OrderedDict
+from collections import Counter
 
 from msrestazure.tools import parse_resource_id, is_valid_resource_id, resource_id
 
@@ -18,7 +18,8 @@ from azure.cli.core.util import CLIError, sdk_no_wait, find_child_item, find_chi
 from azure.cli.command_modules.network._client_factory import network_client_factory
 
 from azure.cli.command_modules.network.zone_file.parse_zone_file import parse_zone_file
-from azure.cli.command_modules.network.zone_file.make_zone_file import make_zone_file
+from azure.cli.command_modules.network.zone_file.make_zone_file import (
+    write_zone_file_header, write_zone_file_record_set)
 from azure.cli.core.profiles import ResourceType, supported_api_version
 from azure.cli.core.azclierror import ResourceNotFoundError, UnrecognizedArgumentError
 
@@ -2072,79 +2073,104 @@ def _type_to_property_name(key):
 
 
 def export_zone(cmd, resource_group_name, zone_name, file_name=None):
+    """Export a zone file, writing the record sets page by page as they are listed, so that the records of large
+    zones aren't all kept in memory."""
+    import shutil
+    import sys
+    import tempfile
     from time import localtime, strftime
+    from six import StringIO
 
     client = get_mgmt_service_client(cmd.cli_ctx, ResourceType.MGMT_NETWORK_DNS)
     record_sets = client.record_sets.list_by_dns_zone(resource_group_name, zone_name)
+    zone_name = zone_name.rstrip('.')
+
+    zone_ttl, soa_record_set = None, None
+    previous_record_set_name = None
+    # the record sets other than the SOA record set, which must come first but whose minimum TTL goes in the header
+    with tempfile.TemporaryFile('w+') as records_file:
+        for record_set in record_sets:
+            record_type = record_set.type.rsplit('/', 1)[1].lower()
+            records = _get_zone_file_records(record_set, record_type)
+
+            # ignore empty record sets
+            if not records:
+                continue
+
+            if record_type == 'soa':
+                zone_ttl = records[0]['minimum']
+                soa_record_set = (record_set.name, {record_type: records})
+                continue
+
+            write_zone_file_record_set(records_file, zone_name, record_set.name, {record_type: records},
+                                       print_name=record_set.name != previous_record_set_name)
+            previous_record_set_name = record_set.name
+
+        header = StringIO()
+        write_zone_file_header(header, zone_name, resource_group_name, strftime('%a, %d %b %Y %X %z', localtime()),
+                               zone_ttl, zone_name + '.')
+        if soa_record_set:
+            write_zone_file_record_set(header, zone_name, *soa_record_set)
+
+        def _write_zone_file(zone_file):
+            zone_file.write(header.getvalue())
+            records_file.seek(0)
+            shutil.copyfileobj(records_file, zone_file)
+
+        _write_zone_file(sys.stdout)
+        print()
+        if file_name:
+            try:
+                with open(file_name, 'w') as f:
+                    _write_zone_file(f)
+            except IOError:
+                raise CLIError('Unable to export to file: {}'.format(file_name))
+
+
+def _get_zone_file_records(record_set, record_type):
+    """Get the records of a record set in the format of the zone file writer."""
+    record_data = getattr(record_set, _type_to_property_name(record_type), None)
+    if not record_data:
+        return []
+
+    if not isinstance(record_data, list):
+        record_data = [record_data]
+
+    records = []
+    for record in record_data:
+
+        record_obj = {'ttl': record_set.ttl}
 
-    zone_obj = OrderedDict({
-        '$origin': zone_name.rstrip('.') + '.',
-        'resource-group': resource_group_name,
-        'zone-name': zone_name.rstrip('.'),
-        'datetime': strftime('%a, %d %b %Y %X %z', localtime())
-    })
-
-    for record_set in record_sets:
-        record_type = record_set.type.rsplit('/', 1)[1].lower()
-        record_set_name = record_set.name
-        record_data = getattr(record_set, _type_to_property_name(record_type), None)
-
-        # ignore empty record sets
-        if not record_data:
-            continue
-
-        if not isinstance(record_data, list):
-            record_data = [record_data]
-
-        if record_set_name not in zone_obj:
-            zone_obj[record_set_name] = OrderedDict()
-
-        for record in record_data:
-
-            record_obj = {'ttl': record_set.ttl}
-
-            if record_type not in zone_obj[record_set_name]:
-                zone_obj[record_set_name][record_type] = []
-
-            if record_type == 'aaaa':
-                record_obj.update({'ip': record.ipv6_address})
-            elif record_type == 'a':
-                record_obj.update({'ip': record.ipv4_address})
-            elif record_type == 'caa':
-                record_obj.update({'val': record.value, 'tag': record.tag, 'flags': record.flags})
-            elif record_type == 'cname':
-                record_obj.update({'alias': record.cname.rstrip('.') + '.'})
-            elif record_type == 'mx':
-                record_obj.update({'preference': record.preference, 'host': record.exchange.rstrip('.') + '.'})
-            elif record_type == 'ns':
-                record_obj.update({'host': record.nsdname.rstrip('.') + '.'})
-            elif record_type == 'ptr':
-                record_obj.update({'host': record.ptrdname.rstrip('.') + '.'})
-            elif record_type == 'soa':
-                record_obj.update({
-                    'mname': record.host.rstrip('.') + '.',
-                    'rname': record.email.rstrip('.') + '.',
-                    'serial': int(record.serial_number), 'refresh': record.refresh_time,
-                    'retry': record.retry_time, 'expire': record.expire_time,
-                    'minimum': record.minimum_ttl
-                })
-                zone_obj['$ttl'] = record.minimum_ttl
-            elif record_type == 'srv':
-                record_obj.update({'priority': record.priority, 'weight': record.weight,
-                                   'port': record.port, 'target': record.target.rstrip('.') + '.'})
-            elif record_type == 'txt':
-                record_obj.update({'txt': ''.join(record.value)})
-
-            zone_obj[record_set_name][record_type].append(record_obj)
-
-    zone_file_content = make_zone_file(zone_obj)
-    print(zone_file_content)
-    if file_name:
-        try:
-            with open(file_name, 'w') as f:
-                f.write(zone_file_content)
-        except IOError:
-            raise CLIError('Unable to export to file: {}'.format(file_name))
+        if record_type == 'aaaa':
+            record_obj.update({'ip': record.ipv6_address})
+        elif record_type == 'a':
+            record_obj.update({'ip': record.ipv4_address})
+        elif record_type == 'caa':
+            record_obj.update({'val': record.value, 'tag': record.tag, 'flags': record.flags})
+        elif record_type == 'cname':
+            record_obj.update({'alias': record.cname.rstrip('.') + '.'})
+        elif record_type == 'mx':
+            record_obj.update({'preference': record.preference, 'host': record.exchange.rstrip('.') + '.'})
+        elif record_type == 'ns':
+            record_obj.update({'host': record.nsdname.rstrip('.') + '.'})
+        elif record_type == 'ptr':
+            record_obj.update({'host': record.ptrdname.rstrip('.') + '.'})
+        elif record_type == 'soa':
+            record_obj.update({
+                'mname': record.host.rstrip('.') + '.',
+                'rname': record.email.rstrip('.') + '.',
+                'serial': int(record.serial_number), 'refresh': record.refresh_time,
+                'retry': record.retry_time, 'expire': record.expire_time,
+                'minimum': record.minimum_ttl
+            })
+        elif record_type == 'srv':
+            record_obj.update({'priority': record.priority, 'weight': record.weight,
+                               'port': record.port, 'target': record.target.rstrip('.') + '.'})
+        elif record_type == 'txt':
+            record_obj.update({'txt': ''.join(record.value)})
+
+        records.append(record_obj)
+    return records
 
 
 # pylint: disable=too-many-return-statements, inconsistent-return-statements
@@ -2186,8 +2212,7 @@ def _build_record(cmd, data):
 
 
 # pylint: disable=too-many-statements
-def import_zone(cmd, resource_group_name, zone_name, file_name):
-    from azure.cli.core.util import read_file_content
+def import_zone(cmd, resource_group_name, zone_name, file_name, sync=False, dry_run=False):
     from azure.core.exceptions import HttpResponseError
     import sys
     logger.warning("In the future, zone name will be case insensitive.")
@@ -2195,18 +2220,20 @@ def import_zone(cmd, resource_group_name, zone_name, file_name):
 
     from azure.cli.core.azclierror import FileOperationError, UnclassifiedUserFault
     try:
-        file_text = read_file_content(file_name)
+        # the zone file is parsed line by line as it is read
+        with _open_zone_file(file_name) as f:
+            zone_obj = parse_zone_file(f, zone_name)
     except FileNotFoundError:
         raise FileOperationError("No such file: " + str(file_name))
     except IsADirectoryError:
         raise FileOperationError("Is a directory: " + str(file_name))
     except PermissionError:
         raise FileOperationError("Permission denied: " + str(file_name))
+    except UnicodeError:
+        raise FileOperationError('Failed to decode file {} - unknown decoding'.format(file_name))
     except OSError as e:
         raise UnclassifiedUserFault(e)
 
-    zone_obj = parse_zone_file(file_text, zone_name)
-
     origin = zone_name
     record_sets = {}
     for record_set_name in zone_obj:
@@ -2245,37 +2272,24 @@ def import_zone(cmd, resource_group_name, zone_name, file_name):
                 _add_record(record_set, record, record_set_type,
                             is_list=record_set_type.lower() not in ['soa', 'cname'])
 
-    total_records = 0
-    for key, rs in record_sets.items():
-        rs_name, rs_type = key.lower().rsplit('.', 1)
-        rs_name = rs_name[:-(len(origin) + 1)] if rs_name != origin else '@'
-        try:
-            record_count = len(getattr(rs, _type_to_property_name(rs_type)))
-        except TypeError:
-            record_count = 1
-        total_records += record_count
+    import_record_sets = _get_import_record_sets(record_sets, origin)
+    client = get_mgmt_service_client(cmd.cli_ctx, ResourceType.MGMT_NETWORK_DNS)
+    if sync or dry_run:
+        return _import_zone_changes(cmd, client, resource_group_name, zone_name, import_record_sets,
+                                    delete=sync, dry_run=dry_run)
+
+    total_records = sum(_get_record_count(rs, rs_type) for _, rs_type, rs in import_record_sets)
     cum_records = 0
 
-    client = get_mgmt_service_client(cmd.cli_ctx, ResourceType.MGMT_NETWORK_DNS)
     print('== BEGINNING ZONE IMPORT: {} ==\n'.format(zone_name), file=sys.stderr)
 
     Zone = cmd.get_models('Zone', resource_type=ResourceType.MGMT_NETWORK_DNS)
     client.zones.create_or_update(resource_group_name, zone_name, Zone(location='global'))
-    for key, rs in record_sets.items():
-
-        rs_name, rs_type = key.lower().rsplit('.', 1)
-        rs_name = '@' if rs_name == origin else rs_name
-        if rs_name.endswith(origin):
-            rs_name = rs_name[:-(len(origin) + 1)]
-
-        try:
-            record_count = len(getattr(rs, _type_to_property_name(rs_type)))
-        except TypeError:
-            record_count = 1
+    for rs_name, rs_type, rs in import_record_sets:
+        record_count = _get_record_count(rs, rs_type)
         if rs_name == '@' and rs_type == 'soa':
             root_soa = client.record_sets.get(resource_group_name, zone_name, '@', 'SOA')
             rs.soa_record.host = root_soa.soa_record.host
-            rs_name = '@'
         elif rs_name == '@' and rs_type == 'ns':
             root_ns = client.record_sets.get(resource_group_name, zone_name, '@', 'NS')
             root_ns.ttl = rs.ttl
@@ -2293,6 +2307,127 @@ def import_zone(cmd, resource_group_name, zone_name, file_name):
           .format(cum_records, total_records, zone_name), file=sys.stderr)
 
 
+def _open_zone_file(file_name):
+    """Open a zone file for reading, detecting UTF-16 and UTF-8 with or without BOM from its first bytes."""
+    import codecs
+    with open(file_name, 'rb') as f:
+        bom = f.read(4)
+    if bom.startswith(codecs.BOM_UTF8):
+        encoding = 'utf-8-sig'
+    elif bom.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        encoding = 'utf-16'
+    else:
+        encoding = 'utf-8'
+    logger.debug("reading file %s as %s", file_name, encoding)
+    return open(file_name, encoding=encoding)
+
+
+def _get_import_record_sets(record_sets, origin):
+    """Get the (name relative to the origin, type, record set) of the record sets parsed from a zone file."""
+    result = []
+    for key, rs in record_sets.items():
+        rs_name, rs_type = key.lower().rsplit('.', 1)
+        rs_name = '@' if rs_name == origin else rs_name
+        if rs_name.endswith(origin):
+            rs_name = rs_name[:-(len(origin) + 1)]
+        result.append((rs_name, rs_type, rs))
+    return result
+
+
+def _get_record_count(record_set, record_type):
+    try:
+        return len(getattr(record_set, _type_to_property_name(record_type)))
+    except TypeError:
+        return 1
+
+
+def _get_record_set_records(record_set, record_type):
+    import json
+    records = getattr(record_set, _type_to_property_name(record_type), None)
+    if records is None:
+        return []
+    records = records if isinstance(records, list) else [records]
+    return sorted((r.as_dict() for r in records), key=lambda r: json.dumps(r, sort_keys=True))
+
+
+# pylint: disable=too-many-locals
+def _import_zone_changes(cmd, client, resource_group_name, zone_name, import_record_sets, delete=False,
+                         dry_run=False):
+    """Apply only the differences between the record sets of a zone file and those of the zone, concurrently, or
+    list them if `dry_run`. Record sets missing from the zone file are deleted if `delete`, before any record set is
+    created or updated, as a record set may replace one of another type with the same name, e.g. a CNAME one."""
+    import sys
+    import threading
+    from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
+    from azure.cli.core.commands import DEFAULT_MAX_CONCURRENT_IDS, run_concurrently
+    RecordSet, Zone = cmd.get_models('RecordSet', 'Zone', resource_type=ResourceType.MGMT_NETWORK_DNS)
+
+    def _list_record_sets():
+        return {(rs.name.lower(), rs.type.rsplit('/', 1)[1].lower()): rs
+                for rs in client.record_sets.list_by_dns_zone(resource_group_name, zone_name)}
+
+    try:
+        existing = _list_record_sets()
+    except ResourceNotFoundError:
+        existing = {}
+        if not dry_run:
+            client.zones.create_or_update(resource_group_name, zone_name, Zone(location='global'))
+            existing = _list_record_sets()
+
+    changes = []
+    for rs_name, rs_type, rs in import_record_sets:
+        current = existing.pop((rs_name, rs_type), None)
+        if current and rs_name == '@' and rs_type == 'soa':
+            rs.soa_record.host = current.soa_record.host
+        elif current and rs_name == '@' and rs_type == 'ns':
+            # the name servers of the zone are assigned by Azure DNS, only their TTL is imported
+            rs = RecordSet(ttl=rs.ttl, ns_records=current.ns_records)
+        if current is None:
+            changes.append(('create', rs_name, rs_type, rs))
+        elif current.ttl != rs.ttl or current.target_resource or \
+                _get_record_set_records(current, rs_type) != _get_record_set_records(rs, rs_type):
+            changes.append(('update', rs_name, rs_type, rs))
+    if delete:
+        changes.extend(('delete', rs_name, rs_type, rs) for (rs_name, rs_type), rs in existing.items()
+                       if not (rs_name == '@' and rs_type in ['soa', 'ns']))
+
+    if dry_run:
+        return [{'action': action, 'name': rs_name, 'type': rs_type.upper(), 'ttl': rs.ttl,
+                 'records': _get_record_set_records(rs, rs_type)} for action, rs_name, rs_type, rs in changes]
+
+    lock = threading.Lock()
+    applied = []
+    past_tenses = {'create': 'Created', 'update': 'Updated', 'delete': 'Deleted'}
+
+    def _apply_change(change):
+        action, rs_name, rs_type, rs = change
+        if action == 'delete':
+            client.record_sets.delete(resource_group_name, zone_name, rs_name, rs_type)
+        else:
+            client.record_sets.create_or_update(resource_group_name, zone_name, rs_name, rs_type, rs)
+        with lock:
+            applied.append(change)
+            print("({}/{}) {} record set of type '{}' and name '{}'"
+                  .format(len(applied), len(changes), past_tenses[action], rs_type, rs_name), file=sys.stderr)
+
+    print('== BEGINNING ZONE IMPORT: {} ({} changes) ==\n'.format(zone_name, len(changes)), file=sys.stderr)
+    max_workers = cmd.cli_ctx.config.getint('core', 'max_concurrent_ids', DEFAULT_MAX_CONCURRENT_IDS)
+    failures = 0
+    for deleting in (True, False):
+        for _, ex in run_concurrently(_apply_change, [c for c in changes if (c[0] == 'delete') == deleting],
+                                      max_workers):
+            if isinstance(ex, HttpResponseError):
+                logger.error(ex)
+                failures += 1
+            elif ex is not None:
+                raise ex
+    print("\n== {}/{} RECORD SET CHANGES APPLIED SUCCESSFULLY: '{}' =="
+          .format(len(applied), len(changes), zone_name), file=sys.stderr)
+    if failures:
+        raise CLIError('{} of {} record set changes failed to apply to zone {}.'
+                       .format(failures, len(changes), zone_name))
+
+
 def add_dns_aaaa_record(cmd, resource_group_name, zone_name, record_set_name, ipv6_address,
                         ttl=3600, if_none_match=None):
     AaaaRecord = cmd.get_models('AaaaRecord', resource_type=ResourceType.MGMT_NETWORK_DNS)
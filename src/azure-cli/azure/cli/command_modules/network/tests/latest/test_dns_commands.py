@@ -659,6 +659,13 @@ class DnsParseZoneFiles(unittest.TestCase):
         ])
         self._check_a(zone, '*.' + zn, [(3600, '2.3.4.5')])
 
+    def test_zone_file_streamed(self):
+        from azure.cli.command_modules.network.custom import _open_zone_file
+        for i in range(1, 10):
+            file_name, zone_name = 'zone{}.txt'.format(i), 'zone{}.com'.format(i)
+            with _open_zone_file(os.path.join(TEST_DIR, 'zone_files', file_name)) as f:
+                self.assertEqual(parse_zone_file(f, zone_name), self._get_zone_object(file_name, zone_name))
+
     def test_zone_import_errors(self):
         from knack.util import CLIError
         for f in ['fail1', 'fail2', 'fail3', 'fail4', 'fail5']:
@@ -76,6 +76,117 @@ class TestNetworkUnitTests(unittest.TestCase):
         self.assertEqual(len(result), 2)
         self.assertEqual(result[1].value, 'noodle')
 
+    def test_network_dns_zone_import_sync(self):
+        import os
+        import tempfile
+        from azure.cli.core.mock import DummyCli
+        from azure.cli.core.profiles import ResourceType, get_sdk
+        from azure.cli.command_modules.network.custom import import_zone
+
+        cli_ctx = DummyCli()
+        RecordSet = get_sdk(cli_ctx, ResourceType.MGMT_NETWORK_DNS, 'RecordSet', mod='models')
+        cmd = mock.MagicMock(cli_ctx=cli_ctx)
+        cmd.get_models.side_effect = lambda *names, **kwargs: get_sdk(cli_ctx, ResourceType.MGMT_NETWORK_DNS, *names,
+                                                                      mod='models')
+
+        def _record_set(name, record_type, ttl, **properties):
+            properties['TTL'] = ttl
+            return RecordSet.deserialize({'name': name, 'type': 'Microsoft.Network/dnszones/' + record_type,
+                                          'properties': properties})
+
+        client = mock.MagicMock()
+        client.record_sets.list_by_dns_zone.return_value = [
+            _record_set('@', 'SOA', 3600, SOARecord={
+                'host': 'ns1-01.azure-dns.com.', 'email': 'azuredns-hostmaster.microsoft.com.', 'serialNumber': 1,
+                'refreshTime': 3600, 'retryTime': 300, 'expireTime': 2419200, 'minimumTTL': 300}),
+            _record_set('@', 'NS', 172800, NSRecords=[{'nsdname': 'ns1-01.azure-dns.com.'}]),
+            _record_set('www', 'A', 3600, ARecords=[{'ipv4Address': '10.0.0.1'}]),
+            _record_set('mail', 'A', 3600, ARecords=[{'ipv4Address': '10.0.0.9'}]),
+            _record_set('old', 'CNAME', 3600, CNAMERecord={'cname': 'contoso.com.'})]
+
+        fd, zone_file = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as f:
+            f.write('$ORIGIN example.com.\n'
+                    '@ 3600 IN SOA ns1-01.azure-dns.com. azuredns-hostmaster.microsoft.com. '
+                    '( 1 3600 300 2419200 300 )\n'
+                    '@ 300 NS ns1.example.com.\n'
+                    'www 3600 A 10.0.0.1\n'
+                    'mail 3600 A 10.0.0.2\n'
+                    'new 60 TXT "hello"\n')
+        self.addCleanup(os.remove, zone_file)
+
+        with mock.patch('azure.cli.command_modules.network.custom.get_mgmt_service_client', return_value=client):
+            changes = import_zone(cmd, 'rg', 'example.com', zone_file, sync=True, dry_run=True)
+            self.assertEqual(sorted((c['action'], c['name'], c['type'], c['ttl']) for c in changes),
+                             [('create', 'new', 'TXT', 60), ('delete', 'old', 'CNAME', 3600),
+                              ('update', '@', 'NS', 300), ('update', 'mail', 'A', 3600)])
+            client.record_sets.create_or_update.assert_not_called()
+
+            import_zone(cmd, 'rg', 'example.com', zone_file, sync=True)
+        client.zones.create_or_update.assert_not_called()
+        updates = {(c[0][2], c[0][3]): c[0][4] for c in client.record_sets.create_or_update.call_args_list}
+        self.assertEqual(sorted(updates), [('@', 'ns'), ('mail', 'a'), ('new', 'txt')])
+        self.assertEqual([r.nsdname for r in updates[('@', 'ns')].ns_records], ['ns1-01.azure-dns.com.'])
+        client.record_sets.delete.assert_called_once_with('rg', 'example.com', 'old', 'cname')
+
+        # record sets are deleted before any is created, and failed changes fail the command
+        from azure.core.exceptions import HttpResponseError
+        calls = []
+        client.record_sets.delete.side_effect = lambda *args: calls.append('delete')
+
+        def _create_or_update(*args):
+            calls.append('create_or_update')
+            if args[2] == 'mail':
+                raise HttpResponseError('conflict')
+
+        client.record_sets.create_or_update.side_effect = _create_or_update
+        with mock.patch('azure.cli.command_modules.network.custom.get_mgmt_service_client', return_value=client):
+            with self.assertRaisesRegex(CLIError, '1 of 4 record set changes failed'):
+                import_zone(cmd, 'rg', 'example.com', zone_file, sync=True)
+        self.assertEqual(calls, ['delete'] + ['create_or_update'] * 3)
+
+        # other errors aren't swallowed
+        client.record_sets.create_or_update.side_effect = ValueError('bad record set')
+        with mock.patch('azure.cli.command_modules.network.custom.get_mgmt_service_client', return_value=client):
+            with self.assertRaisesRegex(ValueError, 'bad record set'):
+                import_zone(cmd, 'rg', 'example.com', zone_file, sync=True)
+
+    def test_network_dns_zone_export_streamed(self):
+        import os
+        import tempfile
+        from azure.cli.core.mock import DummyCli
+        from azure.cli.core.profiles import ResourceType, get_sdk
+        from azure.cli.command_modules.network.custom import export_zone
+        from azure.cli.command_modules.network.zone_file import parse_zone_file
+
+        RecordSet = get_sdk(DummyCli(), ResourceType.MGMT_NETWORK_DNS, 'RecordSet', mod='models')
+        client = mock.MagicMock()
+        # the SOA record set must be written first, whatever the order it is listed in
+        client.record_sets.list_by_dns_zone.return_value = iter([
+            RecordSet.deserialize({'name': name, 'type': 'Microsoft.Network/dnszones/' + record_type,
+                                   'properties': properties}) for name, record_type, properties in [
+                ('@', 'NS', {'TTL': 172800, 'NSRecords': [{'nsdname': 'ns1-01.azure-dns.com.'}]}),
+                ('www', 'A', {'TTL': 60, 'ARecords': [{'ipv4Address': '10.0.0.1'}, {'ipv4Address': '10.0.0.2'}]}),
+                ('@', 'SOA', {'TTL': 3600, 'SOARecord': {
+                    'host': 'ns1-01.azure-dns.com.', 'email': 'azuredns-hostmaster.microsoft.com.',
+                    'serialNumber': 1, 'refreshTime': 3600, 'retryTime': 300, 'expireTime': 2419200,
+                    'minimumTTL': 300}}),
+                ('www', 'TXT', {'TTL': 60, 'TXTRecords': [{'value': ['hello']}]})]])
+
+        fd, zone_file = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, zone_file)
+        with mock.patch('azure.cli.command_modules.network.custom.get_mgmt_service_client', return_value=client), \
+                mock.patch('sys.stdout'):
+            export_zone(mock.MagicMock(), 'rg', 'example.com', zone_file)
+
+        with open(zone_file) as f:
+            zone = parse_zone_file(f, 'example.com')
+        self.assertEqual(list(zone), ['example.com.', 'www.example.com.'])
+        self.assertEqual(list(zone['example.com.']), ['soa', 'ns'])
+        self.assertEqual([r['ip'] for r in zone['www.example.com.']['a']], ['10.0.0.1', '10.0.0.2'])
+        self.assertEqual(zone['www.example.com.']['txt'][0]['txt'], ['hello'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -26,4 +26,5 @@
 # pylint: skip-file
 
 from azure.cli.command_modules.network.zone_file.parse_zone_file import parse_zone_file
-from azure.cli.command_modules.network.zone_file.make_zone_file import make_zone_file
+from azure.cli.command_modules.network.zone_file.make_zone_file import (
+    make_zone_file, write_zone_file_header, write_zone_file_record_set)
@@ -92,12 +92,10 @@ def _tokenize_line(line, quote_strings=False, infer_name=True):
     quote = False
     tokbuf = ""
     firstchar = True
-    ll = list(line)
-    while len(ll) > 0:
-        c = ll.pop(0)
+    for c in line:
         if c.isspace():
             if firstchar:
-                # used by the _add_record_names method
+                # used to infer the name of the record from the previous one
                 tokbuf += '$NAME' if infer_name else ' '
 
             if not quote and not escape:
@@ -210,101 +208,55 @@ def _serialize(tokens):
     return " ".join(ret)
 
 
-def _remove_comments(text):
+def _iter_record_lines(lines):
     """
-    Remove comments from a zonefile
-    """
-    ret = []
-    lines = text.split("\n")
-    for line in lines:
-        if not line:
-            continue
-
-        index = _find_comment_index(line)
-        if index != -1:
-            line = line[:index]
-        if line:
-            ret.append(line)
-
-    return "\n".join(ret)
-
-
-def _flatten(text):
-    """
-    Flatten the text:
-    * make sure each record is on one line.
-    * remove parenthesis
+    Stream the records of a zonefile, one line each:
+    * remove comments
+    * flatten records split over several lines within parenthesis
     * remove Windows line endings
+    * ensure that a name is defined, using the previous record name if there is none
     """
-    lines = text.split('\n')
-    SENTINEL = '%%%'
-
-    # tokens: sequence of non-whitespace separated by '' where a newline was
-    tokens = []
-    for line in (x for x in lines if len(x) > 0):
-        line = line.replace('\t', ' ')
-        tokens += _tokenize_line(line, quote_strings=True, infer_name=False)
-        tokens.append(SENTINEL)
-
-    # find (...) and turn it into a single line ("capture" it)
     capturing = False
     captured = []
-
-    flattened = []
-    while len(tokens) > 0:
-        tok = tokens.pop(0)
-
-        if tok == '$NAME':
-            tok = ' '
-
-        if not capturing and tok == SENTINEL:
-            # normal end-of-line
-            if len(captured) > 0:
-                flattened.append(" ".join(captured))
-                captured = []
-            continue
-
-        if tok.startswith("("):
-            # begin grouping
-            tok = tok.lstrip("(")
-            capturing = True
-
-        if capturing and tok.endswith(")"):
-            # end grouping.  next end-of-line will turn this sequence into a flat line
-            tok = tok.rstrip(")")
-            capturing = False
-
-        if tok != SENTINEL:
-            captured.append(tok)
-
-    return "\n".join(flattened)
-
-
-def _add_record_names(text):
-    """
-    Go through each line of the text and ensure that
-    a name is defined.  Use previous record name if there is none.
-    """
-    global SUPPORTED_RECORDS
-
-    lines = text.split("\n")
-    ret = []
     previous_record_name = None
 
     for line in lines:
-        tokens = _tokenize_line(line)
-        if not tokens:
+        line = line.rstrip('\r\n')
+        index = _find_comment_index(line)
+        if index != -1:
+            line = line[:index]
+        if not line:
             continue
 
-        record_name = tokens[0]
-        if record_name == '$NAME':
-            tokens = [previous_record_name] + tokens[1:]
-        elif not record_name.startswith('$'):
-            previous_record_name = record_name
+        for tok in _tokenize_line(line.replace('\t', ' '), quote_strings=True, infer_name=False) + [None]:
+            if tok is None:
+                if capturing or not captured:
+                    continue
+                # normal end-of-line
+                tokens = _tokenize_line(" ".join(captured))
+                captured = []
+                if not tokens:
+                    continue
 
-        ret.append(_serialize(tokens))
+                record_name = tokens[0]
+                if record_name == '$NAME':
+                    tokens = [previous_record_name] + tokens[1:]
+                elif not record_name.startswith('$'):
+                    previous_record_name = record_name
+                yield _serialize(tokens)
+                continue
 
-    return "\n".join(ret)
+            if tok.startswith("("):
+                # begin grouping
+                tok = tok.lstrip("(")
+                capturing = True
+
+            if capturing and tok.endswith(")"):
+                # end grouping.  next end-of-line will turn this sequence into a flat line
+                tok = tok.rstrip(")")
+                capturing = False
+
+            captured.append(tok)
 
 
 def _convert_to_seconds(value):
@@ -407,20 +359,17 @@ def _post_check_names(zone):
 
 def parse_zone_file(text, zone_name, ignore_invalid=False):
     """
-    Parse a zonefile into a dict
+    Parse a zonefile into a dict. The zonefile is either a string or an iterable of lines, like an open file,
+    which is read line by line.
     """
-
-    text = _remove_comments(text)
-    text = _flatten(text)
-    text = _add_record_names(text)
+    lines = text.split("\n") if isinstance(text, str) else text
 
     zone_obj = OrderedDict()
-    record_lines = text.split("\n")
     current_origin = zone_name.rstrip('.') + '.'
     current_ttl = 3600
     soa_processed = False
 
-    for record_line in record_lines:
+    for record_line in _iter_record_lines(lines):
         parse_match = False
         record = None
         for record_type, regex in _COMPILED_REGEX.items():
@@ -433,6 +382,8 @@ def parse_zone_file(text, zone_name, ignore_invalid=False):
 
         if not parse_match and not ignore_invalid:
             raise InvalidArgumentValueError('Unable to parse: {}'.format(record_line))
+        if not parse_match:
+            continue
 
         record_type = record['delim'].lower()
         if record_type == '$origin':
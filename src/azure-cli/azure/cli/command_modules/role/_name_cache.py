@@ -0,0 +1,82 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import time
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+NAME_CACHE_FILE = 'roleNameCache.json'
+# minutes to keep the names looked up, configurable as `role.name_cache_ttl`
+DEFAULT_NAME_CACHE_TTL = 60
+
+PRINCIPAL_NAMES = 'principalNames'
+ROLE_NAMES = 'roleNames'
+
+
+class RoleNameCache(object):
+    """
+    Persistent cache of the display names of principals and role definitions by ID, backed by a JSON file per cloud
+    in the config dir.
+
+    Role assignments only carry the IDs of their principal and role definition, so listing them means looking up
+    the names of many objects in Graph. The names looked up are kept for `role.name_cache_ttl` minutes. Set the TTL
+    to 0 to turn the cache off.
+    """
+
+    def __init__(self, cli_ctx):
+        self.cli_ctx = cli_ctx
+        self.ttl = int(cli_ctx.config.get('role', 'name_cache_ttl', DEFAULT_NAME_CACHE_TTL)) * 60
+        self._scope = cli_ctx.cloud.name
+        self._session = None
+        self._modified = False
+
+    def get(self, kind, keys):
+        """Get the fresh values of the keys found in the cache, by key. Keys are case-insensitive."""
+        if self.ttl <= 0:
+            return {}
+        entries = self._get_entries(kind)
+        now = time.time()
+        result = {}
+        for key in keys:
+            entry = entries.get(key.lower())
+            if entry and entry[0] + self.ttl > now:
+                result[key] = entry[1]
+        return result
+
+    def set(self, kind, values):
+        """Cache the values by key, until `save` is called."""
+        if self.ttl <= 0 or not values:
+            return
+        entries = self._get_entries(kind)
+        now = time.time()
+        for key, value in values.items():
+            entries[key.lower()] = [now, value]
+        self._modified = True
+
+    def save(self):
+        if not self._modified:
+            return
+        now = time.time()
+        for entries in self._session.data.get(self._scope, {}).values():
+            for expired in [k for k, e in entries.items() if e[0] + self.ttl <= now]:
+                del entries[expired]
+        try:
+            self._session.save_with_retry()
+        except OSError as ex:
+            logger.debug('Failed to save the role name cache: %s', ex)
+        self._modified = False
+
+    def _get_entries(self, kind):
+        if self._session is None:
+            from azure.cli.core._session import Session
+            self._session = Session()
+            try:
+                self._session.load(os.path.join(self.cli_ctx.config.config_dir, NAME_CACHE_FILE))
+            except OSError as ex:
+                logger.debug('Failed to load the role name cache: %s', ex)
+        return self._session.data.setdefault(self._scope, {}).setdefault(kind, {})
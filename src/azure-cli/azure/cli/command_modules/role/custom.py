@@ -32,6 +32,7 @@ from azure.graphrbac.models import (ApplicationCreateParameters, ApplicationUpda
 
 from ._client_factory import _auth_client_factory, _graph_client_factory
 from ._multi_api_adaptor import MultiAPIAdaptor
+from ._name_cache import RoleNameCache, PRINCIPAL_NAMES, ROLE_NAMES
 
 CREDENTIAL_WARNING_MESSAGE = (
     "The output includes credentials that you must protect. Be sure that you do not include these credentials in "
@@ -218,11 +219,19 @@ def list_role_assignments(cmd, assignee=None, role=None, resource_group_name=Non
 
     # 1. fill in logic names to get things understandable.
     # (it's possible that associated roles and principals were deleted, and we just do nothing.)
-    # 2. fill in role names
-    role_defs = list(definitions_client.list(
-        scope=scope or ('/subscriptions/' + definitions_client.config.subscription_id)))
+    # 2. fill in role names, listing the role definitions only if some aren't in the cache
     worker = MultiAPIAdaptor(cmd.cli_ctx)
-    role_dics = {i.id: worker.get_role_property(i, 'role_name') for i in role_defs}
+    name_cache = RoleNameCache(cmd.cli_ctx)
+    role_def_ids = set(worker.get_role_property(i, 'roleDefinitionId')
+                       for i in results if not i.get('roleDefinitionName'))
+    role_def_ids.discard(None)
+    role_dics = name_cache.get(ROLE_NAMES, role_def_ids)
+    if len(role_dics) < len(role_def_ids):
+        role_defs = list(definitions_client.list(
+            scope=scope or ('/subscriptions/' + definitions_client.config.subscription_id)))
+        listed_role_dics = {i.id: worker.get_role_property(i, 'role_name') for i in role_defs}
+        name_cache.set(ROLE_NAMES, listed_role_dics)
+        role_dics.update(listed_role_dics)
     for i in results:
         if not i.get('roleDefinitionName'):
             if role_dics.get(worker.get_role_property(i, 'roleDefinitionId')):
@@ -236,9 +245,16 @@ def list_role_assignments(cmd, assignee=None, role=None, resource_group_name=Non
                         for i in results if worker.get_role_property(i, 'principalId'))
 
     if principal_ids:
+        principal_dics = name_cache.get(PRINCIPAL_NAMES, principal_ids)
         try:
-            principals = _get_object_stubs(graph_client, principal_ids)
-            principal_dics = {i.object_id: _get_displayable_name(i) for i in principals}
+            missing_ids = principal_ids.difference(principal_dics)
+            if missing_ids:
+                from azure.cli.core.commands import DEFAULT_MAX_CONCURRENT_IDS
+                max_workers = cmd.cli_ctx.config.getint('core', 'max_concurrent_ids', DEFAULT_MAX_CONCURRENT_IDS)
+                principals = _get_object_stubs(graph_client, missing_ids, max_workers)
+                resolved_dics = {i.object_id: _get_displayable_name(i) for i in principals}
+                name_cache.set(PRINCIPAL_NAMES, resolved_dics)
+                principal_dics.update(resolved_dics)
 
             for i in [r for r in results if not r.get('principalName')]:
                 i['principalName'] = ''
@@ -248,6 +264,7 @@ def list_role_assignments(cmd, assignee=None, role=None, resource_group_name=Non
         except (CloudError, GraphErrorException) as ex:
             # failure on resolving principal due to graph permission should not fail the whole thing
             logger.info("Failed to resolve graph object information per error '%s'", ex)
+    name_cache.save()
 
     for r in results:
         if not r.get('additionalProperties'):  # remove the useless "additionalProperties"
@@ -1843,6 +1860,10 @@ def _resolve_object_id(cli_ctx, assignee, fallback_to_object_id=False):
                            "If the assignee is an appId, make sure the corresponding service principal is created "
                            "with 'az ad sp create --id {assignee}'.".format(assignee=assignee))
 
+        # the object ID of an assignee changes when it's recreated, so only its name is cached for listings
+        name_cache = RoleNameCache(cli_ctx)
+        name_cache.set(PRINCIPAL_NAMES, {result[0].object_id: _get_displayable_name(result[0])})
+        name_cache.save()
         return result[0].object_id
     except (CloudError, GraphErrorException):
         if fallback_to_object_id and is_guid(assignee):
@@ -1850,14 +1871,24 @@ def _resolve_object_id(cli_ctx, assignee, fallback_to_object_id=False):
         raise
 
 
-def _get_object_stubs(graph_client, assignees):
+def _get_object_stubs(graph_client, assignees, max_workers=1):
+    """Get the objects by object ID, in batches of 1000 IDs, running up to max_workers batches at a time."""
     from azure.graphrbac.models import GetObjectsParameters
-    result = []
     assignees = list(assignees)  # callers could pass in a set
-    for i in range(0, len(assignees), 1000):
-        params = GetObjectsParameters(include_directory_object_references=True, object_ids=assignees[i:i + 1000])
-        result += list(graph_client.objects.get_objects_by_object_ids(params))
-    return result
+
+    def _get_batch(object_ids):
+        params = GetObjectsParameters(include_directory_object_references=True, object_ids=object_ids)
+        return list(graph_client.objects.get_objects_by_object_ids(params))
+
+    batches = [assignees[i:i + 1000] for i in range(0, len(assignees), 1000)]
+    if len(batches) > 1 and max_workers > 1:
+        from azure.cli.core.commands import run_concurrently
+        outcomes = run_concurrently(_get_batch, batches, max_workers)
+        for _, ex in outcomes:
+            if ex:
+                raise ex
+        return [stub for stubs, _ in outcomes for stub in stubs]
+    return [stub for batch in batches for stub in _get_batch(batch)]
 
 
 def _get_owner_url(cli_ctx, owner_object_id):
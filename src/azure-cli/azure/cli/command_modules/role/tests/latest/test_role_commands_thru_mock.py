@@ -25,7 +25,8 @@ from azure.cli.command_modules.role.custom import (create_role_definition,
                                                    _get_object_stubs,
                                                    list_service_principal_owners,
                                                    list_application_owners,
-                                                   delete_role_assignments)
+                                                   delete_role_assignments,
+                                                   list_role_assignments)
 
 from knack.util import CLIError
 
@@ -359,6 +360,44 @@ class TestRoleMocked(unittest.TestCase):
         # assert
         prompt_mock.assert_called_once_with(mock.ANY, 'n')
 
+    @mock.patch('azure.cli.command_modules.role.custom._graph_client_factory', autospec=True)
+    @mock.patch('azure.cli.command_modules.role.custom._auth_client_factory', autospec=True)
+    def test_role_assignment_list_caches_names(self, auth_client_mock, graph_client_mock):
+        import shutil
+        from azure.mgmt.authorization.models import RoleAssignment
+        config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, config_dir)
+        role_id = self.default_scope + '/providers/Microsoft.Authorization/roleDefinitions/reader'
+        assignments = [RoleAssignment(role_definition_id=role_id, principal_id='principal{}'.format(i))
+                       for i in range(1500)]
+        for a in assignments:
+            a.scope = self.default_scope
+        factory = auth_client_mock.return_value
+        factory.role_assignments.list_for_scope.return_value = assignments
+        factory.role_definitions.config.subscription_id = self.subscription_id
+        role_def = RoleDefinition(role_name='Reader')
+        role_def.id = role_id
+        factory.role_definitions.list.return_value = [role_def]
+        graph_client = graph_client_mock.return_value
+        graph_client.objects.get_objects_by_object_ids.side_effect = lambda params: [
+            mock.MagicMock(object_id=i, user_principal_name=i + '@contoso.com') for i in params.object_ids]
+
+        cmd = mock.MagicMock()
+        cmd.cli_ctx = DummyCli()
+        with mock.patch.object(cmd.cli_ctx.config, 'config_dir', config_dir):
+            for _ in range(2):
+                result = list_role_assignments(cmd)
+                self.assertEqual(len(result), 1500)
+                self.assertEqual(result[1]['roleDefinitionName'], 'Reader')
+                self.assertEqual(result[1]['principalName'], 'principal1@contoso.com')
+            factory.role_definitions.list.assert_called_once()
+            self.assertEqual(graph_client.objects.get_objects_by_object_ids.call_count, 2)
+
+            with mock.patch.object(cmd.cli_ctx.config, 'get', return_value='0'):
+                list_role_assignments(cmd)
+            self.assertEqual(factory.role_definitions.list.call_count, 2)
+            self.assertEqual(graph_client.objects.get_objects_by_object_ids.call_count, 4)
+
     @mock.patch('azure.cli.command_modules.role.custom._graph_client_factory', autospec=True)
     def test_role_list_app_owner(self, graph_client_mock):
 
@@ -407,6 +446,13 @@ class TestRoleMocked(unittest.TestCase):
             args, _ = call
             self.assertEqual(args[0].object_ids, group)
 
+    def test_get_object_stubs_concurrently(self):
+        graph_client = mock.MagicMock()
+        graph_client.objects.get_objects_by_object_ids.side_effect = lambda params: params.object_ids
+
+        self.assertEqual(_get_object_stubs(graph_client, range(2500), max_workers=3), list(range(2500)))
+        self.assertEqual(graph_client.objects.get_objects_by_object_ids.call_count, 3)
+
 
 class FakedError(object):  # pylint: disable=too-few-public-methods
     def __init__(self, message):
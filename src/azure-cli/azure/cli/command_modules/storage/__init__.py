@@ -203,9 +203,10 @@ class StorageCommandGroup(AzCommandGroup):
         if generic_update:
             command_name = '{} {}'.format(self.group_name, name) if self.group_name else name
             self.generic_update_command(name, **kwargs)
-        elif command_type:
-            command_name = self.command(name, method_name, command_type=command_type, **kwargs)
         else:
+            _merge_new_exception_handler(kwargs, self.get_handler_invalidate_cached_keys())
+            if command_type:
+                kwargs['command_type'] = command_type
             command_name = self.command(name, method_name, **kwargs)
         self._register_data_plane_account_arguments(command_name)
         if oauth:
@@ -216,6 +217,7 @@ class StorageCommandGroup(AzCommandGroup):
         self.storage_command(*args, oauth=True, **kwargs)
 
     def storage_custom_command(self, name, method_name, oauth=False, **kwargs):
+        _merge_new_exception_handler(kwargs, self.get_handler_invalidate_cached_keys())
         command_name = self.custom_command(name, method_name, **kwargs)
         self._register_data_plane_account_arguments(command_name)
         if oauth:
@@ -225,6 +227,16 @@ class StorageCommandGroup(AzCommandGroup):
         _merge_new_exception_handler(kwargs, self.get_handler_suppress_some_400())
         self.storage_custom_command(*args, oauth=True, **kwargs)
 
+    def get_handler_invalidate_cached_keys(self):
+        cli_ctx = self.command_loader.cli_ctx
+
+        def handler(ex):
+            from ._account_cache import is_authentication_failure, invalidate_keys_in_use
+            if is_authentication_failure(ex):
+                invalidate_keys_in_use(cli_ctx)
+
+        return handler
+
     @classmethod
     def get_handler_suppress_some_400(cls):
         def handler(ex):
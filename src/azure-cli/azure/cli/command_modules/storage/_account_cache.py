@@ -0,0 +1,148 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import time
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+ACCOUNT_CACHE_FILE = 'storageAccountCache.json'
+ACCOUNT_KEY_FILE = 'storageAccountCache.key'
+# minutes to keep the storage account name -> resource group index, configurable as `storage.account_cache_ttl`
+DEFAULT_ACCOUNT_CACHE_TTL = 1440
+# names of the accounts whose key the command got from the cache. Kept at module level rather than in cli_ctx.data,
+# which the invoker copies for each job.
+_cached_keys_in_use = set()
+
+
+class StorageAccountCache(object):
+    """
+    Persistent, per-subscription cache of storage account lookups backed by a JSON file in the config dir.
+
+    The resource group of every account found by a subscription-wide listing is indexed, so later data-plane commands
+    that only get `--account-name` can skip the listing. Account keys are only cached when `storage.cache_account_keys`
+    is turned on, and are encrypted with a key kept in a file that only the current user can read.
+    """
+
+    def __init__(self, cli_ctx):
+        from azure.cli.core._session import Session
+        from azure.cli.core.commands.client_factory import get_subscription_id
+
+        self.cli_ctx = cli_ctx
+        config = cli_ctx.config
+        self.ttl = int(config.get('storage', 'account_cache_ttl', DEFAULT_ACCOUNT_CACHE_TTL)) * 60
+        self.cache_keys = config.getboolean('storage', 'cache_account_keys', False)
+        self._scope = '{}/{}'.format(cli_ctx.cloud.name, get_subscription_id(cli_ctx))
+        self._session = Session()
+        if self.ttl > 0:
+            self._session.load(os.path.join(config.config_dir, ACCOUNT_CACHE_FILE))
+
+    @property
+    def _accounts(self):
+        return self._session[self._scope]
+
+    def _get_entry(self, account_name):
+        if self.ttl <= 0:
+            return None
+        entry = self._accounts.get(account_name)
+        if entry and entry.get('time', 0) + self.ttl > time.time():
+            return entry
+        return None
+
+    def get_resource_group(self, account_name):
+        entry = self._get_entry(account_name)
+        if entry:
+            logger.info("Found resource group of storage account '%s' in the local cache.", account_name)
+            return entry['resource_group']
+        return None
+
+    def set_resource_groups(self, resource_groups):
+        """Index the resource groups of the given {account name: resource group} mapping."""
+        if self.ttl <= 0:
+            return
+        now = time.time()
+        accounts = self._accounts
+        for account_name, resource_group in resource_groups.items():
+            entry = accounts.get(account_name)
+            if not entry or entry.get('resource_group') != resource_group:
+                entry = {'resource_group': resource_group}
+            entry['time'] = now
+            accounts[account_name] = entry
+        for account_name in [n for n in accounts if n not in resource_groups]:
+            del accounts[account_name]
+        self._save()
+
+    def get_key(self, account_name):
+        entry = self._get_entry(account_name)
+        if not self.cache_keys or not entry or 'key' not in entry:
+            return None
+        from cryptography.fernet import InvalidToken
+        try:
+            key = self._get_cipher().decrypt(entry['key'].encode('utf-8')).decode('utf-8')
+        except InvalidToken:
+            logger.info("Failed to decrypt the cached key of storage account '%s'.", account_name)
+            return None
+        logger.info("Found key of storage account '%s' in the local cache.", account_name)
+        _cached_keys_in_use.add(account_name)
+        return key
+
+    def set_key(self, account_name, resource_group, key):
+        if not self.cache_keys or self.ttl <= 0:
+            return
+        self._accounts[account_name] = {
+            'resource_group': resource_group,
+            'key': self._get_cipher().encrypt(key.encode('utf-8')).decode('utf-8'),
+            'time': time.time()
+        }
+        self._save()
+
+    def invalidate(self, account_name):
+        if self._accounts.pop(account_name, None):
+            self._save()
+
+    def _save(self):
+        try:
+            self._session.save_with_retry()
+        except OSError as ex:
+            logger.info('Failed to save the storage account cache: %s', ex)
+
+    def _get_cipher(self):
+        from cryptography.fernet import Fernet
+        key_file = os.path.join(self.cli_ctx.config.config_dir, ACCOUNT_KEY_FILE)
+        try:
+            with open(key_file, 'rb') as f:
+                return Fernet(f.read())
+        except (OSError, ValueError):
+            secret = Fernet.generate_key()
+            fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(secret)
+            return Fernet(secret)
+
+
+def is_authentication_failure(ex):
+    """Whether the storage service rejected the credentials of a request, e.g. a key that has been rotated."""
+    if getattr(ex, 'status_code', None) != 403:
+        return False
+    error_code = getattr(ex, 'error_code', None)
+    if error_code:
+        return error_code == 'AuthenticationFailed'
+    # the error code of the legacy SDK is only in the message
+    return 'AuthenticationFailed' in str(ex)
+
+
+def invalidate_keys_in_use(cli_ctx):
+    """Drop the cached keys the command used, so the next command queries them again."""
+    account_names = set(_cached_keys_in_use)
+    _cached_keys_in_use.clear()
+    if not account_names:
+        return
+    cache = StorageAccountCache(cli_ctx)
+    for account_name in account_names:
+        cache.invalidate(account_name)
+    logger.warning('Removed the cached key of storage account %s, as authentication with it failed. '
+                   'Run the command again to query the current key.', ', '.join(sorted(account_names)))
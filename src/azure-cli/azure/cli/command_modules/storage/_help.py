@@ -757,6 +757,9 @@ examples:
   - name: Delete all blobs with the format 'cli-201x-xx-xx.txt' except cli-2018-xx-xx.txt' and 'cli-2019-xx-xx.txt' in a container.
     text: |
         az storage blob delete-batch -s mycontainer --pattern cli-201[!89]-??-??.txt
+  - name: Delete all blobs in a container, grouping the deletes into Blob Batch requests sent 8 at a time.
+    text: |
+        az storage blob delete-batch -s mycontainer --account-name mystorageaccount --account-key 00000000 --use-batch-api --max-concurrency 8
 """
 
 helps['storage blob download-batch'] = """
@@ -790,6 +793,9 @@ examples:
   - name: Download all blobs with the format 'cli-201x-xx-xx.txt' except cli-2018-xx-xx.txt' and 'cli-2019-xx-xx.txt' in container to current path.
     text: |
         az storage blob download-batch -d . -s mycontainer --pattern cli-201[!89]-??-??.txt
+  - name: Download all blobs in a container, transferring up to 16 blobs in parallel.
+    text: |
+        az storage blob download-batch -d . -s mycontainer --max-concurrency 16 --max-retries 2
 """
 
 helps['storage blob exists'] = """
@@ -1078,6 +1084,9 @@ examples:
   - name: Upload all files with the format 'cli-201x-xx-xx.txt' except cli-2018-xx-xx.txt' and 'cli-2019-xx-xx.txt' in a container.
     text: |
         az storage blob upload-batch -d mycontainer -s <path-to-directory> --pattern cli-201[!89]-??-??.txt
+  - name: Upload all files from local path directory, transferring up to 16 files in parallel.
+    text: |
+        az storage blob upload-batch -d mycontainer -s <path-to-directory> --max-concurrency 16 --max-retries 2
 """
 
 helps['storage blob url'] = """
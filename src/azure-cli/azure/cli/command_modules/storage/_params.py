@@ -824,6 +824,9 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.argument('blob_type', options_list=('--type', '-t'), arg_type=get_enum_type(get_blob_types()))
         c.extra('no_progress', progress_type)
         c.extra('socket_timeout', socket_timeout_type)
+        c.argument('max_concurrency', type=int, help='Maximum number of files to upload in parallel.')
+        c.argument('max_retries', type=int,
+                   help='Number of times to retry uploading a file after a transient failure.')
 
     with self.argument_context('storage blob download') as c:
         c.argument('file_path', options_list=('--file', '-f'), type=file_type,
@@ -843,6 +846,9 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.extra('socket_timeout', socket_timeout_type)
         c.argument('max_connections', type=int,
                    help='Maximum number of parallel connections to use when the blob size exceeds 64MB.')
+        c.argument('max_concurrency', type=int, help='Maximum number of blobs to download in parallel.')
+        c.argument('max_retries', type=int,
+                   help='Number of times to retry downloading a blob after a transient failure.')
 
     with self.argument_context('storage blob delete') as c:
         from .sdkutil import get_delete_blob_snapshot_type_names
@@ -854,6 +860,10 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.argument('delete_snapshots', arg_type=get_enum_type(get_delete_blob_snapshot_type_names()),
                    help='Required if the blob has associated snapshots.')
         c.argument('lease_id', help='The active lease id for the blob.')
+        c.argument('max_concurrency', type=int, help='Maximum number of delete requests to send in parallel.')
+        c.argument('use_batch_api', arg_type=get_three_state_flag(),
+                   help='Group up to 256 deletes into a single Blob Batch request. Requires the storage account key '
+                        'or a SAS token.')
 
     with self.argument_context('storage blob lease') as c:
         c.argument('blob_name', arg_type=blob_name_type)
@@ -984,6 +994,9 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.argument('source_container')
         c.argument('source_share')
 
+    with self.argument_context('storage blob copy start-batch') as c:
+        c.argument('max_concurrency', type=int, help='Maximum number of copy operations to start in parallel.')
+
     with self.argument_context('storage blob incremental-copy start') as c:
         from azure.cli.command_modules.storage._validators import process_blob_source_uri
 
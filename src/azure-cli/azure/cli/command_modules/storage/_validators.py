@@ -34,7 +34,29 @@ logger = get_logger(__name__)
 # pylint: disable=inconsistent-return-statements,too-many-lines
 def _query_account_key(cli_ctx, account_name):
     """Query the storage account key. This is used when the customer doesn't offer account key but name."""
-    rg, scf = _query_account_rg(cli_ctx, account_name)
+    from ._account_cache import StorageAccountCache
+    cache = StorageAccountCache(cli_ctx)
+    key = cache.get_key(account_name)
+    if key:
+        return key
+
+    from azure.core.exceptions import HttpResponseError
+    cached_rg = cache.get_resource_group(account_name)
+    rg, scf = _query_account_rg(cli_ctx, account_name, cache=cache)
+    try:
+        key = _list_account_key(cli_ctx, scf, rg, account_name)
+    except HttpResponseError:
+        if not cached_rg:
+            raise
+        # the cached resource group may be stale, e.g. when the account was moved
+        cache.invalidate(account_name)
+        rg, scf = _query_account_rg(cli_ctx, account_name, cache=cache)
+        key = _list_account_key(cli_ctx, scf, rg, account_name)
+    cache.set_key(account_name, rg, key)
+    return key
+
+
+def _list_account_key(cli_ctx, scf, rg, account_name):
     t_storage_account_keys = get_sdk(
         cli_ctx, ResourceType.MGMT_STORAGE, 'models.storage_account_keys#StorageAccountKeys')
 
@@ -45,13 +67,24 @@ def _query_account_key(cli_ctx, account_name):
     return scf.storage_accounts.list_keys(rg, account_name, logging_enable=False).keys[0].value  # pylint: disable=no-member
 
 
-def _query_account_rg(cli_ctx, account_name):
-    """Query the storage account's resource group, which the mgmt sdk requires."""
+def _query_account_rg(cli_ctx, account_name, cache=None):
+    """Query the storage account's resource group, which the mgmt sdk requires.
+
+    The resource group is only read from the given account cache. Management operations always list the accounts,
+    as they cannot recover from a stale resource group the way a failed key lookup can.
+    """
+    from ._account_cache import StorageAccountCache
     scf = storage_client_factory(cli_ctx)
-    acc = next((x for x in scf.storage_accounts.list() if x.name == account_name), None)
-    if acc:
-        from msrestazure.tools import parse_resource_id
-        return parse_resource_id(acc.id)['resource_group'], scf
+    rg = cache.get_resource_group(account_name) if cache else None
+    if rg:
+        return rg, scf
+    cache = cache or StorageAccountCache(cli_ctx)
+
+    from msrestazure.tools import parse_resource_id
+    resource_groups = {x.name: parse_resource_id(x.id)['resource_group'] for x in scf.storage_accounts.list()}
+    cache.set_resource_groups(resource_groups)
+    if account_name in resource_groups:
+        return resource_groups[account_name], scf
     raise ValueError("Storage account '{}' not found.".format(account_name))
 
 
@@ -13,15 +13,19 @@ from azure.cli.command_modules.storage.util import (create_blob_service_from_sto
                                                     create_file_share_from_storage_client,
                                                     create_short_lived_share_sas,
                                                     create_short_lived_container_sas,
-                                                    filter_none, collect_blobs, collect_blob_objects, collect_files,
+                                                    filter_none, collect_blob_objects, collect_files,
                                                     mkdir_p, guess_content_type, normalize_blob_file_path,
-                                                    check_precondition_success)
+                                                    check_precondition_success, transfer_batch, map_concurrently,
+                                                    chunks)
 from knack.log import get_logger
 from knack.util import CLIError
 from .._transformers import transform_response_with_bytearray
 
 logger = get_logger(__name__)
 
+# The Blob Batch API accepts at most 256 sub-requests per batch
+BLOB_BATCH_SIZE = 256
+
 
 def set_legal_hold(cmd, client, container_name, account_name, tags, resource_group_name=None):
     LegalHold = cmd.get_models('LegalHold', resource_type=ResourceType.MGMT_STORAGE)
@@ -239,7 +243,7 @@ def set_service_properties(client, parameters, delete_retention=None, delete_ret
 
 def storage_blob_copy_batch(cmd, client, source_client, container_name=None,
                             destination_path=None, source_container=None, source_share=None,
-                            source_sas=None, pattern=None, dryrun=False):
+                            source_sas=None, pattern=None, dryrun=False, max_concurrency=1):
     """Copy a group of blob or files to a blob container."""
 
     if dryrun:
@@ -252,6 +256,8 @@ def storage_blob_copy_batch(cmd, client, source_client, container_name=None,
         logger.warning(' operations')
 
     source_sas = source_sas.lstrip('?') if source_sas else source_sas
+    # keep the dry run listing in order
+    max_concurrency = 1 if dryrun else max_concurrency
     if source_container:
         # copy blobs for blob container
 
@@ -269,9 +275,9 @@ def storage_blob_copy_batch(cmd, client, source_client, container_name=None,
                 return _copy_blob_to_blob_container(client, source_client, container_name, destination_path,
                                                     source_container, source_sas, blob_name)
 
-        return list(filter_none(action_blob_copy(blob) for blob in collect_blobs(source_client,
-                                                                                 source_container,
-                                                                                 pattern)))
+        source_blobs = (blob_name for blob_name, _ in collect_blob_objects(source_client, source_container, pattern))
+        return list(filter_none(future.result() for _, future in map_concurrently(
+            action_blob_copy, source_blobs, max_concurrency)))
 
     if source_share:
         # copy blob from file share
@@ -292,18 +298,17 @@ def storage_blob_copy_batch(cmd, client, source_client, container_name=None,
                 return _copy_file_to_blob_container(client, source_client, container_name, destination_path,
                                                     source_share, source_sas, dir_name, file_name)
 
-        return list(filter_none(action_file_copy(file) for file in collect_files(cmd,
-                                                                                 source_client,
-                                                                                 source_share,
-                                                                                 pattern)))
+        return list(filter_none(future.result() for _, future in map_concurrently(
+            action_file_copy, collect_files(cmd, source_client, source_share, pattern), max_concurrency)))
     raise ValueError('Fail to find source. Neither blob container or file share is specified')
 
 
 # pylint: disable=unused-argument
 def storage_blob_download_batch(client, source, destination, source_container_name, pattern=None, dryrun=False,
-                                progress_callback=None, max_connections=2):
+                                progress_callback=None, max_connections=2, max_concurrency=1, max_retries=0):
 
-    def _download_blob(blob_service, container, destination_folder, normalized_blob_name, blob_name):
+    def _download_blob(blob_service, container, destination_folder, normalized_blob_name, blob_name,
+                       blob_progress_callback=None):
         # TODO: try catch IO exception
         destination_path = os.path.join(destination_folder, normalized_blob_name)
         destination_folder = os.path.dirname(destination_path)
@@ -311,19 +316,19 @@ def storage_blob_download_batch(client, source, destination, source_container_na
             mkdir_p(destination_folder)
 
         blob = blob_service.get_blob_to_path(container, blob_name, destination_path, max_connections=max_connections,
-                                             progress_callback=progress_callback)
+                                             progress_callback=blob_progress_callback)
         return blob.name
 
-    source_blobs = collect_blobs(client, source_container_name, pattern)
+    source_blobs = list(collect_blob_objects(client, source_container_name, pattern))
     blobs_to_download = {}
-    for blob_name in source_blobs:
+    for blob_name, blob in source_blobs:
         # remove starting path seperator and normalize
         normalized_blob_name = normalize_blob_file_path(None, blob_name)
         if normalized_blob_name in blobs_to_download:
             raise CLIError('Multiple blobs with download path: `{}`. As a solution, use the `--pattern` parameter '
                            'to select for a subset of blobs to download OR utilize the `storage blob download` '
                            'command instead to download individual blobs.'.format(normalized_blob_name))
-        blobs_to_download[normalized_blob_name] = blob_name
+        blobs_to_download[normalized_blob_name] = blob_name, blob.properties.content_length
 
     if dryrun:
         logger.warning('download action: from %s to %s', source, destination)
@@ -331,28 +336,18 @@ def storage_blob_download_batch(client, source, destination, source_container_na
         logger.warning('  container %s', source_container_name)
         logger.warning('      total %d', len(source_blobs))
         logger.warning(' operations')
-        for b in source_blobs:
+        for b, _ in source_blobs:
             logger.warning('  - %s', b)
         return []
 
-    # Tell progress reporter to reuse the same hook
-    if progress_callback:
-        progress_callback.reuse = True
+    def _transfer(blob_normed, blob_progress_callback):
+        return _download_blob(client, source_container_name, destination, blob_normed,
+                              blobs_to_download[blob_normed][0], blob_progress_callback)
 
-    results = []
-    for index, blob_normed in enumerate(blobs_to_download):
-        # add blob name and number to progress message
-        if progress_callback:
-            progress_callback.message = '{}/{}: "{}"'.format(
-                index + 1, len(blobs_to_download), blobs_to_download[blob_normed])
-        results.append(_download_blob(
-            client, source_container_name, destination, blob_normed, blobs_to_download[blob_normed]))
-
-    # end progress hook
-    if progress_callback:
-        progress_callback.hook.end()
-
-    return results
+    return transfer_batch(((blob_name, size, blob_normed)
+                           for blob_normed, (blob_name, size) in blobs_to_download.items()),
+                          _transfer, max_concurrency=max_concurrency, max_retries=max_retries,
+                          progress_callback=progress_callback, operation='download')
 
 
 def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  # pylint: disable=too-many-locals
@@ -361,7 +356,7 @@ def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  #
                               content_settings=None, metadata=None, validate_content=False,
                               maxsize_condition=None, max_connections=2, lease_id=None, progress_callback=None,
                               if_modified_since=None, if_unmodified_since=None, if_match=None,
-                              if_none_match=None, timeout=None, dryrun=False):
+                              if_none_match=None, timeout=None, dryrun=False, max_concurrency=1, max_retries=0):
     def _create_return_result(blob_name, blob_content_settings, upload_result=None):
         blob_name = normalize_blob_file_path(destination_path, blob_name)
         return {
@@ -388,34 +383,25 @@ def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  #
         def _upload_blob(*args, **kwargs):
             return upload_blob(*args, **kwargs)
 
-        # Tell progress reporter to reuse the same hook
-        if progress_callback:
-            progress_callback.reuse = True
-
-        for index, source_file in enumerate(source_files):
+        def _transfer(source_file, blob_progress_callback):
             src, dst = source_file
-            # logger.warning('uploading %s', src)
             guessed_content_settings = guess_content_type(src, content_settings, t_content_settings)
-
-            # add blob name and number to progress message
-            if progress_callback:
-                progress_callback.message = '{}/{}: "{}"'.format(
-                    index + 1, len(source_files), normalize_blob_file_path(destination_path, dst))
-
             include, result = _upload_blob(cmd, client, file_path=src, container_name=destination_container_name,
                                            blob_name=normalize_blob_file_path(destination_path, dst),
                                            blob_type=blob_type, content_settings=guessed_content_settings,
                                            metadata=metadata, validate_content=validate_content,
                                            maxsize_condition=maxsize_condition, max_connections=max_connections,
-                                           lease_id=lease_id, progress_callback=progress_callback,
+                                           lease_id=lease_id, progress_callback=blob_progress_callback,
                                            if_modified_since=if_modified_since,
                                            if_unmodified_since=if_unmodified_since, if_match=if_match,
                                            if_none_match=if_none_match, timeout=timeout)
-            if include:
-                results.append(_create_return_result(dst, guessed_content_settings, result))
-        # end progress hook
-        if progress_callback:
-            progress_callback.hook.end()
+            return _create_return_result(dst, guessed_content_settings, result) if include else None
+
+        results = list(filter_none(transfer_batch(
+            ((normalize_blob_file_path(destination_path, dst), os.path.getsize(src), (src, dst))
+             for src, dst in source_files),
+            _transfer, max_concurrency=max_concurrency, max_retries=max_retries,
+            progress_callback=progress_callback, operation='upload')))
         num_failures = len(source_files) - len(results)
         if num_failures:
             logger.warning('%s of %s files not uploaded due to "Failed Precondition"', num_failures, len(source_files))
@@ -635,9 +621,9 @@ def show_blob(cmd, client, container_name, blob_name, snapshot=None, lease_id=No
     return blob
 
 
-def storage_blob_delete_batch(client, source, source_container_name, pattern=None, lease_id=None,
+def storage_blob_delete_batch(cmd, client, source, source_container_name, pattern=None, lease_id=None,
                               delete_snapshots=None, if_modified_since=None, if_unmodified_since=None, if_match=None,
-                              if_none_match=None, timeout=None, dryrun=False):
+                              if_none_match=None, timeout=None, dryrun=False, max_concurrency=1, use_batch_api=False):
     @check_precondition_success
     def _delete_blob(blob_name):
         delete_blob_args = {
@@ -653,7 +639,7 @@ def storage_blob_delete_batch(client, source, source_container_name, pattern=Non
         }
         return client.delete_blob(**delete_blob_args)
 
-    source_blobs = list(collect_blob_objects(client, source_container_name, pattern))
+    source_blobs = collect_blob_objects(client, source_container_name, pattern)
 
     if dryrun:
         from datetime import timezone
@@ -673,10 +659,70 @@ def storage_blob_delete_batch(client, source, source_container_name, pattern=Non
             logger.warning('  - %s', blob)
         return []
 
-    results = [result for include, result in (_delete_blob(blob[0]) for blob in source_blobs) if include]
-    num_failures = len(source_blobs) - len(results)
+    blob_names = (blob_name for blob_name, _ in source_blobs)
+    if use_batch_api:
+        container_client = _create_container_client_for_batch(cmd, client, source_container_name)
+
+        def _delete_blobs(names):
+            return _delete_blobs_with_batch_api(container_client, names, lease_id=lease_id,
+                                                delete_snapshots=delete_snapshots,
+                                                if_modified_since=if_modified_since,
+                                                if_unmodified_since=if_unmodified_since,
+                                                if_match=if_match, if_none_match=if_none_match, timeout=timeout)
+    else:
+        def _delete_blobs(names):
+            return sum(1 for include, _ in (_delete_blob(name) for name in names) if include)
+
+    num_blobs, num_deleted = 0, 0
+    for names, future in map_concurrently(_delete_blobs, chunks(blob_names, BLOB_BATCH_SIZE if use_batch_api else 1),
+                                          max_concurrency):
+        num_blobs += len(names)
+        num_deleted += future.result()
+    num_failures = num_blobs - num_deleted
     if num_failures:
-        logger.warning('%s of %s blobs not deleted due to "Failed Precondition"', num_failures, len(source_blobs))
+        logger.warning('%s of %s blobs not deleted due to "Failed Precondition"', num_failures, num_blobs)
+
+
+def _create_container_client_for_batch(cmd, client, container_name):
+    from azure.cli.core.azclierror import InvalidArgumentValueError
+    from .._client_factory import cf_container_client
+    if not client.account_key and not client.sas_token:
+        raise InvalidArgumentValueError('--use-batch-api requires the storage account key or a SAS token.')
+    return cf_container_client(cmd.cli_ctx, {'account_name': client.account_name,
+                                             'account_key': client.account_key,
+                                             'sas_token': client.sas_token,
+                                             'container_name': container_name})
+
+
+def _delete_blobs_with_batch_api(container_client, blob_names, lease_id=None, delete_snapshots=None,
+                                 if_modified_since=None, if_unmodified_since=None, if_match=None, if_none_match=None,
+                                 timeout=None):
+    """Delete up to BLOB_BATCH_SIZE blobs in a single Blob Batch request and return the number of deleted blobs."""
+    from azure.core import MatchConditions
+    from azure.core.exceptions import HttpResponseError
+    blob_args = {'lease_id': lease_id}
+    if if_match:
+        blob_args['match_condition'] = MatchConditions.IfPresent if if_match == '*' else MatchConditions.IfNotModified
+        if if_match != '*':
+            blob_args['etag'] = if_match
+    if if_none_match:
+        blob_args['etag'] = if_none_match
+        blob_args['match_condition'] = MatchConditions.IfModified
+    blobs = [dict(blob_args, name=name) for name in blob_names]
+
+    responses = container_client.delete_blobs(*blobs, delete_snapshots=delete_snapshots,
+                                              if_modified_since=if_modified_since,
+                                              if_unmodified_since=if_unmodified_since,
+                                              raise_on_any_failure=False, timeout=timeout)
+    num_deleted = 0
+    for blob, response in zip(blobs, responses):
+        if response.status_code in [304, 412]:
+            continue
+        if response.status_code >= 300:
+            raise HttpResponseError(message='Failed to delete blob {}: {}'.format(blob['name'], response.reason),
+                                    response=response)
+        num_deleted += 1
+    return num_deleted
 
 
 def generate_sas_blob_uri(client, container_name, blob_name, permission=None,
@@ -0,0 +1,122 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from azure.cli.command_modules.storage._account_cache import (StorageAccountCache, ACCOUNT_CACHE_FILE,
+                                                              is_authentication_failure, invalidate_keys_in_use)
+from azure.cli.command_modules.storage._validators import _query_account_rg, _query_account_key
+
+
+def _mock_cli_ctx(config_dir, ttl=None, cache_keys=False):
+    cli_ctx = mock.MagicMock()
+    cli_ctx.cloud.name = 'AzureCloud'
+    cli_ctx.config.config_dir = config_dir
+    cli_ctx.config.get.side_effect = lambda section, key, default=None: ttl if ttl is not None else default
+    cli_ctx.config.getboolean.side_effect = lambda section, key, default=None: cache_keys
+    return cli_ctx
+
+
+def _mock_account(name, resource_group):
+    account = mock.MagicMock()
+    account.name = name
+    account.id = '/subscriptions/sub/resourceGroups/{}/providers/Microsoft.Storage/storageAccounts/{}'.format(
+        resource_group, name)
+    return account
+
+
+@mock.patch('azure.cli.core.commands.client_factory.get_subscription_id', return_value='sub')
+class TestStorageAccountCache(unittest.TestCase):
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.scf = mock.MagicMock()
+        self.scf.storage_accounts.list.return_value = [_mock_account('acc1', 'rg1'), _mock_account('acc2', 'rg2')]
+        self.scf.storage_accounts.list_keys.return_value.keys = [mock.MagicMock(value='secret')]
+        patcher = mock.patch('azure.cli.command_modules.storage._validators.storage_client_factory',
+                             return_value=self.scf)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('azure.cli.command_modules.storage._validators.get_sdk', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.config_dir)
+
+    def test_resource_group_index_is_shared_across_invocations(self, _):
+        _query_account_key(_mock_cli_ctx(self.config_dir), 'acc1')
+        _query_account_key(_mock_cli_ctx(self.config_dir), 'acc2')
+        self.assertEqual(self.scf.storage_accounts.list.call_count, 1)
+        self.assertEqual([c[0][0] for c in self.scf.storage_accounts.list_keys.call_args_list], ['rg1', 'rg2'])
+        with self.assertRaises(ValueError):
+            _query_account_key(_mock_cli_ctx(self.config_dir), 'missing')
+        self.assertEqual(self.scf.storage_accounts.list.call_count, 2)
+
+    def test_management_lookup_refreshes_index(self, _):
+        self.assertEqual(_query_account_rg(_mock_cli_ctx(self.config_dir), 'acc1')[0], 'rg1')
+        self.assertEqual(_query_account_rg(_mock_cli_ctx(self.config_dir), 'acc1')[0], 'rg1')
+        self.assertEqual(self.scf.storage_accounts.list.call_count, 2)
+        _query_account_key(_mock_cli_ctx(self.config_dir), 'acc2')
+        self.assertEqual(self.scf.storage_accounts.list.call_count, 2)
+
+    def test_resource_group_index_expires(self, _):
+        _query_account_key(_mock_cli_ctx(self.config_dir), 'acc1')
+        with mock.patch('time.time', return_value=10 ** 12):
+            _query_account_key(_mock_cli_ctx(self.config_dir), 'acc1')
+        self.assertEqual(self.scf.storage_accounts.list.call_count, 2)
+
+    def test_cache_disabled_with_zero_ttl(self, _):
+        _query_account_key(_mock_cli_ctx(self.config_dir, ttl='0'), 'acc1')
+        _query_account_key(_mock_cli_ctx(self.config_dir, ttl='0'), 'acc1')
+        self.assertEqual(self.scf.storage_accounts.list.call_count, 2)
+        self.assertFalse(os.path.exists(os.path.join(self.config_dir, ACCOUNT_CACHE_FILE)))
+
+    def test_account_keys_are_cached_encrypted_only_on_opt_in(self, _):
+        self.assertEqual(_query_account_key(_mock_cli_ctx(self.config_dir), 'acc1'), 'secret')
+        self.assertEqual(_query_account_key(_mock_cli_ctx(self.config_dir), 'acc1'), 'secret')
+        self.assertEqual(self.scf.storage_accounts.list_keys.call_count, 2)
+
+        self.assertEqual(_query_account_key(_mock_cli_ctx(self.config_dir, cache_keys=True), 'acc1'), 'secret')
+        self.assertEqual(_query_account_key(_mock_cli_ctx(self.config_dir, cache_keys=True), 'acc1'), 'secret')
+        self.assertEqual(self.scf.storage_accounts.list_keys.call_count, 3)
+        with open(os.path.join(self.config_dir, ACCOUNT_CACHE_FILE)) as f:
+            self.assertNotIn('secret', f.read())
+
+    def test_cached_key_is_dropped_when_authentication_fails(self, _):
+        from azure.common import AzureHttpError
+        from azure.core.exceptions import HttpResponseError
+        _query_account_key(_mock_cli_ctx(self.config_dir, cache_keys=True), 'acc1')
+        _query_account_key(_mock_cli_ctx(self.config_dir, cache_keys=True), 'acc1')
+        self.assertEqual(self.scf.storage_accounts.list_keys.call_count, 1)
+
+        self.assertFalse(is_authentication_failure(HttpResponseError('not found')))
+        self.assertTrue(is_authentication_failure(
+            AzureHttpError('Server failed to authenticate the request.\nErrorCode: AuthenticationFailed', 403)))
+        rotated = HttpResponseError('Server failed to authenticate the request.')
+        rotated.status_code, rotated.error_code = 403, 'AuthenticationFailed'
+        self.assertTrue(is_authentication_failure(rotated))
+
+        # the handler gets the context of the command loader rather than the copy the job validated with
+        invalidate_keys_in_use(_mock_cli_ctx(self.config_dir, cache_keys=True))
+        self.assertEqual(_query_account_key(_mock_cli_ctx(self.config_dir, cache_keys=True), 'acc1'), 'secret')
+        self.assertEqual(self.scf.storage_accounts.list_keys.call_count, 2)
+
+    def test_stale_resource_group_is_refreshed(self, _):
+        from azure.core.exceptions import ResourceNotFoundError
+        cache = StorageAccountCache(_mock_cli_ctx(self.config_dir))
+        cache.set_resource_groups({'acc1': 'moved-away'})
+        self.scf.storage_accounts.list_keys.side_effect = [ResourceNotFoundError('not found'),
+                                                           mock.MagicMock(keys=[mock.MagicMock(value='secret')])]
+
+        self.assertEqual(_query_account_key(_mock_cli_ctx(self.config_dir), 'acc1'), 'secret')
+        self.assertEqual(self.scf.storage_accounts.list_keys.call_args[0][0], 'rg1')
+
+
+if __name__ == '__main__':
+    unittest.main()
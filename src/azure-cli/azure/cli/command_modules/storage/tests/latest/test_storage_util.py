@@ -0,0 +1,203 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import unittest
+from unittest import mock
+
+import requests
+from knack.util import CLIError
+
+from azure.common import AzureHttpError
+
+from azure.cli.command_modules.storage.util import (transfer_batch, map_concurrently, chunks, collect_blob_objects,
+                                                    _get_pattern_prefix, _is_retryable_transfer_error)
+
+
+class TestStorageTransferBatch(unittest.TestCase):
+    def test_transfer_batch_keeps_order_and_bounds_concurrency(self):
+        lock = threading.Lock()
+        running, peak = [0], [0]
+        # every transfer waits until 4 of them run at once, or times out if the batch doesn't run 4 at once
+        barrier = threading.Barrier(4, timeout=5)
+
+        def _transfer(payload, _):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            barrier.wait()
+            with lock:
+                running[0] -= 1
+            return payload * 2
+
+        items = [('f{}'.format(i), 1, i) for i in range(48)]
+        results = transfer_batch(items, _transfer, max_concurrency=4)
+        self.assertEqual(results, [i * 2 for i in range(48)])
+        self.assertEqual(peak[0], 4)
+
+    def test_transfer_batch_aggregates_progress(self):
+        progress = mock.MagicMock()
+
+        def _transfer(payload, callback):
+            callback(payload // 2, payload)
+            callback(payload, payload)
+
+        transfer_batch([('a', 10, 10), ('b', 30, 30)], _transfer, max_concurrency=1, progress_callback=progress)
+
+        self.assertTrue(progress.reuse)
+        self.assertEqual(progress.call_args_list[-1], mock.call(40, 40))
+        self.assertEqual(progress.message, '2/2 files')
+        progress.hook.end.assert_called_once_with()
+
+    def test_transfer_batch_retries_and_summarizes_failures(self):
+        attempts = {}
+
+        def _transfer(payload, _):
+            attempts[payload] = attempts.get(payload, 0) + 1
+            if payload == 'flaky' and attempts[payload] < 2:
+                raise requests.ConnectionError('connection reset')
+            if payload == 'throttled' and attempts[payload] < 2:
+                raise AzureHttpError('server busy', 503)
+            if payload == 'broken':
+                raise IOError('disk full')
+            if payload == 'missing':
+                raise AzureHttpError('not found', 404)
+            return payload
+
+        names = ['flaky', 'throttled', 'broken', 'missing', 'ok']
+        with self.assertRaises(CLIError) as ex:
+            transfer_batch([(name, 0, name) for name in names], _transfer,
+                           max_concurrency=2, max_retries=1, operation='upload')
+
+        self.assertEqual(attempts, {'flaky': 2, 'throttled': 2, 'broken': 1, 'missing': 1, 'ok': 1})
+        self.assertIn('2 of 5 files failed to upload', str(ex.exception))
+        self.assertIn('broken: disk full', str(ex.exception))
+
+    def test_is_retryable_transfer_error(self):
+        from azure.common import AzureException
+
+        def _wrapped(cause):
+            # how the storage SDK raises exceptions other than HTTP errors
+            try:
+                raise cause
+            except Exception:  # pylint: disable=broad-except
+                try:
+                    raise AzureException(str(cause))
+                except AzureException as ex:
+                    return ex
+
+        self.assertTrue(_is_retryable_transfer_error(requests.Timeout()))
+        self.assertTrue(_is_retryable_transfer_error(_wrapped(requests.ConnectionError('reset'))))
+        self.assertTrue(_is_retryable_transfer_error(AzureHttpError('throttled', 429)))
+        self.assertTrue(_is_retryable_transfer_error(AzureHttpError('timeout', 408)))
+        self.assertFalse(_is_retryable_transfer_error(AzureHttpError('forbidden', 403)))
+        self.assertFalse(_is_retryable_transfer_error(OSError('disk full')))
+        self.assertFalse(_is_retryable_transfer_error(_wrapped(ValueError('bad'))))
+
+
+class TestStorageMapConcurrently(unittest.TestCase):
+    def test_map_concurrently_consumes_lazily(self):
+        consumed = [0]
+
+        def _listing():
+            for i in range(1000):
+                consumed[0] += 1
+                yield i
+
+        results = map_concurrently(lambda x: x + 1, _listing(), max_concurrency=4)
+        first = [next(results) for _ in range(3)]
+        self.assertEqual([(e, f.result()) for e, f in first], [(0, 1), (1, 2), (2, 3)])
+        self.assertLessEqual(consumed[0], 8 + 3)
+        self.assertEqual(sum(f.result() for _, f in results), sum(range(4, 1001)))
+
+    def test_map_concurrently_keeps_exceptions_with_elements(self):
+        def _fail_on_odd(x):
+            if x % 2:
+                raise ValueError(x)
+            return x
+
+        outcome = [(e, f.exception() is not None) for e, f in map_concurrently(_fail_on_odd, range(6), 3)]
+        self.assertEqual(outcome, [(0, False), (1, True), (2, False), (3, True), (4, False), (5, True)])
+
+    def test_chunks(self):
+        self.assertEqual(list(chunks(range(7), 3)), [[0, 1, 2], [3, 4, 5], [6]])
+        self.assertEqual(list(chunks([], 3)), [])
+
+
+class _FakeBlob(object):
+    def __init__(self, name):
+        self.name = name
+        self.properties = None
+
+
+class _FakeBlobPrefix(object):
+    def __init__(self, name):
+        self.name = name
+
+
+class _FakeBlobService(object):
+    """Serve list_blobs from an in-memory container, honoring prefix and delimiter like the service does."""
+
+    def __init__(self, names):
+        self.names = sorted(names)
+        self.calls = []
+
+    def list_blobs(self, container_name, prefix=None, delimiter=None):
+        self.calls.append((prefix, delimiter))
+        virtual_dirs = set()
+        for name in self.names:
+            if prefix and not name.startswith(prefix):
+                continue
+            rest = name[len(prefix or ''):]
+            if delimiter and delimiter in rest:
+                virtual_dir = (prefix or '') + rest[:rest.index(delimiter) + 1]
+                if virtual_dir not in virtual_dirs:
+                    virtual_dirs.add(virtual_dir)
+                    yield _FakeBlobPrefix(virtual_dir)
+            else:
+                yield _FakeBlob(name)
+
+
+class TestStorageCollectBlobs(unittest.TestCase):
+    names = ['logs/2025/01/a.log', 'logs/2026/09/a.log', 'logs/2026/10/a.log', 'logs/2026/10/b.txt',
+             'logs/2026/11/c.log', 'data/x.csv', 'logs-old/2026/10/a.log']
+
+    def _collect(self, pattern):
+        service = _FakeBlobService(self.names)
+        return service, sorted(name for name, _ in collect_blob_objects(service, 'container', pattern))
+
+    def test_get_pattern_prefix(self):
+        self.assertEqual(_get_pattern_prefix('logs/2026/10/*'), 'logs/2026/10/')
+        self.assertEqual(_get_pattern_prefix('logs/20[0-9]?/*'), 'logs/20')
+        self.assertEqual(_get_pattern_prefix('*.log'), '')
+
+    def test_collect_blobs_pushes_prefix_down(self):
+        service, names = self._collect('logs/2026/10/*')
+        self.assertEqual(names, ['logs/2026/10/a.log', 'logs/2026/10/b.txt'])
+        self.assertEqual(service.calls, [('logs/2026/10/', None)])
+
+    def test_collect_blobs_star_spans_directories(self):
+        service, names = self._collect('logs/*/a.log')
+        self.assertEqual(names, ['logs/2025/01/a.log', 'logs/2026/09/a.log', 'logs/2026/10/a.log'])
+        self.assertEqual(service.calls, [('logs/', None)])
+
+    def test_collect_blobs_prunes_directories(self):
+        service, names = self._collect('logs/2026/1[01]/*.log')
+        self.assertEqual(names, ['logs/2026/10/a.log', 'logs/2026/11/c.log'])
+        self.assertNotIn(('logs/2026/09/', '/'), service.calls)
+
+        service, names = self._collect('logs?2026/1?/*.log')
+        self.assertEqual(names, ['logs/2026/10/a.log', 'logs/2026/11/c.log'])
+        self.assertNotIn(('logs-old/2026/', '/'), service.calls)
+        self.assertNotIn(('data/', '/'), service.calls)
+
+    def test_collect_blobs_without_pattern_lists_everything(self):
+        service, names = self._collect(None)
+        self.assertEqual(names, sorted(self.names))
+        self.assertEqual(service.calls, [(None, None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,7 +29,7 @@ def collect_blob_objects(blob_service, container, pattern=None):
         if blob_service.exists(container, pattern):
             yield pattern, blob_service.get_blob_properties(container, pattern)
     else:
-        for blob in blob_service.list_blobs(container):
+        for blob in _list_blobs_for_pattern(blob_service, container, pattern):
             try:
                 blob_name = blob.name.encode('utf-8') if isinstance(blob.name, unicode) else blob.name
             except NameError:
@@ -39,6 +39,35 @@ def collect_blob_objects(blob_service, container, pattern=None):
                 yield blob_name, blob
 
 
+def _list_blobs_for_pattern(blob_service, container, pattern):
+    """
+    List the blobs which may match the given pattern. The literal prefix of the pattern is passed to the service, and
+    when the wildcards before the last path separator cannot span across separators, the virtual directories are
+    walked level by level so that the ones which cannot contain a match are never listed.
+    """
+    # the prefix is matched case-sensitively by the service, so only use it where fnmatch is case-sensitive too
+    if not pattern or os.path.normcase('A') != 'A':
+        return blob_service.list_blobs(container)
+
+    prefix = _get_pattern_prefix(pattern)
+    directories = pattern[len(prefix):].rpartition('/')[0]
+    if not directories or '*' in directories:
+        return blob_service.list_blobs(container, prefix=prefix or None)
+    return _walk_blobs(blob_service, container, prefix, _tokenize_pattern(pattern))
+
+
+def _walk_blobs(blob_service, container, prefix, pattern_tokens):
+    from collections import deque
+    queue = deque([prefix])
+    while queue:
+        current = queue.popleft()
+        for item in blob_service.list_blobs(container, prefix=current or None, delimiter='/'):
+            if hasattr(item, 'properties'):
+                yield item
+            elif _pattern_may_match_below(pattern_tokens, item.name):
+                queue.append(item.name)
+
+
 def collect_files(cmd, file_service, share, pattern=None):
     """
     Search files in the the given file share recursively. Filter the files by matching their path to the given pattern.
@@ -56,6 +85,131 @@ def collect_files(cmd, file_service, share, pattern=None):
     return glob_files_remotely(cmd, file_service, share, pattern)
 
 
+def map_concurrently(func, iterable, max_concurrency=1):
+    """
+    Apply `func` to every element of `iterable` with a pool of `max_concurrency` workers. The iterable is consumed
+    lazily and only a bounded number of elements is in flight at any time, so it can be a paged listing of any size.
+    Yields (element, future) pairs in the order of `iterable`.
+    """
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+
+    max_concurrency = max(1, max_concurrency or 1)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        for element in iterable:
+            pending.append((element, executor.submit(func, element)))
+            if len(pending) >= 2 * max_concurrency:
+                element, future = pending.popleft()
+                future.exception()
+                yield element, future
+        while pending:
+            element, future = pending.popleft()
+            future.exception()
+            yield element, future
+
+
+def chunks(iterable, size):
+    """Group the elements of `iterable` into lists of at most `size` elements without materializing it."""
+    from itertools import islice
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def transfer_batch(items, transfer, max_concurrency=1, max_retries=0, progress_callback=None,
+                   operation='transfer'):
+    """
+    Run `transfer(payload, progress_callback)` for every (name, size, payload) item in `items` with a bounded pool
+    of workers. Progress of all the in-flight transfers is aggregated into the given progress callback, every item
+    is retried up to `max_retries` times and the failures are summarized once all the items are processed.
+    Returns the results in the order of `items`.
+    """
+    import threading
+    from knack.log import get_logger
+    from knack.util import CLIError
+
+    logger = get_logger(__name__)
+    items = list(items)
+    total_bytes = sum(size or 0 for _, size, _ in items)
+    transferred = {}
+    completed = [0]
+    lock = threading.Lock()
+
+    def _report():
+        if not progress_callback:
+            return
+        progress_callback.message = '{}/{} files'.format(completed[0], len(items))
+        if total_bytes:
+            progress_callback(sum(transferred.values()), total_bytes)
+        else:
+            progress_callback(completed[0], len(items))
+
+    def _item_progress(name):
+        def _update(current, total):  # pylint: disable=unused-argument
+            with lock:
+                transferred[name] = current
+                _report()
+        return _update
+
+    def _run(item):
+        name, size, payload = item
+        attempt = 0
+        while True:
+            try:
+                result = transfer(payload, _item_progress(name) if progress_callback else None)
+                with lock:
+                    transferred[name] = size or 0
+                    completed[0] += 1
+                    _report()
+                return result
+            except Exception as ex:  # pylint: disable=broad-except
+                if attempt >= max_retries or not _is_retryable_transfer_error(ex):
+                    raise
+                attempt += 1
+                logger.info('retrying %s of %s (attempt %d): %s', operation, name, attempt, ex)
+                with lock:
+                    transferred[name] = 0
+
+    # Tell progress reporter to reuse the same hook
+    if progress_callback:
+        progress_callback.reuse = True
+
+    results, failures = [], []
+    for (name, _, _), future in map_concurrently(_run, items, max_concurrency):
+        try:
+            results.append(future.result())
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.warning('failed to %s %s: %s', operation, name, ex)
+            failures.append((name, ex))
+
+    # end progress hook
+    if progress_callback:
+        progress_callback.hook.end()
+
+    if failures:
+        raise CLIError('{} of {} files failed to {}:\n{}'.format(
+            len(failures), len(items), operation, '\n'.join('  {}: {}'.format(n, e) for n, e in failures)))
+    return results
+
+
+def _is_retryable_transfer_error(ex):
+    """Only retry transport errors and throttled or failed requests, never local errors such as a full disk."""
+    import requests
+    from azure.common import AzureHttpError
+    # the storage SDK raises any other exception of a request as an AzureException chained to it
+    while ex is not None:
+        if isinstance(ex, AzureHttpError):
+            status_code = getattr(ex, 'status_code', None)
+            return status_code is not None and (status_code >= 500 or status_code in (408, 429))
+        if isinstance(ex, (requests.ConnectionError, requests.Timeout)):
+            return True
+        ex = ex.__cause__ or ex.__context__
+    return False
+
+
 def create_blob_service_from_storage_client(cmd, client):
     t_block_blob_svc = cmd.get_models('blob#BlockBlobService')
     return t_block_blob_svc(account_name=client.account_name,
@@ -178,6 +332,70 @@ def _match_path(path, pattern):
     return fnmatch(path, pattern)
 
 
+def _get_pattern_prefix(pattern):
+    """Get the longest literal prefix of the pattern, before its first wildcard."""
+    for i, c in enumerate(pattern):
+        if c in '*?[':
+            return pattern[:i]
+    return pattern
+
+
+def _tokenize_pattern(pattern):
+    """Split a fnmatch pattern into '*', '?', single characters and compiled character sets."""
+    import re
+    from fnmatch import translate
+    tokens = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c != '[':
+            tokens.append(c if c in '*?' else (c,))
+            continue
+        j = i
+        if j < n and pattern[j] == '!':
+            j += 1
+        if j < n and pattern[j] == ']':
+            j += 1
+        while j < n and pattern[j] != ']':
+            j += 1
+        if j >= n:
+            tokens.append((c,))
+        else:
+            tokens.append(re.compile(translate(pattern[i - 1:j + 1])))
+            i = j + 1
+    return tokens
+
+
+def _pattern_may_match_below(pattern_tokens, path_prefix):
+    """Check whether any path which starts with the given prefix can match the tokenized pattern."""
+    def _closure(states):
+        stack = list(states)
+        while stack:
+            state = stack.pop()
+            if state < len(pattern_tokens) and pattern_tokens[state] == '*' and state + 1 not in states:
+                states.add(state + 1)
+                stack.append(state + 1)
+        return states
+
+    states = _closure({0})
+    for c in path_prefix:
+        next_states = set()
+        for state in states:
+            if state == len(pattern_tokens):
+                continue
+            token = pattern_tokens[state]
+            if token == '*':
+                next_states.add(state)
+            elif token == '?' or (isinstance(token, tuple) and token[0] == c) or \
+                    (hasattr(token, 'match') and token.match(c)):
+                next_states.add(state + 1)
+        states = _closure(next_states)
+        if not states:
+            return False
+    return True
+
+
 def guess_content_type(file_path, original, settings_class):
     if original.content_encoding or original.content_type:
         return original
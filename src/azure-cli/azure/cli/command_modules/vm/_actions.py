@@ -46,56 +46,10 @@ def _get_thread_count():
 
 
 def load_images_thru_services(cli_ctx, publisher, offer, sku, location):
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    all_images = []
-    client = _compute_client_factory(cli_ctx)
+    from ._image_catalog import VMImageCatalog
     if location is None:
         location = get_one_of_subscription_locations(cli_ctx)
-
-    def _load_images_from_publisher(publisher):
-        from azure.core.exceptions import ResourceNotFoundError
-        try:
-            offers = client.virtual_machine_images.list_offers(location, publisher)
-        except ResourceNotFoundError as e:
-            logger.warning(str(e))
-            return
-        if offer:
-            offers = [o for o in offers if _matched(offer, o.name)]
-        for o in offers:
-            try:
-                skus = client.virtual_machine_images.list_skus(location, publisher, o.name)
-            except ResourceNotFoundError as e:
-                logger.warning(str(e))
-                continue
-            if sku:
-                skus = [s for s in skus if _matched(sku, s.name)]
-            for s in skus:
-                try:
-                    images = client.virtual_machine_images.list(location, publisher, o.name, s.name)
-                except ResourceNotFoundError as e:
-                    logger.warning(str(e))
-                    continue
-                for i in images:
-                    all_images.append({
-                        'publisher': publisher,
-                        'offer': o.name,
-                        'sku': s.name,
-                        'version': i.name})
-
-    publishers = client.virtual_machine_images.list_publishers(location)
-    if publisher:
-        publishers = [p for p in publishers if _matched(publisher, p.name)]
-
-    publisher_num = len(publishers)
-    if publisher_num > 1:
-        with ThreadPoolExecutor(max_workers=_get_thread_count()) as executor:
-            tasks = [executor.submit(_load_images_from_publisher, p.name) for p in publishers]
-            for t in as_completed(tasks):
-                t.result()  # don't use the result but expose exceptions from the threads
-    elif publisher_num == 1:
-        _load_images_from_publisher(publishers[0].name)
-
-    return all_images
+    return VMImageCatalog(cli_ctx, location).list_images(publisher, offer, sku, max_workers=_get_thread_count())
 
 
 def load_images_from_aliases_doc(cli_ctx, publisher=None, offer=None, sku=None):
@@ -228,6 +182,10 @@ def _create_image_instance(publisher, offer, sku, version):
 
 
 def _get_latest_image_version(cli_ctx, location, publisher, offer, sku):
+    from ._image_catalog import get_latest_version
+    version = get_latest_version(cli_ctx, location, publisher, offer, sku)
+    if version:
+        return version
     top_one = _compute_client_factory(cli_ctx).virtual_machine_images.list(location,
                                                                            publisher,
                                                                            offer,
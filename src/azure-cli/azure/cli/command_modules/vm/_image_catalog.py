@@ -0,0 +1,154 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import time
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+IMAGE_CATALOG_DIR = 'vmImageCatalog'
+# suffix of the small index of the latest version of each sku, next to the catalog of the location
+LATEST_VERSIONS_SUFFIX = '.latest'
+# minutes to keep each level of the image catalog, configurable as `vm.image_catalog_ttl`
+DEFAULT_IMAGE_CATALOG_TTL = 1440
+
+
+class VMImageCatalog(object):
+    """
+    Local catalog of the VM images of a location, backed by a JSON file per cloud and location in the config dir.
+
+    The catalog is a tree of publishers, offers, skus and versions. Every node keeps the names of its children and
+    when they were listed, so a search only lists the nodes it walks through that are older than
+    `vm.image_catalog_ttl` minutes, e.g. refreshing a single publisher. Set the TTL to 0 to turn the catalog off.
+
+    The latest version of every sku whose versions have been listed is also kept in a small index, so that resolving
+    the `latest` version of an image doesn't need to load the whole catalog.
+    """
+
+    def __init__(self, cli_ctx, location):
+        from azure.cli.core._session import Session
+        from ._client_factory import _compute_client_factory
+
+        self.cli_ctx = cli_ctx
+        self.location = location
+        self.ttl = _get_ttl(cli_ctx)
+        self._client = _compute_client_factory(cli_ctx)
+        self._session = Session()
+        if self.ttl > 0:
+            _load_if_exists(self._session, _get_catalog_path(cli_ctx, location))
+        self._latest_versions = {}
+        self._modified = False
+
+    def list_images(self, publisher=None, offer=None, sku=None, max_workers=1):
+        """List the images whose publisher, offer and sku names contain the given names, case-insensitively."""
+        from concurrent.futures import ThreadPoolExecutor
+        from functools import partial
+        from ._actions import _matched
+        images = self._client.virtual_machine_images
+        root = self._session.data
+        publishers = [p for p in self._get_children(root, partial(images.list_publishers, self.location))
+                      if _matched(publisher, p)]
+
+        def _list_publisher_images(publisher_name):
+            result = []
+            publisher_node = root['items'][publisher_name]
+            offers = self._get_children(publisher_node, partial(images.list_offers, self.location, publisher_name))
+            for o in [o for o in offers if _matched(offer, o)]:
+                skus = self._get_children(offers[o], partial(images.list_skus, self.location, publisher_name, o))
+                for s in [s for s in skus if _matched(sku, s)]:
+                    versions = self._get_children(skus[s], partial(images.list, self.location, publisher_name, o, s))
+                    result.extend({'publisher': publisher_name, 'offer': o, 'sku': s, 'version': v}
+                                  for v in versions)
+                    if versions:
+                        self._latest_versions[_get_image_key(publisher_name, o, s)] = {
+                            'version': max(versions, key=_get_version_key), 'time': skus[s]['time']}
+            return result
+
+        if len(publishers) > 1 and max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_list_publisher_images, publishers))
+        else:
+            results = [_list_publisher_images(p) for p in publishers]
+        self._save()
+        return [image for result in results for image in result]
+
+    def _is_fresh(self, node):
+        return 'items' in node and node.get('time', 0) + self.ttl > time.time()
+
+    def _get_children(self, node, list_children):
+        """Get the children of a node by name, listing them again if the node is stale. A node missing on the
+        service is skipped with a warning, like a node without children."""
+        from azure.core.exceptions import ResourceNotFoundError
+        if not self._is_fresh(node):
+            try:
+                names = [child.name for child in list_children()]
+            except ResourceNotFoundError as e:
+                logger.warning(str(e))
+                return {}
+            children = node.get('items') or {}
+            node['items'] = {name: children.get(name, {}) for name in names}
+            node['time'] = time.time()
+            self._modified = True
+        return node['items']
+
+    def _save(self):
+        from azure.cli.core._session import Session
+        if self.ttl > 0 and self._modified:
+            path = _get_catalog_path(self.cli_ctx, self.location)
+            try:
+                if not os.path.isdir(os.path.dirname(path)):
+                    os.makedirs(os.path.dirname(path))
+                self._session.filename = path
+                self._session.save_with_retry()
+                # merge the latest versions into the index, which other commands may have updated meanwhile
+                index = Session()
+                index.filename = _get_catalog_path(self.cli_ctx, self.location, LATEST_VERSIONS_SUFFIX)
+                index.defer_save()
+                index.update(self._latest_versions)
+                index.flush()
+            except OSError as ex:
+                logger.debug('Failed to save the VM image catalog of %s: %s', self.location, ex)
+            self._modified = False
+
+
+def get_latest_version(cli_ctx, location, publisher, offer, sku):
+    """Get the latest version of an image from the index of the catalog, or None if it isn't in the index."""
+    from azure.cli.core._session import Session
+    ttl = _get_ttl(cli_ctx)
+    index = Session()
+    if ttl <= 0 or not _load_if_exists(index, _get_catalog_path(cli_ctx, location, LATEST_VERSIONS_SUFFIX)):
+        return None
+    entry = index.get(_get_image_key(publisher, offer, sku))
+    if entry and entry.get('time', 0) + ttl > time.time():
+        return entry['version']
+    return None
+
+
+def _get_ttl(cli_ctx):
+    return int(cli_ctx.config.get('vm', 'image_catalog_ttl', DEFAULT_IMAGE_CATALOG_TTL)) * 60
+
+
+def _get_catalog_path(cli_ctx, location, suffix=''):
+    return os.path.join(cli_ctx.config.config_dir, IMAGE_CATALOG_DIR, cli_ctx.cloud.name,
+                        location.lower().replace(' ', '') + suffix + '.json')
+
+
+def _get_image_key(publisher, offer, sku):
+    return '/'.join((publisher, offer, sku)).lower()
+
+
+def _load_if_exists(session, path):
+    """Load the session from the file, unlike `Session.load` without creating it when it doesn't exist."""
+    if not os.path.isfile(path):
+        return False
+    session.load(path)
+    return True
+
+
+def _get_version_key(version):
+    # versions are like '18.04.202101010', compare them part by part and numerically where possible
+    return [(1, int(part), '') if part.isdigit() else (0, 0, part) for part in version.split('.')]
@@ -0,0 +1,119 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import time
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+SKU_CACHE_FILE = 'computeSkuCache.json'
+# minutes to keep the resource SKUs of a location, configurable as `vm.sku_cache_ttl`
+DEFAULT_SKU_CACHE_TTL = 1440
+# the load time, SKUs and their index by name, of the (scope, location) pairs loaded by this process
+_loaded_skus = {}
+
+
+class ResourceSkuCache(object):
+    """
+    Persistent, per-subscription cache of the compute resource SKUs of each location, backed by a JSON file in the
+    config dir.
+
+    The SKU catalogue is large, so it is listed for a single location when the API supports filtering, and kept for
+    `vm.sku_cache_ttl` minutes. SKUs listed for all locations also answer queries for a single location. Set the TTL
+    to 0 to turn the cache off.
+    """
+
+    def __init__(self, cli_ctx):
+        from azure.cli.core.commands.client_factory import get_subscription_id
+
+        self.cli_ctx = cli_ctx
+        self.ttl = int(cli_ctx.config.get('vm', 'sku_cache_ttl', DEFAULT_SKU_CACHE_TTL)) * 60
+        self._scope = '{}/{}/{}'.format(cli_ctx.cloud.name, cli_ctx.cloud.profile, get_subscription_id(cli_ctx))
+        self._session = None
+
+    def list(self, location=None):
+        """List the resource SKUs available in the location, or in all locations."""
+        return self._get(location)[0]
+
+    def find(self, location, name, resource_type=None):
+        """Find a resource SKU in the location by name, case-insensitively."""
+        skus = self._get(location)[1].get(name.lower(), [])
+        return next((s for s in skus if not resource_type or s.resource_type.lower() == resource_type.lower()), None)
+
+    def _get(self, location):
+        key = (self._scope, (location or '').lower())
+        loaded = _loaded_skus.get(key)
+        if loaded and loaded[0] + self.ttl > time.time():
+            return loaded[1:]
+        skus = self._load(location)
+        if skus is None:
+            skus = self._fetch(location)
+        index = {}
+        for sku in skus:
+            index.setdefault(sku.name.lower(), []).append(sku)
+        if self.ttl > 0:
+            _loaded_skus[key] = (time.time(), skus, index)
+        return skus, index
+
+    def _get_session(self):
+        if self._session is None:
+            from azure.cli.core._session import Session
+            self._session = Session()
+            try:
+                self._session.load(os.path.join(self.cli_ctx.config.config_dir, SKU_CACHE_FILE))
+            except OSError as ex:
+                logger.debug('Failed to load the resource SKU cache: %s', ex)
+        return self._session
+
+    def _load(self, location):
+        if self.ttl <= 0:
+            return None
+        entries = self._get_session()[self._scope]
+        for entry_location in [(location or '').lower(), ''] if location else ['']:
+            entry = entries.get(entry_location)
+            if entry and entry.get('time', 0) + self.ttl > time.time():
+                logger.debug("Found resource SKUs of location '%s' in the local cache.", entry_location or 'all')
+                skus = self._deserialize(entry['skus'])
+                return _filter_by_location(skus, location) if entry_location != (location or '').lower() else skus
+        return None
+
+    def _fetch(self, location):
+        from azure.cli.core.profiles import ResourceType, supported_api_version
+        from ._client_factory import _compute_client_factory
+
+        client = _compute_client_factory(self.cli_ctx)
+        if location and supported_api_version(self.cli_ctx, ResourceType.MGMT_COMPUTE, min_api='2019-04-01',
+                                              operation_group='resource_skus'):
+            skus = list(client.resource_skus.list(filter="location eq '{}'".format(location)))
+        else:
+            skus = list(client.resource_skus.list())
+        if location:
+            skus = _filter_by_location(skus, location)
+        if self.ttl > 0:
+            now = time.time()
+            entries = self._get_session()[self._scope]
+            for expired in [k for k, e in entries.items() if e.get('time', 0) + self.ttl <= now]:
+                del entries[expired]
+            entries[(location or '').lower()] = {
+                'time': now,
+                'skus': [sku.serialize(keep_readonly=True) for sku in skus]
+            }
+            try:
+                self._get_session().save_with_retry()
+            except OSError as ex:
+                logger.debug('Failed to save the resource SKU cache: %s', ex)
+        return skus
+
+    def _deserialize(self, skus):
+        from azure.cli.core.profiles import ResourceType, get_sdk
+        ResourceSku = get_sdk(self.cli_ctx, ResourceType.MGMT_COMPUTE, 'ResourceSku', mod='models',
+                              operation_group='resource_skus')
+        return [ResourceSku.deserialize(sku) for sku in skus]
+
+
+def _filter_by_location(skus, location):
+    return [s for s in skus if any(x.lower() == location.lower() for x in s.locations or [])]
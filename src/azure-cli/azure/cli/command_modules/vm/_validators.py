@@ -20,7 +20,7 @@ from azure.cli.core.commands.validators import (
     get_default_location_from_resource_group, validate_file_or_dict, validate_parameter_set, validate_tags)
 from azure.cli.core.util import (hash_string, DISALLOWED_USER_NAMES, get_default_admin_username)
 from azure.cli.command_modules.vm._vm_utils import (
-    check_existence, get_target_network_api, get_storage_blob_uri, list_sku_info)
+    check_existence, get_target_network_api, get_storage_blob_uri, find_sku_info)
 from azure.cli.command_modules.vm._template_builder import StorageProfile
 import azure.cli.core.keys as keys
 from azure.core.exceptions import ResourceNotFoundError
@@ -130,15 +130,10 @@ def _get_resource_group_from_vault_name(cli_ctx, vault_name):
     :return: resource group name or None
     :rtype: str
     """
-    from azure.cli.core.profiles import ResourceType
-    from azure.cli.core.commands.client_factory import get_mgmt_service_client
+    from azure.cli.core.commands.arm import get_resource_ids_by_name
     from msrestazure.tools import parse_resource_id
-    client = get_mgmt_service_client(cli_ctx, ResourceType.MGMT_KEYVAULT).vaults
-    for vault in client.list():
-        id_comps = parse_resource_id(vault.id)
-        if id_comps['name'] == vault_name:
-            return id_comps['resource_group']
-    return None
+    ids = get_resource_ids_by_name(cli_ctx, 'Microsoft.KeyVault/vaults', vault_name)
+    return parse_resource_id(ids[0])['resource_group'] if ids else None
 
 
 def _get_resource_id(cli_ctx, val, resource_group, resource_type, resource_namespace):
@@ -344,8 +339,7 @@ def _validate_location(cmd, namespace, zone_info, size_info):
     if not namespace.location:
         get_default_location_from_resource_group(cmd, namespace)
         if zone_info:
-            sku_infos = list_sku_info(cmd.cli_ctx, namespace.location)
-            temp = next((x for x in sku_infos if x.name.lower() == size_info.lower()), None)
+            temp = find_sku_info(cmd.cli_ctx, namespace.location, size_info)
             # For Stack (compute - 2017-03-30), Resource_sku doesn't implement location_info property
             if not hasattr(temp, 'location_info'):
                 return
@@ -118,16 +118,13 @@ def get_key_vault_base_url(cli_ctx, vault_name):
 
 
 def list_sku_info(cli_ctx, location=None):
-    from ._client_factory import _compute_client_factory
+    from ._sku_cache import ResourceSkuCache
+    return ResourceSkuCache(cli_ctx).list(location)
 
-    def _match_location(loc, locations):
-        return next((x for x in locations if x.lower() == loc.lower()), None)
 
-    client = _compute_client_factory(cli_ctx)
-    result = client.resource_skus.list()
-    if location:
-        result = [r for r in result if _match_location(location, r.locations)]
-    return result
+def find_sku_info(cli_ctx, location, name, resource_type=None):
+    from ._sku_cache import ResourceSkuCache
+    return ResourceSkuCache(cli_ctx).find(location, name, resource_type)
 
 
 def normalize_disk_info(image_data_disks=None,
@@ -1079,27 +1079,42 @@ def get_vm_to_update(cmd, resource_group_name, vm_name):
 
 def get_vm_details(cmd, resource_group_name, vm_name):
     from msrestazure.tools import parse_resource_id
-    from azure.cli.command_modules.vm._vm_utils import get_target_network_api
     result = get_instance_view(cmd, resource_group_name, vm_name)
-    network_client = get_mgmt_service_client(
-        cmd.cli_ctx, ResourceType.MGMT_NETWORK, api_version=get_target_network_api(cmd.cli_ctx))
+    network_client = _get_vm_details_network_client(cmd.cli_ctx)
+
+    def _get_nic(nic_id):
+        nic_parts = parse_resource_id(nic_id)
+        return network_client.network_interfaces.get(nic_parts['resource_group'], nic_parts['name'])
+
+    def _get_public_ip(public_ip_id):
+        res = parse_resource_id(public_ip_id)
+        return network_client.public_ip_addresses.get(res['resource_group'], res['name'])
+
+    return _set_vm_details(result, _get_nic, _get_public_ip)
+
+
+def _get_vm_details_network_client(cli_ctx):
+    from azure.cli.command_modules.vm._vm_utils import get_target_network_api
+    return get_mgmt_service_client(cli_ctx, ResourceType.MGMT_NETWORK, api_version=get_target_network_api(cli_ctx))
+
+
+def _set_vm_details(result, get_nic, get_public_ip):
+    """Set the power state and the network details on a VM with its instance view, getting its NICs and public IPs
+    by ID with the given functions."""
     public_ips = []
     fqdns = []
     private_ips = []
     mac_addresses = []
     # pylint: disable=line-too-long,no-member
     for nic_ref in result.network_profile.network_interfaces:
-        nic_parts = parse_resource_id(nic_ref.id)
-        nic = network_client.network_interfaces.get(nic_parts['resource_group'], nic_parts['name'])
+        nic = get_nic(nic_ref.id)
         if nic.mac_address:
             mac_addresses.append(nic.mac_address)
         for ip_configuration in nic.ip_configurations:
             if ip_configuration.private_ip_address:
                 private_ips.append(ip_configuration.private_ip_address)
             if ip_configuration.public_ip_address:
-                res = parse_resource_id(ip_configuration.public_ip_address.id)
-                public_ip_info = network_client.public_ip_addresses.get(res['resource_group'],
-                                                                        res['name'])
+                public_ip_info = get_public_ip(ip_configuration.public_ip_address.id)
                 if public_ip_info.ip_address:
                     public_ips.append(public_ip_info.ip_address)
                 if public_ip_info.dns_settings:
@@ -1115,6 +1130,53 @@ def get_vm_details(cmd, resource_group_name, vm_name):
     return result
 
 
+def _list_vm_details(cmd, vm_list, resource_group_name=None):
+    """Get the details of the VMs like `get_vm_details`, with one listing of the NICs and public IPs in the
+    subscription (or resource group) instead of one request per NIC and public IP. The instance views are got
+    concurrently, by at most `core.max_concurrent_ids` requests at a time."""
+    from concurrent.futures import ThreadPoolExecutor
+    from msrestazure.tools import parse_resource_id
+    from azure.cli.core.commands import DEFAULT_MAX_CONCURRENT_IDS
+
+    vm_list = list(vm_list)
+    if not vm_list:
+        return []
+    network_client = _get_vm_details_network_client(cmd.cli_ctx)
+    if resource_group_name:
+        nics = network_client.network_interfaces.list(resource_group_name)
+        public_ips = network_client.public_ip_addresses.list(resource_group_name)
+    else:
+        nics = network_client.network_interfaces.list_all()
+        public_ips = network_client.public_ip_addresses.list_all()
+    nic_lookup = {nic.id.lower(): nic for nic in nics}
+    public_ip_lookup = {public_ip.id.lower(): public_ip for public_ip in public_ips}
+
+    # NICs and public IPs may be in other resource groups than the VM, so fall back to getting them by ID
+    def _get_nic(nic_id):
+        nic = nic_lookup.get(nic_id.lower())
+        if nic is None:
+            nic_parts = parse_resource_id(nic_id)
+            nic = nic_lookup[nic_id.lower()] = network_client.network_interfaces.get(nic_parts['resource_group'],
+                                                                                     nic_parts['name'])
+        return nic
+
+    def _get_public_ip(public_ip_id):
+        public_ip = public_ip_lookup.get(public_ip_id.lower())
+        if public_ip is None:
+            res = parse_resource_id(public_ip_id)
+            public_ip = public_ip_lookup[public_ip_id.lower()] = network_client.public_ip_addresses.get(
+                res['resource_group'], res['name'])
+        return public_ip
+
+    def _get_vm_details(vm):
+        result = get_instance_view(cmd, _parse_rg_name(vm.id)[0], vm.name)
+        return _set_vm_details(result, _get_nic, _get_public_ip)
+
+    max_workers = cmd.cli_ctx.config.getint('core', 'max_concurrent_ids', DEFAULT_MAX_CONCURRENT_IDS)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(vm_list)))) as executor:
+        return list(executor.map(_get_vm_details, vm_list))
+
+
 def list_skus(cmd, location=None, size=None, zone=None, show_all=None, resource_type=None):
     from ._vm_utils import list_sku_info
     result = list_sku_info(cmd.cli_ctx, location)
@@ -1135,7 +1197,7 @@ def list_vm(cmd, resource_group_name=None, show_details=False):
     vm_list = ccf.virtual_machines.list(resource_group_name=resource_group_name) \
         if resource_group_name else ccf.virtual_machines.list_all()
     if show_details:
-        return [get_vm_details(cmd, _parse_rg_name(v.id)[0], v.name) for v in vm_list]
+        return _list_vm_details(cmd, vm_list, resource_group_name)
 
     return list(vm_list)
 
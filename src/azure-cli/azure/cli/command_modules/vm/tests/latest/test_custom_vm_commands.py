@@ -14,7 +14,7 @@ from azure.cli.command_modules.vm.custom import (enable_boot_diagnostics, disabl
                                                  _LINUX_ACCESS_EXT,
                                                  _WINDOWS_ACCESS_EXT,
                                                  _get_extension_instance_name,
-                                                 get_boot_log)
+                                                 get_boot_log, _list_vm_details)
 from azure.cli.command_modules.vm.custom import \
     (attach_unmanaged_data_disk, detach_data_disk, get_vmss_instance_view)
 
@@ -359,6 +359,44 @@ class TestVmCustom(unittest.TestCase):
         # assert
         self.assertEqual(result, 'extension-name')
 
+    @mock.patch('azure.cli.command_modules.vm.custom.get_instance_view', autospec=True)
+    @mock.patch('azure.cli.command_modules.vm.custom._get_vm_details_network_client', autospec=True)
+    def test_list_vm_details_joins_network_resources(self, network_client_mock, get_instance_view_mock):
+        nic_id = '/subscriptions/sub/resourceGroups/rg/providers/Microsoft.Network/networkInterfaces/{}'
+        pip_id = '/subscriptions/sub/resourceGroups/rg/providers/Microsoft.Network/publicIPAddresses/{}'
+
+        def _nic(name, mac, public_ip_name=None):
+            ip_config = mock.MagicMock(private_ip_address='10.0.0.' + mac[-1])
+            ip_config.public_ip_address = mock.MagicMock(id=pip_id.format(public_ip_name)) if public_ip_name else None
+            return mock.MagicMock(id=nic_id.format(name), mac_address=mac, ip_configurations=[ip_config])
+
+        def _get_instance_view(_, resource_group_name, vm_name):
+            vm = mock.MagicMock()
+            vm.name = vm_name
+            vm.network_profile.network_interfaces = [mock.MagicMock(id=nic_id.format(vm_name + 'Nic').upper())]
+            vm.instance_view.statuses = [InstanceViewStatus(code='PowerState/running', display_status='VM running')]
+            return vm
+
+        network_client = network_client_mock.return_value
+        network_client.network_interfaces.list.return_value = [_nic('vm1Nic', 'm1', 'vm1Ip')]
+        network_client.network_interfaces.get.return_value = _nic('vm2Nic', 'm2')
+        network_client.public_ip_addresses.list.return_value = [
+            mock.MagicMock(id=pip_id.format('vm1Ip'), ip_address='1.2.3.4', dns_settings=None)]
+        get_instance_view_mock.side_effect = _get_instance_view
+
+        vms = []
+        for name in ['vm1', 'vm2']:
+            vm = mock.MagicMock(id='/subscriptions/sub/resourceGroups/rg/providers/Microsoft.Compute/'
+                                   'virtualMachines/' + name)
+            vm.name = name
+            vms.append(vm)
+        result = _list_vm_details(_get_test_cmd(), vms, 'rg')
+
+        self.assertEqual([(vm.name, vm.mac_addresses, vm.public_ips, vm.private_ips, vm.power_state) for vm in result],
+                         [('vm1', 'm1', '1.2.3.4', '10.0.0.1', 'VM running'), ('vm2', 'm2', '', '10.0.0.2', 'VM running')])
+        network_client.network_interfaces.get.assert_called_once_with('RG', 'VM2NIC')
+        network_client.public_ip_addresses.get.assert_not_called()
+
 
 class TestVMBootLog(unittest.TestCase):
 
@@ -0,0 +1,101 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from azure.cli.command_modules.vm._actions import load_images_thru_services, _get_latest_image_version
+
+
+def _mock_cli_ctx(config_dir, ttl=None):
+    cli_ctx = mock.MagicMock()
+    cli_ctx.cloud.name = 'AzureCloud'
+    cli_ctx.config.config_dir = config_dir
+    cli_ctx.config.get.side_effect = lambda section, key, default=None: ttl if ttl is not None else default
+    return cli_ctx
+
+
+def _names(*names):
+    result = []
+    for name in names:
+        item = mock.MagicMock()
+        item.name = name
+        result.append(item)
+    return result
+
+
+class TestVMImageCatalog(unittest.TestCase):
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.images = mock.MagicMock()
+        self.images.list_publishers.return_value = _names('Canonical', 'MicrosoftWindowsServer')
+        self.images.list_offers.side_effect = lambda _, p: _names('UbuntuServer') if p == 'Canonical' else \
+            _names('WindowsServer')
+        self.images.list_skus.side_effect = lambda _, p, o: _names('18.04-LTS', '16.04-LTS') if p == 'Canonical' \
+            else _names('2019-Datacenter')
+        self.images.list.side_effect = lambda _, p, o, s, **kwargs: _names('18.04.202109010', '18.04.202110010') \
+            if s == '18.04-LTS' else _names('1.0.0')
+        for target in ['azure.cli.command_modules.vm._client_factory._compute_client_factory',
+                       'azure.cli.command_modules.vm._actions._compute_client_factory']:
+            patcher = mock.patch(target)
+            patcher.start().return_value.virtual_machine_images = self.images
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.config_dir)
+
+    def test_image_catalog_lists_once(self):
+        images = load_images_thru_services(_mock_cli_ctx(self.config_dir), None, None, None, 'westus')
+        self.assertEqual(len(images), 4)
+        self.assertEqual(self.images.list.call_count, 3)
+
+        images = load_images_thru_services(_mock_cli_ctx(self.config_dir), 'canon', 'ubuntu', '18.04', 'westus')
+        self.assertEqual([i['version'] for i in images], ['18.04.202109010', '18.04.202110010'])
+        self.assertEqual(self.images.list_publishers.call_count, 1)
+        self.assertEqual(self.images.list.call_count, 3)
+
+    def test_image_catalog_refreshes_searched_publishers_only(self):
+        load_images_thru_services(_mock_cli_ctx(self.config_dir), 'canonical', None, None, 'westus')
+        self.assertEqual(self.images.list_offers.call_count, 1)
+        load_images_thru_services(_mock_cli_ctx(self.config_dir), None, None, None, 'westus')
+        self.assertEqual(self.images.list_offers.call_count, 2)
+        self.assertEqual(self.images.list.call_count, 3)
+
+        with mock.patch('time.time', return_value=10 ** 12):
+            load_images_thru_services(_mock_cli_ctx(self.config_dir), 'windows', None, None, 'westus')
+        self.assertEqual(self.images.list_publishers.call_count, 2)
+        self.assertEqual(self.images.list_offers.call_count, 3)
+        self.assertEqual(self.images.list.call_count, 4)
+
+    def test_latest_image_version_from_catalog(self):
+        self.images.list.side_effect = None
+        self.images.list.return_value = _names('18.04.202111010')
+        self.assertEqual(_get_latest_image_version(_mock_cli_ctx(self.config_dir), 'westus', 'Canonical',
+                                                   'UbuntuServer', '18.04-LTS'), '18.04.202111010')
+        self.images.list.assert_called_with('westus', 'Canonical', 'UbuntuServer', '18.04-LTS', top=1,
+                                            orderby='name desc')
+        # resolving a version doesn't create the catalog
+        self.assertEqual(os.listdir(self.config_dir), [])
+
+        self.images.list.return_value = _names('18.04.202109010', '18.04.202110010', '18.04.20211001')
+        load_images_thru_services(_mock_cli_ctx(self.config_dir), 'Canonical', 'UbuntuServer', '18.04-LTS', 'westus')
+        calls = self.images.list.call_count
+        with mock.patch('azure.cli.command_modules.vm._image_catalog.VMImageCatalog') as catalog:
+            self.assertEqual(_get_latest_image_version(_mock_cli_ctx(self.config_dir), 'WestUS', 'canonical',
+                                                       'ubuntuserver', '18.04-lts'), '18.04.202110010')
+        catalog.assert_not_called()
+        self.assertEqual(self.images.list.call_count, calls)
+
+    def test_image_catalog_disabled_with_zero_ttl(self):
+        load_images_thru_services(_mock_cli_ctx(self.config_dir, ttl='0'), 'canonical', None, None, 'westus')
+        load_images_thru_services(_mock_cli_ctx(self.config_dir, ttl='0'), 'canonical', None, None, 'westus')
+        self.assertEqual(self.images.list_offers.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from azure.cli.core.mock import DummyCli
+from azure.cli.core.profiles import ResourceType, get_sdk
+from azure.cli.command_modules.vm import _sku_cache
+from azure.cli.command_modules.vm._vm_utils import list_sku_info, find_sku_info
+
+ResourceSku = get_sdk(DummyCli(), ResourceType.MGMT_COMPUTE, 'ResourceSku', mod='models',
+                      operation_group='resource_skus')
+
+
+def _mock_cli_ctx(config_dir, ttl=None):
+    cli_ctx = mock.MagicMock()
+    cli_ctx.cloud.name = 'AzureCloud'
+    cli_ctx.cloud.profile = 'latest'
+    cli_ctx.config.config_dir = config_dir
+    cli_ctx.config.get.side_effect = lambda section, key, default=None: ttl if ttl is not None else default
+    return cli_ctx
+
+
+def _sku(resource_type, name, location):
+    return ResourceSku.deserialize({'resourceType': resource_type, 'name': name, 'locations': [location]})
+
+
+@mock.patch('azure.cli.core.commands.client_factory.get_subscription_id', return_value='sub')
+class TestResourceSkuCache(unittest.TestCase):
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.client = mock.MagicMock()
+        self.client.resource_skus.list.return_value = [_sku('virtualMachines', 'Standard_DS1_v2', 'westus'),
+                                                       _sku('disks', 'Premium_LRS', 'WestUS'),
+                                                       _sku('virtualMachines', 'Standard_DS1_v2', 'eastus')]
+        patcher = mock.patch('azure.cli.command_modules.vm._client_factory._compute_client_factory',
+                             return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        _sku_cache._loaded_skus.clear()
+
+    def tearDown(self):
+        _sku_cache._loaded_skus.clear()
+        shutil.rmtree(self.config_dir)
+
+    def test_sku_cache_lists_location_once(self, _):
+        skus = list_sku_info(_mock_cli_ctx(self.config_dir), 'westus')
+        self.assertEqual([(s.resource_type, s.name) for s in skus],
+                         [('virtualMachines', 'Standard_DS1_v2'), ('disks', 'Premium_LRS')])
+        self.client.resource_skus.list.assert_called_once_with(filter="location eq 'westus'")
+
+        # answered from the index in memory, then from the file in another process
+        self.assertEqual(find_sku_info(_mock_cli_ctx(self.config_dir), 'WestUS', 'standard_ds1_v2').name,
+                         'Standard_DS1_v2')
+        _sku_cache._loaded_skus.clear()
+        sku = find_sku_info(_mock_cli_ctx(self.config_dir), 'westus', 'premium_lrs', resource_type='disks')
+        self.assertEqual(sku.locations, ['WestUS'])
+        self.assertIsNone(find_sku_info(_mock_cli_ctx(self.config_dir), 'westus', 'premium_lrs', 'virtualMachines'))
+        self.assertEqual(self.client.resource_skus.list.call_count, 1)
+
+    def test_sku_cache_of_all_locations_answers_location(self, _):
+        self.assertEqual(len(list_sku_info(_mock_cli_ctx(self.config_dir))), 3)
+        _sku_cache._loaded_skus.clear()
+        self.assertEqual(len(list_sku_info(_mock_cli_ctx(self.config_dir), 'eastus')), 1)
+        self.client.resource_skus.list.assert_called_once_with()
+
+    def test_sku_cache_expires(self, _):
+        list_sku_info(_mock_cli_ctx(self.config_dir), 'westus')
+        with mock.patch('time.time', return_value=10 ** 12):
+            list_sku_info(_mock_cli_ctx(self.config_dir), 'westus')
+        self.assertEqual(self.client.resource_skus.list.call_count, 2)
+
+    def test_sku_cache_disabled_with_zero_ttl(self, _):
+        list_sku_info(_mock_cli_ctx(self.config_dir, ttl='0'), 'westus')
+        list_sku_info(_mock_cli_ctx(self.config_dir, ttl='0'), 'westus')
+        self.assertEqual(self.client.resource_skus.list.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()